@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Date, Integer, and_, case, cast, func, literal_column, select
+from models import db, Outage, Area, User
+
+ACTIVE_STATUSES = ('REPORTED', 'IN_PROGRESS')
+# outage_stats()['recent_outages'] counts outages reported in the last RECENT_DAYS days
+RECENT_DAYS = 7
+
+
+def hours_between(start, end):
+    """SQL expression for (end - start) in hours on the bound dialect."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return func.extract('epoch', end - start) / 3600.0
+    if dialect in ('mysql', 'mariadb'):
+        return func.timestampdiff(literal_column('SECOND'), start, end) / 3600.0
+    return (func.julianday(end) - func.julianday(start)) * 24.0
+
+
+def seconds_between(start, end):
+    """SQL expression for (end - start) in whole seconds on the bound dialect.
+
+    Thresholds compare these rather than fractional hours: julianday
+    differences put an exact 5 minutes a hair either side of 5.0.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return cast(func.round(func.extract('epoch', end - start)), Integer)
+    if dialect in ('mysql', 'mariadb'):
+        return func.timestampdiff(literal_column('SECOND'), start, end)
+    return cast(func.round((func.julianday(end) - func.julianday(start)) * 86400), Integer)
+
+
+def day_of(column):
+    """SQL expression truncating a datetime column to its calendar date."""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return func.date(column)
+    return cast(column, Date)
+
+
+def month_of(column):
+    """SQL expression truncating a datetime column to the first day of its month."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return func.date(column, 'start of month')
+    if dialect in ('mysql', 'mariadb'):
+        return cast(func.date_format(column, '%Y-%m-01'), Date)
+    return cast(func.date_trunc('month', column), Date)
+
+
+def outage_stats():
+    seven_days_ago = datetime.utcnow() - timedelta(days=RECENT_DAYS)
+    resolution_hours = case(
+        (and_(Outage.status == 'RESOLVED', Outage.resolved_at.isnot(None)),
+         hours_between(Outage.created_at, Outage.resolved_at))
+    )
+
+    # One grouped pass over outages; every counter is derived from these rows
+    groups = db.session.query(
+        Outage.status,
+        Outage.priority,
+        func.count(Outage.id),
+        func.sum(case((Outage.created_at >= seven_days_ago, 1), else_=0)),
+        func.sum(resolution_hours),
+        func.count(resolution_hours)
+    ).group_by(Outage.status, Outage.priority).all()
+
+    total_areas, total_users = db.session.query(
+        select(func.count(Area.id)).scalar_subquery(),
+        select(func.count(User.id)).scalar_subquery()
+    ).one()
+
+    status_counts = {}
+    priority_counts = {}
+    total_outages = recent_outages = resolved_count = 0
+    resolution_total = 0.0
+    for status, priority, count, recent, hours, resolved in groups:
+        status_counts[status] = status_counts.get(status, 0) + count
+        priority_counts[priority] = priority_counts.get(priority, 0) + count
+        total_outages += count
+        recent_outages += recent or 0
+        resolution_total += hours or 0.0
+        resolved_count += resolved
+
+    avg_resolution_time = 0
+    if resolved_count:
+        avg_resolution_time = round(resolution_total / resolved_count, 2)
+
+    return {
+        'total_outages': total_outages,
+        'active_outages': sum(status_counts.get(s, 0) for s in ACTIVE_STATUSES),
+        'resolved_outages': status_counts.get('RESOLVED', 0),
+        'total_areas': total_areas,
+        'total_users': total_users,
+        'avg_resolution_time': avg_resolution_time,
+        'outages_by_status': status_counts,
+        'outages_by_priority': priority_counts,
+        'recent_outages': recent_outages
+    }
+
+
+def with_outage_counts(area_query):
+    """Attach (total_outages, active_outages) columns to an Area query.
+
+    Outage counts are aggregated once per area_id and joined to areas, so
+    any number of areas costs a single round trip. "Active" keeps the
+    areas endpoints' meaning of status REPORTED.
+    """
+    counts = db.session.query(
+        Outage.area_id.label('area_id'),
+        func.count(Outage.id).label('total'),
+        func.sum(case((Outage.status == 'REPORTED', 1), else_=0)).label('active')
+    ).group_by(Outage.area_id).subquery()
+
+    return area_query.outerjoin(counts, counts.c.area_id == Area.id).add_columns(
+        func.coalesce(counts.c.total, 0),
+        func.coalesce(counts.c.active, 0)
+    )
@@ -3,21 +3,42 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
 from models import db
+from database import configure_engine
+from json_provider import FastJSONProvider
+from compression import init_compression
+from instrumentation import init_instrumentation
+from identity import init_identity
+from notifier import fanout
+from clustering import incident_index
+from events import event_bus
+import rollups  # keeps outage_daily_rollups in step with outage writes
+import reliability  # keeps reliability_rollups in step with outage writes
+import inbox  # keeps users.unread_notifications in step with notification writes
+import conditional  # bumps table_versions after every committed write
 from routes.auth import auth_bp
 from routes.outages import outages_bp
 from routes.areas import areas_bp
 from routes.notifications import notifications_bp
 from routes.analytics import analytics_bp
 from routes.maintenance import maintenance_bp
+from routes.events import events_bp
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(Config)
     
     # Initialize extensions
     db.init_app(app)
-    CORS(app, origins=Config.CORS_ORIGINS, supports_credentials=True)
-    JWTManager(app)
+    configure_engine(app)
+    init_instrumentation(app)
+    fanout.init_app(app)
+    incident_index.init_app(app)
+    event_bus.init_app(app)
+    CORS(app, origins=Config.CORS_ORIGINS, supports_credentials=True,
+         expose_headers=['X-Next-Cursor', 'Link', 'X-Unread-Count', 'ETag', 'Last-Modified'])
+    init_identity(JWTManager(app), app)
+    init_compression(app)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -26,6 +47,7 @@ def create_app():
     app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
     app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
     app.register_blueprint(maintenance_bp, url_prefix='/api/maintenance')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
     
     # Health check endpoint
     @app.route('/api/health')
@@ -0,0 +1,23 @@
+from app import create_app
+from models import db
+import reliability
+import rollups
+
+def backfill_rollups():
+    app = create_app()
+    
+    with app.app_context():
+        # Make sure the rollup table exists on databases created before it
+        db.create_all()
+        
+        print("Rebuilding daily outage rollups...")
+        count = rollups.backfill()
+        print(f"\n✅ Rebuilt {count} rollup rows")
+        
+        print("Rebuilding monthly reliability rollups...")
+        count = reliability.backfill()
+        db.session.commit()
+        print(f"✅ Rebuilt {count} reliability rollup rows")
+
+if __name__ == '__main__':
+    backfill_rollups()
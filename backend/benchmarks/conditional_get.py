@@ -0,0 +1,97 @@
+"""Polling cost with and without conditional requests.
+
+Run from backend/:  python -m benchmarks.conditional_get [--outages 20000] [--polls 200]
+
+Seeds a fresh SQLite database, then polls each read endpoint the way the
+frontends do: once as plain GETs and once replaying the ETag from the
+previous response in If-None-Match. Nothing is written in between, so every
+conditional poll should be a 304. Prints one JSON object with CPU time,
+wall time and bytes per poll for both modes.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+ENDPOINTS = [
+    ('/api/outages', 'user'),
+    ('/api/outages?profile=summary&limit=500', 'user'),
+    ('/api/areas', 'user'),
+    ('/api/maintenance', 'user'),
+    ('/api/analytics/stats', 'admin'),
+    ('/api/analytics/trends', 'admin'),
+    ('/api/analytics/areas-stats', 'admin'),
+]
+
+
+def poll(client, path, headers, polls, conditional):
+    etag = None
+    sent = 0
+    statuses = {}
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(polls):
+        request_headers = dict(headers)
+        if conditional and etag:
+            request_headers['If-None-Match'] = etag
+        response = client.get(path, headers=request_headers)
+        body = response.get_data()
+        etag = response.headers.get('ETag', etag)
+        sent += len(body)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return {
+        'cpu_ms_per_poll': round((time.process_time() - cpu) * 1000 / polls, 3),
+        'wall_ms_per_poll': round((time.perf_counter() - wall) * 1000 / polls, 3),
+        'bytes_per_poll': round(sent / polls),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure conditional GET savings under polling')
+    parser.add_argument('--outages', type=int, default=20000)
+    parser.add_argument('--areas', type=int, default=200)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--polls', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'conditional.db')}"
+    os.environ.setdefault('NOTIFICATION_FANOUT_SYNC', 'true')
+
+    from app import create_app
+    import init_db
+
+    with contextlib.redirect_stdout(sys.stderr):
+        init_db.init_database()
+        init_db.seed_synthetic(outages=args.outages, areas=args.areas, users=args.users,
+                               notifications=0, maintenance=200)
+
+    app = create_app()
+    client = app.test_client()
+    tokens = {}
+    for role, email, password in (('admin', 'admin@power.com', 'admin123'),
+                                  ('user', 'user@power.com', 'user123')):
+        response = client.post('/api/auth/login', json={'email': email, 'password': password})
+        tokens[role] = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    results = []
+    for path, role in ENDPOINTS:
+        print(f'Polling {path}...', file=sys.stderr)
+        plain = poll(client, path, tokens[role], args.polls, conditional=False)
+        conditional = poll(client, path, tokens[role], args.polls, conditional=True)
+        results.append({
+            'endpoint': path,
+            'plain': plain,
+            'conditional': conditional,
+            'cpu_saved_pct': round(100 * (1 - conditional['cpu_ms_per_poll'] / plain['cpu_ms_per_poll']), 1),
+            'bytes_saved_pct': round(100 * (1 - conditional['bytes_per_poll'] / max(plain['bytes_per_poll'], 1)), 1)
+        })
+
+    print(json.dumps({'outages': args.outages, 'polls': args.polls, 'endpoints': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Throughput and peak memory of the outage history export.
+
+Run from backend/:  python -m benchmarks.export [--outages 1000000]
+
+Seeds a fresh SQLite database, then exports every outage once per format
+in its own process so each peak RSS is clean: loading the whole history as
+JSON the way /api/outages would (before) against the chunked CSV, Arrow
+IPC and Parquet writers in export.py (after). Output is counted and
+discarded. Prints one JSON object with seconds, rows per second, bytes
+written and peak RSS in MB.
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_one(fmt):
+    from app import create_app
+    from json_provider import dumps_bytes
+    from models import Outage
+    import export
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        if fmt == 'json':
+            written = len(dumps_bytes([outage.to_dict() for outage in Outage.query.all()]))
+        else:
+            written = sum(len(chunk) for chunk in export.export_chunks(fmt, export.outage_rows()))
+        seconds = time.perf_counter() - started
+        rows = Outage.query.count()
+
+    print(json.dumps({
+        'seconds': round(seconds, 2),
+        'rows_per_second': int(rows / seconds),
+        'mb_written': round(written / 1e6, 1),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark outage history export')
+    parser.add_argument('--outages', type=int, default=1000000)
+    parser.add_argument('--only', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.only:
+        return run_one(args.only)
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'export.db')}"
+    os.environ.setdefault('NOTIFICATION_FANOUT_SYNC', 'true')
+    # Memory-mapped database pages would count towards every process's RSS
+    os.environ['SQLITE_MMAP_SIZE'] = '0'
+
+    import init_db
+    import export
+
+    with contextlib.redirect_stdout(sys.stderr):
+        init_db.init_database()
+        init_db.seed_synthetic(outages=args.outages, users=100, notifications=0, maintenance=0)
+
+    results = {}
+    for fmt in ['json'] + export.available_formats():
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.export', '--only', fmt],
+                                check=True, capture_output=True, text=True).stdout
+        results[fmt] = json.loads(output.strip().splitlines()[-1])
+
+    print(json.dumps({'outages': args.outages, 'formats': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
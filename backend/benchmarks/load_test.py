@@ -0,0 +1,189 @@
+"""Concurrent load test for the Flask API.
+
+Run from backend/:
+
+    python -m benchmarks.load_test --outages 100000 --areas 2000 --users 5000 \
+        --concurrency 16 --requests 200 --output results.json
+
+Seeds a fresh SQLite database in a temporary directory (or uses
+DATABASE_URL with --no-seed), drives every blueprint through the Flask test
+client from a thread pool and reports p50/p95/p99 latency, throughput and
+SQL statements per request for each endpoint as JSON.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_local = threading.local()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def scenarios(outage_id, area_id, maintenance_id):
+    """(name, method, path, role, json body) for each endpoint under test."""
+    return [
+        ('auth.me', 'GET', '/api/auth/me', 'user', None),
+        ('auth.login', 'POST', '/api/auth/login', None, {'email': 'user@power.com', 'password': 'user123'}),
+        ('outages.list', 'GET', '/api/outages', 'user', None),
+        ('outages.list_by_status', 'GET', '/api/outages?status=REPORTED', 'user', None),
+        ('outages.list_summary', 'GET', '/api/outages?profile=summary', 'user', None),
+        ('outages.get', 'GET', f'/api/outages/{outage_id}', 'user', None),
+        ('outages.create', 'POST', '/api/outages', 'user', {
+            'title': 'Load test outage', 'description': 'Created by the load test',
+            'location': 'Bench Street', 'area_id': area_id, 'priority': 'LOW'
+        }),
+        ('areas.list', 'GET', '/api/areas', 'user', None),
+        ('areas.get', 'GET', f'/api/areas/{area_id}', 'user', None),
+        ('analytics.stats', 'GET', '/api/analytics/stats', 'admin', None),
+        ('analytics.trends', 'GET', '/api/analytics/trends', 'admin', None),
+        ('analytics.areas_stats', 'GET', '/api/analytics/areas-stats', 'admin', None),
+        ('notifications.list', 'GET', '/api/notifications', 'user', None),
+        ('maintenance.list', 'GET', '/api/maintenance', 'user', None),
+        ('maintenance.get', 'GET', f'/api/maintenance/{maintenance_id}', 'user', None),
+    ]
+
+
+def run_endpoint(app, scenario, tokens, concurrency, total):
+    name, method, path, role, body = scenario
+    headers = {'Authorization': f'Bearer {tokens[role]}'} if role else {}
+    latencies = []
+    queries = []
+    statuses = {}
+    bytes_sent = []
+    lock = threading.Lock()
+
+    def one_request(_):
+        client = getattr(_local, 'client', None)
+        if client is None:
+            client = _local.client = app.test_client()
+        _local.queries = 0
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, json=body)
+        data = response.get_data()
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed * 1000)
+            queries.append(_local.queries)
+            bytes_sent.append(len(data))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'endpoint': name,
+        'method': method,
+        'path': path,
+        'requests': total,
+        'concurrency': concurrency,
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        'throughput_rps': round(total / wall, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'mean': round(statistics.fmean(latencies), 2),
+            'max': round(latencies[-1], 2)
+        },
+        'queries_per_request': {
+            'mean': round(statistics.fmean(queries), 2),
+            'max': max(queries)
+        },
+        'response_bytes_mean': round(statistics.fmean(bytes_sent))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Flask API')
+    parser.add_argument('--outages', type=int, default=10000)
+    parser.add_argument('--areas', type=int, default=200)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--notifications', type=int, default=20000)
+    parser.add_argument('--maintenance', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100, help='requests per endpoint')
+    parser.add_argument('--only', help='comma-separated endpoint names to run')
+    parser.add_argument('--no-seed', action='store_true', help='use the existing DATABASE_URL as is')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    if not args.no_seed and 'DATABASE_URL' not in os.environ:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'loadtest.db')}"
+    os.environ.setdefault('NOTIFICATION_FANOUT_SYNC', 'false')
+
+    from sqlalchemy import event
+    from app import create_app
+    from models import db, Area, Maintenance, Outage
+    import init_db
+
+    if not args.no_seed:
+        # Keep stdout for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            init_db.init_database()
+            init_db.seed_synthetic(
+                outages=args.outages, areas=args.areas, users=args.users,
+                notifications=args.notifications, maintenance=args.maintenance
+            )
+
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def count_query(*_):
+            _local.queries = getattr(_local, 'queries', 0) + 1
+
+        outage_id = db.session.query(Outage.id).order_by(Outage.id.desc()).limit(1).scalar()
+        area_id = db.session.query(Area.id).limit(1).scalar()
+        maintenance_id = db.session.query(Maintenance.id).limit(1).scalar()
+
+    tokens = {}
+    for role, email, password in (('admin', 'admin@power.com', 'admin123'),
+                                  ('user', 'user@power.com', 'user123')):
+        response = client.post('/api/auth/login', json={'email': email, 'password': password})
+        tokens[role] = response.get_json()['access_token']
+
+    selected = set(args.only.split(',')) if args.only else None
+    results = []
+    for scenario in scenarios(outage_id, area_id, maintenance_id):
+        if selected and scenario[0] not in selected:
+            continue
+        print(f'Running {scenario[0]}...', file=sys.stderr)
+        results.append(run_endpoint(app, scenario, tokens, args.concurrency, args.requests))
+
+    report = {
+        'database': app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1],
+        'dataset': {
+            'outages': args.outages, 'areas': args.areas, 'users': args.users,
+            'notifications': args.notifications, 'maintenance': args.maintenance
+        } if not args.no_seed else None,
+        'concurrency': args.concurrency,
+        'requests_per_endpoint': args.requests,
+        'endpoints': results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Overlap and active-at queries over many maintenance windows.
+
+Run from backend/:  python -m benchmarks.maintenance_overlap [--windows 200000] [--probes 200]
+
+Seeds a fresh SQLite database with synthetic maintenance windows, then asks
+"which windows overlap this proposed window" and "what is active at T" for
+random probes, once with the plain start/end predicate (before) and once
+through the interval index in schedule.py (after). Both must return the
+same rows. Prints one JSON object with milliseconds per probe.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def timed(probes, fn):
+    started = time.perf_counter()
+    results = [fn(probe) for probe in probes]
+    return round((time.perf_counter() - started) * 1000 / len(probes), 3), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark maintenance interval queries')
+    parser.add_argument('--windows', type=int, default=200000)
+    parser.add_argument('--probes', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'maintenance.db')}"
+    os.environ.setdefault('NOTIFICATION_FANOUT_SYNC', 'true')
+
+    from sqlalchemy import and_
+    from app import create_app
+    from models import Maintenance
+    import init_db
+    import schedule
+
+    with contextlib.redirect_stdout(sys.stderr):
+        init_db.init_database()
+        init_db.seed_synthetic(outages=0, areas=200, users=10, notifications=0, maintenance=args.windows)
+
+    app = create_app()
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    probes = [now + timedelta(hours=rng.randint(-365 * 24, 90 * 24)) for _ in range(args.probes)]
+
+    def ids(query):
+        return sorted(row.id for row in query.with_entities(Maintenance.id))
+
+    with app.app_context():
+        results = {}
+        for name, window in (('overlapping_4h', timedelta(hours=4)), ('active_at', None)):
+            if window:
+                before_fn = lambda t: ids(Maintenance.query.filter(
+                    and_(Maintenance.start_time < t + window, Maintenance.end_time > t)))
+                after_fn = lambda t: ids(Maintenance.query.filter(schedule.overlapping(t, t + window)))
+            else:
+                before_fn = lambda t: ids(Maintenance.query.filter(
+                    and_(Maintenance.start_time <= t, Maintenance.end_time > t)))
+                after_fn = lambda t: ids(Maintenance.query.filter(schedule.active_at(t)))
+            before_ms, before = timed(probes, before_fn)
+            after_ms, after = timed(probes, after_fn)
+            assert before == after
+            results[name] = {'before_ms': before_ms, 'after_ms': after_ms,
+                             'speedup': round(before_ms / after_ms, 1),
+                             'avg_matches': round(sum(map(len, after)) / len(after), 1)}
+
+    print(json.dumps({'windows': args.windows, 'probes': args.probes, 'queries': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Full-text search latency against the substring scans it replaces.
+
+Run from backend/:  python -m benchmarks.search [--outages 1000000] [--repeat 20]
+
+Seeds a fresh SQLite database (the FTS index is filled by its triggers as
+rows go in), then times each query both ways: the old ILIKE '%term%' scan
+over title, location and description, and the ranked full-text lookup
+behind /api/outages/search. Prints one JSON object with the best-of-repeat
+milliseconds and match counts (substring and whole-word/prefix matching
+count slightly differently, e.g. 'feeder 12' vs 'Feeder 120').
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+QUERIES = ['transformer', 'subst', 'transformers', 'synthetic', 'lightning river',
+           'vandalism hospital break', 'feeder 12', 'ticket 424242']
+
+
+def best_of(repeat, fn):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 2), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full-text search against ILIKE scans')
+    parser.add_argument('--outages', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'search.db')}"
+    os.environ.setdefault('NOTIFICATION_FANOUT_SYNC', 'true')
+
+    from sqlalchemy import and_, func, or_
+    from app import create_app
+    from models import db, Outage
+    import init_db
+    import search
+
+    with contextlib.redirect_stdout(sys.stderr):
+        init_db.init_database()
+        init_db.seed_synthetic(outages=args.outages, areas=200, users=1000, notifications=0, maintenance=0)
+
+    app = create_app()
+    results = []
+
+    with app.app_context():
+        for text in QUERIES:
+            terms = text.split()
+
+            def scan():
+                clause = and_(*[
+                    or_(Outage.title.ilike(f'%{t}%'), Outage.location.ilike(f'%{t}%'),
+                        Outage.description.ilike(f'%{t}%'))
+                    for t in terms
+                ])
+                ids = [row[0] for row in db.session.query(Outage.id).filter(clause)
+                       .order_by(Outage.id.desc()).limit(args.limit)]
+                return ids, db.session.query(func.count(Outage.id)).filter(clause).scalar()
+
+            def indexed():
+                ids = search.ranked_ids('outages', text, args.limit)
+                return ids, db.session.query(func.count(Outage.id)).filter(search.matching('outages', text)).scalar()
+
+            scan_ms, (_, scan_count) = best_of(max(args.repeat // 10, 1), scan)
+            ranked_ms, _ = best_of(args.repeat, lambda: search.ranked_ids('outages', text, args.limit))
+            _, (_, fts_count) = best_of(1, indexed)
+            results.append({
+                'query': text,
+                'ilike_ms': scan_ms,
+                'fts_top_ms': ranked_ms,
+                'speedup': round(scan_ms / max(ranked_ms, 0.001), 1),
+                'ilike_matches': scan_count,
+                'fts_matches': fts_count
+            })
+
+    print(json.dumps({'outages': args.outages, 'limit': args.limit, 'queries': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Serialization time and bytes on the wire for a large outage list.
+
+Run from backend/:  python -m benchmarks.serialization [--outages 100000] [--repeat 3]
+
+Seeds a fresh SQLite database, loads every outage once through the detail
+profile and then times only turning those rows into a response body:
+Flask's default provider with isoformat() per datetime field (before)
+against FastJSONProvider with datetimes left to the encoder (after). Each
+available encoding is then applied to the body. Prints one JSON object.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def best_of(repeat, fn):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 1), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON serialization and compression')
+    parser.add_argument('--outages', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serialization.db')}"
+    os.environ.setdefault('NOTIFICATION_FANOUT_SYNC', 'true')
+
+    from datetime import datetime
+    from flask.json.provider import DefaultJSONProvider
+    from app import create_app
+    from models import Outage
+    from serializers import outage_profile
+    import compression
+    import init_db
+    import json_provider
+
+    with contextlib.redirect_stdout(sys.stderr):
+        init_db.init_database()
+        init_db.seed_synthetic(outages=args.outages, areas=200, users=1000, notifications=0, maintenance=0)
+
+    app = create_app()
+    profile = outage_profile('detail')
+
+    with app.app_context(), app.test_request_context():
+        rows = profile.apply(Outage.query).order_by(Outage.created_at.desc(), Outage.id.desc()).all()
+
+        def serialize_before():
+            data = []
+            for outage in rows:
+                item = {}
+                for field in profile.fields:
+                    value = getattr(outage, field)
+                    if isinstance(value, datetime):
+                        value = value.isoformat()
+                    item[field] = value
+                data.append(item)
+            return DefaultJSONProvider(app).response(data).get_data()
+
+        def serialize_after():
+            return app.json.response([profile.serialize(outage) for outage in rows]).get_data()
+
+        before_ms, before_body = best_of(args.repeat, serialize_before)
+        after_ms, after_body = best_of(args.repeat, serialize_after)
+        assert json.loads(before_body) == json.loads(after_body)
+
+        encodings = {}
+        levels = app.config['COMPRESS_LEVELS']
+        for name, encode in compression._encoders(levels).items():
+            encode_ms, encoded = best_of(args.repeat, lambda: encode(after_body))
+            encodings[name] = {'bytes': len(encoded), 'encode_ms': encode_ms,
+                               'ratio': round(len(after_body) / len(encoded), 1)}
+
+    print(json.dumps({
+        'outages': len(rows),
+        'encoder': 'orjson' if json_provider.orjson is not None else 'json',
+        'serialize_ms': {'before': before_ms, 'after': after_ms,
+                         'speedup': round(before_ms / after_ms, 1)},
+        'body_bytes': {'before': len(before_body), 'after': len(after_body)},
+        'compressed': encodings
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
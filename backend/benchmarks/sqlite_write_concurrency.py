@@ -0,0 +1,120 @@
+"""Concurrent write throughput on SQLite: default journal vs WAL pragmas.
+
+Run from backend/:  python -m benchmarks.sqlite_write_concurrency [--writers 8] [--readers 4]
+
+Writers insert outages in small transactions while readers keep running
+the newest-first listing query, which is what the API does under load.
+Prints one JSON object with committed writes/sec for each configuration.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, event, text
+from config import Config
+from database import apply_sqlite_pragmas
+from models import db
+
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+def make_engine(path, pragmas):
+    engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 30})
+    
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+    
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO users (username, email, password_hash, role, created_at) "
+            "VALUES ('bench', 'bench@power.com', 'x', 'user', :now)"
+        ), {'now': datetime.utcnow()})
+        connection.execute(text(
+            "INSERT INTO areas (name, code, total_users, created_at) VALUES ('Bench', 'B-1', 0, :now)"
+        ), {'now': datetime.utcnow()})
+    return engine
+
+
+def run(pragmas, writers, readers, writes_per_writer, rows_per_txn):
+    directory = tempfile.mkdtemp()
+    engine = make_engine(os.path.join(directory, 'bench.db'), pragmas)
+    stop = threading.Event()
+    reads = [0]
+    errors = [0]
+    
+    def write():
+        for _ in range(writes_per_writer):
+            try:
+                with engine.begin() as connection:
+                    now = datetime.utcnow()
+                    connection.execute(text(
+                        "INSERT INTO outages (title, description, location, status, priority, "
+                        "affected_users, created_at, updated_at, user_id, area_id) "
+                        "VALUES ('t', 'd', 'l', 'REPORTED', 'MEDIUM', 1, :now, :now, 1, 1)"
+                    ), [{'now': now}] * rows_per_txn)
+            except Exception:
+                errors[0] += 1
+    
+    def read():
+        while not stop.is_set():
+            with engine.connect() as connection:
+                connection.execute(text(
+                    'SELECT * FROM outages ORDER BY created_at DESC, id DESC LIMIT 100'
+                )).fetchall()
+            reads[0] += 1
+    
+    reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=write) for _ in range(writers)]
+    for thread in reader_threads:
+        thread.start()
+    
+    started = time.perf_counter()
+    for thread in writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+    engine.dispose()
+    
+    transactions = writers * writes_per_writer - errors[0]
+    return {
+        'pragmas': pragmas,
+        'seconds': round(elapsed, 3),
+        'write_transactions_per_sec': round(transactions / elapsed, 1),
+        'rows_per_sec': round(transactions * rows_per_txn / elapsed, 1),
+        'reads_completed': reads[0],
+        'write_errors': errors[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writes', type=int, default=200, help='transactions per writer')
+    parser.add_argument('--rows', type=int, default=1, help='rows per transaction')
+    args = parser.parse_args()
+    
+    before = run(DEFAULT_PRAGMAS, args.writers, args.readers, args.writes, args.rows)
+    after = run(Config.SQLITE_PRAGMAS, args.writers, args.readers, args.writes, args.rows)
+    
+    print(json.dumps({
+        'writers': args.writers,
+        'readers': args.readers,
+        'before': before,
+        'after': after,
+        'speedup': round(after['write_transactions_per_sec'] / before['write_transactions_per_sec'], 2)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
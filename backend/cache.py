@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TTLCache:
+    """Small thread-safe memo cache with per-entry expiry.
+
+    With maxsize set it also evicts the least recently used entry.
+    """
+
+    def __init__(self, ttl=5, maxsize=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[1]
+            self._entries.pop(key, None)
+            return None
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            if self.maxsize and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key, factory, ttl=None):
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+# (cache, model classes) pairs invalidated when a commit writes those models
+_watchers = []
+
+
+def invalidate_on_write(cache, *models):
+    _watchers.append((cache, tuple(models)))
+
+
+def mark_written(session, *models):
+    """Record writes that bypass the unit of work (bulk/Core statements)."""
+    session.info.setdefault('written_models', set()).update(models)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_written_models(session, flush_context):
+    written = session.info.setdefault('written_models', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        written.add(type(obj))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_written(session):
+    written = session.info.pop('written_models', None)
+    if not written:
+        return
+    for cache, models in _watchers:
+        if any(issubclass(cls, models) for cls in written):
+            cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written(session):
+    session.info.pop('written_models', None)
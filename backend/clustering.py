@@ -0,0 +1,215 @@
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, case, null, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from models import db, Incident, Outage
+from cache import mark_written
+
+PRIORITY_RANK = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2, 'CRITICAL': 3}
+
+incidents_table = Incident.__table__
+
+ABBREVIATIONS = {
+    'st': 'street', 'rd': 'road', 'ave': 'avenue', 'av': 'avenue',
+    'blvd': 'boulevard', 'dr': 'drive', 'ln': 'lane', 'hwy': 'highway',
+    'nr': 'near', 'opp': 'opposite', 'sq': 'square', 'apt': 'apartment'
+}
+
+
+def normalize_location(location):
+    """Canonical form of a free-text location: 'Main St. & 5th Ave' -> 'main street and 5th avenue'."""
+    tokens = re.findall(r'[a-z0-9]+', (location or '').lower().replace('&', ' and '))
+    return ' '.join(ABBREVIATIONS.get(token, token) for token in tokens)[:200]
+
+
+_STATEMENTS = {}
+
+
+def _statements(dialect):
+    """Clustering statements for a dialect, built once and executed with bound parameters."""
+    if dialect in _STATEMENTS:
+        return _STATEMENTS[dialect]
+
+    table = incidents_table
+    columns = ('title', 'location', 'location_key', 'open_key', 'area_id', 'status', 'priority',
+               'report_count', 'affected_users', 'created_at', 'last_reported_at')
+    values = {column: bindparam(f'new_{column}') for column in columns}
+    by_key = table.c.open_key == bindparam('key')
+    in_window = table.c.last_reported_at.between(bindparam('window_start'), bindparam('window_end'))
+    rank = case(PRIORITY_RANK, value=table.c.priority, else_=1)
+
+    statements = {
+        'release': table.update().where(by_key, ~in_window).values(open_key=null())
+    }
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(table).values(values)
+        incoming = stmt.excluded
+        statements['upsert'] = stmt.on_conflict_do_update(
+            index_elements=['open_key'],
+            set_={
+                'report_count': table.c.report_count + incoming.report_count,
+                'affected_users': table.c.affected_users + incoming.affected_users,
+                'last_reported_at': case(
+                    (incoming.last_reported_at > table.c.last_reported_at, incoming.last_reported_at),
+                    else_=table.c.last_reported_at
+                ),
+                'priority': case((bindparam('rank') > rank, incoming.priority), else_=table.c.priority)
+            },
+            where=in_window
+        ).returning(table.c.id)
+    else:
+        statements.update({
+            'join': table.update().where(by_key, in_window).values(
+                report_count=table.c.report_count + bindparam('new_report_count'),
+                affected_users=table.c.affected_users + bindparam('new_affected_users')
+            ),
+            'join_last_reported': table.update().where(
+                by_key, table.c.last_reported_at < bindparam('new_last_reported_at')
+            ).values(last_reported_at=bindparam('new_last_reported_at')),
+            'join_priority': table.update().where(by_key, rank < bindparam('rank')).values(
+                priority=bindparam('new_priority')
+            ),
+            'open_id': select(table.c.id).where(by_key),
+            'insert': table.insert().values(values)
+        })
+
+    _STATEMENTS[dialect] = statements
+    return statements
+
+
+class IncidentIndex:
+    """Clusters outage reports into incidents, with the database as arbiter.
+
+    The open incident for an (area_id, location key) holds that key in the
+    unique incidents.open_key column. A report joins it when its last report
+    is within the clustering window, otherwise the key is released and a new
+    incident takes it. Joining is a single upsert on open_key, so reports
+    racing in from several workers land in the same incident.
+    """
+
+    def __init__(self, window_minutes=30):
+        self.window = timedelta(minutes=window_minutes)
+
+    def init_app(self, app):
+        self.window = timedelta(minutes=app.config.get('INCIDENT_WINDOW_MINUTES', 30))
+
+    def _clusters(self, reports):
+        # Reports per key in time order; a gap wider than the window starts a new cluster
+        by_key = {}
+        for report in reports:
+            key = (report['area_id'], normalize_location(report['location']))
+            by_key.setdefault(key, []).append(report)
+
+        for key, grouped in by_key.items():
+            grouped.sort(key=lambda report: report['created_at'])
+            cluster = [grouped[0]]
+            for report in grouped[1:]:
+                if report['created_at'] - cluster[-1]['created_at'] > self.window:
+                    yield key, cluster
+                    cluster = [report]
+                else:
+                    cluster.append(report)
+            yield key, cluster
+
+    def _values(self, key, cluster):
+        first = cluster[0]
+        priorities = [report.get('priority') or 'MEDIUM' for report in cluster]
+        return {
+            'title': first['title'],
+            'location': first['location'],
+            'location_key': key[1],
+            'open_key': f'{key[0]}:{key[1]}',
+            'area_id': key[0],
+            'status': 'OPEN',
+            'priority': max(priorities, key=lambda priority: PRIORITY_RANK.get(priority, 1)),
+            'report_count': len(cluster),
+            'affected_users': sum(report.get('affected_users') or 0 for report in cluster),
+            'created_at': first['created_at'],
+            'last_reported_at': cluster[-1]['created_at']
+        }
+
+    def _join(self, connection, values):
+        """Add a cluster to the open incident for its key, or open one; returns the incident id."""
+        # The open incident is joined when its last report is within the
+        # window of the cluster's first report
+        # Bound names must not match columns: UPDATE would SET those columns too
+        params = {f'new_{column}': value for column, value in values.items()}
+        params.update(key=values['open_key'], window_start=values['created_at'] - self.window,
+                      window_end=values['created_at'] + self.window,
+                      rank=PRIORITY_RANK.get(values['priority'], 1))
+        statements = _statements(connection.dialect.name)
+
+        for _ in range(3):
+            if 'upsert' in statements:
+                incident_id = connection.execute(statements['upsert'], params).scalar()
+                if incident_id is not None:
+                    return incident_id
+            elif connection.execute(statements['join'], params).rowcount:
+                connection.execute(statements['join_last_reported'], params)
+                connection.execute(statements['join_priority'], params)
+                return connection.execute(statements['open_id'], params).scalar()
+            else:
+                try:
+                    with connection.begin_nested():
+                        return connection.execute(statements['insert'], params).inserted_primary_key[0]
+                except IntegrityError:
+                    pass
+
+            # The key is held by an incident outside the window: release it and retry
+            connection.execute(statements['release'], params)
+
+        raise RuntimeError(f'Could not assign an incident for {values["open_key"]}')
+
+    def assign(self, reports):
+        """Set 'incident_id' on each report dict, updating incidents in the current session.
+
+        Reports need area_id, location, title, priority, affected_users and
+        created_at. The caller commits.
+        """
+        session = db.session()
+        connection = session.connection()
+        for key, cluster in self._clusters(reports):
+            incident_id = self._join(connection, self._values(key, cluster))
+            for report in cluster:
+                report['incident_id'] = incident_id
+        mark_written(session, Incident)
+
+    def assign_outage(self, outage):
+        report = {
+            'area_id': int(outage.area_id),
+            'location': outage.location,
+            'title': outage.title,
+            'priority': outage.priority,
+            'affected_users': int(outage.affected_users or 0),
+            'created_at': outage.created_at
+        }
+        self.assign([report])
+        outage.incident_id = report['incident_id']
+
+    def outage_removed(self, outage):
+        if not outage.incident_id:
+            return
+        incident = db.session.get(Incident, outage.incident_id)
+        incident.report_count -= 1
+        incident.affected_users -= outage.affected_users or 0
+
+    def outage_resolved(self, outage):
+        """Resolve the parent incident once its last open report is resolved."""
+        if not outage.incident_id:
+            return
+        open_reports = Outage.query.filter(
+            Outage.incident_id == outage.incident_id,
+            Outage.status != 'RESOLVED'
+        ).count()
+        if open_reports:
+            return
+
+        incident = db.session.get(Incident, outage.incident_id)
+        incident.status = 'RESOLVED'
+        incident.resolved_at = datetime.utcnow()
+        incident.open_key = None
+
+
+incident_index = IncidentIndex()
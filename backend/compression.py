@@ -0,0 +1,65 @@
+import gzip
+from flask import request
+
+# Optional encoders; gzip from the standard library is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'}
+
+
+def _encoders(levels):
+    encoders = {}
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=levels.get('zstd', 3))
+        encoders['zstd'] = compressor.compress
+    if brotli is not None:
+        encoders['br'] = lambda data: brotli.compress(data, quality=levels.get('br', 4))
+    encoders['gzip'] = lambda data: gzip.compress(data, compresslevel=levels.get('gzip', 6), mtime=0)
+    return encoders
+
+
+def negotiate(accept_encodings, available):
+    """Pick the encoding the client weights highest, preferring our order on ties."""
+    best = None
+    best_quality = 0
+    for name in available:
+        quality = accept_encodings[name]
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def init_compression(app):
+    """Compress buffered responses above COMPRESS_MIN_SIZE with zstd, br or gzip."""
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    encoders = _encoders(app.config.get('COMPRESS_LEVELS', {}))
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        encoding = negotiate(request.accept_encodings, encoders)
+        if encoding is None:
+            return response
+
+        response.set_data(encoders[encoding](data))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
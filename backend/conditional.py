@@ -0,0 +1,122 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import db, TableVersion
+
+versions_table = TableVersion.__table__
+
+
+def bump_versions(connection, table_names, now=None):
+    now = now or datetime.utcnow()
+    dialect = connection.dialect.name
+    for table_name in sorted(table_names):
+        values = {'table_name': table_name, 'version': 1, 'updated_at': now}
+
+        if dialect in ('sqlite', 'postgresql'):
+            dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = dialect_insert(versions_table).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['table_name'],
+                set_={'version': versions_table.c.version + 1, 'updated_at': now}
+            )
+            connection.execute(stmt)
+            continue
+
+        updated = connection.execute(
+            versions_table.update()
+            .where(versions_table.c.table_name == table_name)
+            .values(version=versions_table.c.version + 1, updated_at=now)
+        )
+        if updated.rowcount == 0:
+            connection.execute(versions_table.insert().values(**values))
+
+
+# Written models are collected by cache.py's flush tracking and mark_written().
+# The bump runs after commit, in its own short transaction, so concurrent
+# writers do not queue on the table_versions row for the length of their
+# transactions. A reader in between sees new rows under the old version
+# for that instant and gets a fresh ETag on its next request.
+@event.listens_for(Session, 'before_commit')
+def _collect_written_tables(session):
+    session.flush()
+    written = session.info.get('written_models')
+    if written:
+        session.info.setdefault('written_tables', set()).update(
+            cls.__tablename__ for cls in written if cls is not TableVersion
+        )
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_written_tables(session):
+    tables = session.info.pop('written_tables', None)
+    if tables:
+        with session.get_bind().begin() as connection:
+            bump_versions(connection, tables)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written_tables(session):
+    session.info.pop('written_tables', None)
+
+
+def table_versions(*models):
+    """Return (version token, last modified) for the given models in one query."""
+    names = [model.__tablename__ for model in models]
+    rows = dict(
+        (row.table_name, (row.version, row.updated_at))
+        for row in db.session.query(TableVersion).filter(TableVersion.table_name.in_(names))
+    )
+    token = '.'.join(str(rows.get(name, (0, None))[0]) for name in names)
+    modified = [updated_at for _, updated_at in rows.values()]
+    return token, max(modified) if modified else None
+
+
+def conditional(*models, clock=None):
+    """Answer If-None-Match / If-Modified-Since with 304 before the view runs.
+
+    The ETag covers the versions of every table the response reads, the
+    request path and query, Accept and the caller, so it changes whenever
+    the rendered payload could. Payloads that also change with time pass
+    clock, a callable returning (token, moment of the last change).
+    Place below @jwt_required().
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            token, last_modified = table_versions(*models)
+            if clock:
+                clock_token, clock_moment = clock()
+                token = f'{token}|{clock_token}'
+                if clock_moment and (not last_modified or clock_moment > last_modified):
+                    last_modified = clock_moment
+            key = f'{request.full_path}|{request.headers.get("Accept", "")}|{get_jwt_identity()}|{token}'
+            etag = hashlib.sha1(key.encode()).hexdigest()
+            if last_modified:
+                last_modified = last_modified.replace(microsecond=0)
+
+            # If-None-Match wins when present: Last-Modified only has second
+            # resolution, so two writes in one second are told apart by the ETag
+            not_modified = (
+                request.if_none_match.contains_weak(etag) if request.if_none_match
+                else bool(last_modified and request.if_modified_since
+                          and last_modified <= request.if_modified_since.replace(tzinfo=None))
+            )
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,24 @@
+import sqlite3
+from sqlalchemy import event
+from models import db
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+def configure_engine(app):
+    """Hook per-connection setup onto the app's engine."""
+    with app.app_context():
+        engine = db.engine
+    
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    pragmas = app.config.get('SQLITE_PRAGMAS', {})
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            apply_sqlite_pragmas(dbapi_connection, pragmas)
@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from collections import deque
+from json_provider import dumps
+
+
+class Subscription:
+    """A subscriber's bounded queue of pending events."""
+
+    def __init__(self, channels, queue_size):
+        self.channels = channels
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # A slow client never blocks publishers; it is told to resync
+            self.overflowed = True
+
+
+class EventBus:
+    """In-process publish/subscribe for live outage and notification deltas.
+
+    Every event gets an id made of the process boot token and a sequence
+    number and is kept in a bounded replay buffer, so a client reconnecting
+    with Last-Event-ID receives exactly what it missed. When the gap can no
+    longer be replayed (buffer wrapped, server restarted) or a subscriber's
+    queue overflows, the client gets a 'resync' event and refetches.
+    """
+
+    def __init__(self, buffer_size=1000, queue_size=256, heartbeat=15):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.boot = format(int(time.time() * 1000), 'x')
+        self._buffer = deque(maxlen=buffer_size)
+        self._sequence = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._buffer = deque(self._buffer, maxlen=app.config.get('EVENT_REPLAY_BUFFER', self._buffer.maxlen))
+        self.queue_size = app.config.get('EVENT_QUEUE_SIZE', self.queue_size)
+        self.heartbeat = app.config.get('EVENT_HEARTBEAT_SECONDS', self.heartbeat)
+        app.extensions['event_bus'] = self
+
+    def publish(self, channel, type, data):
+        # Serialized once, however many subscribers receive it
+        payload = dumps(data)
+        with self._lock:
+            self._sequence += 1
+            event = (self._sequence, channel, type, payload)
+            self._buffer.append(event)
+            subscribers = [sub for sub in self._subscribers if channel in sub.channels]
+        for sub in subscribers:
+            sub.offer(event)
+
+    def subscribe(self, channels, last_event_id=None):
+        """Register a subscriber; returns (subscription, replay events, needs_resync)."""
+        sub = Subscription(set(channels), self.queue_size)
+        replay = []
+        resync = False
+
+        with self._lock:
+            if last_event_id:
+                boot, _, sequence = last_event_id.partition(':')
+                oldest = self._buffer[0][0] if self._buffer else self._sequence + 1
+                if boot != self.boot or not sequence.isdigit() or int(sequence) < oldest - 1:
+                    resync = True
+                else:
+                    replay = [e for e in self._buffer if e[0] > int(sequence) and e[1] in sub.channels]
+            self._subscribers.add(sub)
+
+        return sub, replay, resync
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def format(self, event):
+        sequence, _, type, payload = event
+        return f'id: {self.boot}:{sequence}\nevent: {type}\ndata: {payload}\n\n'
+
+    def stream(self, channels, last_event_id=None):
+        """Yield Server-Sent Events text for the given channels until disconnect."""
+        sub, replay, resync = self.subscribe(channels, last_event_id)
+        try:
+            yield 'retry: 3000\n\n'
+            if resync:
+                yield 'event: resync\ndata: {}\n\n'
+            for event in replay:
+                yield self.format(event)
+
+            while not sub.overflowed:
+                try:
+                    event = sub.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # Keeps proxies from closing an idle stream
+                    yield ': keepalive\n\n'
+                    continue
+                yield self.format(event)
+
+            yield 'event: resync\ndata: {}\n\n'
+        finally:
+            self.unsubscribe(sub)
+
+
+event_bus = EventBus()
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
@@ -0,0 +1,155 @@
+import csv
+import io
+from sqlalchemy import select
+from models import db, Area, Outage
+
+# Arrow IPC and Parquet need pyarrow; CSV is always available
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Outage history as handed to regulators: one row per outage with the
+# inputs of SAIDI/SAIFI (customers affected, start, restoration, customers
+# served in the area). Rows are read CHUNK_SIZE at a time through a
+# streaming cursor and written out chunk by chunk, so memory stays flat
+# however many rows are exported.
+COLUMNS = (
+    ('id', Outage.id, 'int64'),
+    ('area_id', Outage.area_id, 'int64'),
+    ('area_code', Area.code, 'string'),
+    ('area_name', Area.name, 'string'),
+    ('area_total_users', Area.total_users, 'int64'),
+    ('title', Outage.title, 'string'),
+    ('location', Outage.location, 'string'),
+    ('status', Outage.status, 'string'),
+    ('priority', Outage.priority, 'string'),
+    ('affected_users', Outage.affected_users, 'int64'),
+    ('created_at', Outage.created_at, 'timestamp'),
+    ('resolved_at', Outage.resolved_at, 'timestamp'),
+    ('estimated_resolution', Outage.estimated_resolution, 'timestamp'),
+)
+
+# format: (mimetype, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+CHUNK_SIZE = 50000
+
+
+def available_formats():
+    return [name for name in FORMATS if name == 'csv' or pa is not None]
+
+
+def outage_rows(start=None, end=None, area_ids=None, status=None):
+    """Select of the export columns, oldest first; start/end bound created_at as [start, end)."""
+    query = select(*[expression for _, expression, _ in COLUMNS]).join(Area, Outage.area_id == Area.id)
+    if start is not None:
+        query = query.where(Outage.created_at >= start)
+    if end is not None:
+        query = query.where(Outage.created_at < end)
+    if area_ids:
+        query = query.where(Outage.area_id.in_(area_ids))
+    if status:
+        query = query.where(Outage.status == status)
+    return query.order_by(Outage.created_at, Outage.id)
+
+
+def _chunks(query, chunk_size):
+    # yield_per streams from a server-side cursor where the driver has one
+    result = db.session.execute(query.execution_options(yield_per=chunk_size))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def _cell(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def csv_chunks(query, chunk_size=CHUNK_SIZE):
+    """The header, then one block of CSV lines per chunk of rows, as bytes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in COLUMNS])
+    for rows in _chunks(query, chunk_size):
+        writer.writerows([_cell(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _Sink:
+    """Write-only file collecting what pyarrow writes until it is drained."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _schema():
+    types = {'int64': pa.int64(), 'string': pa.string(), 'timestamp': pa.timestamp('us')}
+    return pa.schema([(name, types[kind]) for name, _, kind in COLUMNS])
+
+
+def _batch(schema, rows):
+    columns = list(zip(*rows))
+    return pa.record_batch([pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                           schema=schema)
+
+
+def _arrow_chunks(query, chunk_size, open_writer):
+    schema = _schema()
+    sink = _Sink()
+    writer = open_writer(pa.PythonFile(sink, mode='w'), schema)
+    for rows in _chunks(query, chunk_size):
+        writer.write_batch(_batch(schema, rows))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def arrow_chunks(query, chunk_size=CHUNK_SIZE):
+    """Arrow IPC stream, one record batch per chunk of rows."""
+    return _arrow_chunks(query, chunk_size, pa.ipc.new_stream)
+
+
+def parquet_chunks(query, chunk_size=CHUNK_SIZE):
+    """Parquet file, one row group per chunk of rows."""
+    return _arrow_chunks(query, chunk_size, lambda sink, schema: pq.ParquetWriter(sink, schema, compression='zstd'))
+
+
+def export_chunks(export_format, query, chunk_size=CHUNK_SIZE):
+    """Encoded chunks of query's rows in export_format; ValueError if unavailable."""
+    if export_format not in available_formats():
+        raise ValueError(f'format must be one of: {", ".join(available_formats())}')
+    writers = {'csv': csv_chunks, 'arrow': arrow_chunks, 'parquet': parquet_chunks}
+    return writers[export_format](query, chunk_size)
@@ -0,0 +1,87 @@
+from collections import namedtuple
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, User
+from cache import TTLCache
+
+# What authorization needs from a user, cached so role checks cost no queries
+CachedUser = namedtuple('CachedUser', ['id', 'role'])
+
+user_cache = TTLCache(ttl=60, maxsize=10000)
+
+
+def token_claims(user):
+    """Extra claims for access tokens issued to user."""
+    return {'role': user.role}
+
+
+def cached_user(user_id):
+    user = user_cache.get(user_id)
+    if user is None:
+        row = db.session.query(User.id, User.role).filter_by(id=user_id).first()
+        if row is None:
+            return None
+        user = CachedUser(row.id, row.role)
+        user_cache.set(user_id, user)
+    return user
+
+
+def init_identity(jwt, app):
+    user_cache.ttl = app.config.get('USER_CACHE_TTL', user_cache.ttl)
+    user_cache.maxsize = app.config.get('USER_CACHE_SIZE', user_cache.maxsize)
+
+    @jwt.user_lookup_loader
+    def load_user(jwt_header, jwt_data):
+        return cached_user(jwt_data['sub'])
+
+    @jwt.user_lookup_error_loader
+    def user_not_found(jwt_header, jwt_data):
+        return jsonify({'error': 'User not found'}), 401
+
+    # Tokens from before a role change are refused until the user logs in again
+    @jwt.token_verification_loader
+    def claims_current(jwt_header, jwt_data):
+        if 'role' not in jwt_data:
+            return True
+        user = cached_user(jwt_data['sub'])
+        return user is None or user.role == jwt_data['role']
+
+    @jwt.token_verification_failed_loader
+    def claims_stale(jwt_header, jwt_data):
+        return jsonify({'error': 'Token is out of date, please log in again'}), 401
+
+
+def is_admin():
+    return current_user.role == 'admin'
+
+
+def admin_required(view):
+    """Reject non-admins with 403; place below @jwt_required()."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin():
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_written_users(session, flush_context):
+    written = session.info.setdefault('written_users', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            written.add(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_written_users(session):
+    for user_id in session.info.pop('written_users', ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written_users(session):
+    session.info.pop('written_users', None)
@@ -0,0 +1,96 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, insert, literal, select
+from models import db, User, Notification, NotificationArchive
+
+users_table = User.__table__
+notifications_table = Notification.__table__
+archive_table = NotificationArchive.__table__
+
+ARCHIVED_COLUMNS = ('id', 'title', 'message', 'type', 'created_at', 'user_id')
+
+
+def apply_unread_deltas(connection, deltas):
+    """Add {user_id: delta} to users.unread_notifications, one UPDATE per distinct delta."""
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+
+    for delta, user_ids in by_delta.items():
+        connection.execute(
+            users_table.update()
+            .where(users_table.c.id.in_(user_ids))
+            .values(unread_notifications=users_table.c.unread_notifications + delta)
+        )
+
+
+# ORM inserts and deletes keep the counter current on their own; bulk
+# statements and read-state changes call apply_unread_deltas explicitly
+@event.listens_for(Notification, 'after_insert')
+def _count_insert(mapper, connection, target):
+    if not target.is_read:
+        apply_unread_deltas(connection, {target.user_id: 1})
+
+
+@event.listens_for(Notification, 'after_delete')
+def _count_delete(mapper, connection, target):
+    if not target.is_read:
+        apply_unread_deltas(connection, {target.user_id: -1})
+
+
+def mark_read(user_id, notification_ids=None):
+    """Mark a user's notifications read (all of them when ids is None); returns how many changed."""
+    query = Notification.query.filter_by(user_id=user_id, is_read=False)
+    if notification_ids is not None:
+        query = query.filter(Notification.id.in_(notification_ids))
+
+    # Only rows that were unread count, so concurrent calls cannot double-decrement
+    changed = query.update({'is_read': True}, synchronize_session=False)
+    apply_unread_deltas(db.session.connection(), {user_id: -changed})
+    return changed
+
+
+def recount_unread():
+    """Rebuild every user's counter from the notifications table."""
+    unread = (
+        select(func.count())
+        .where(notifications_table.c.user_id == users_table.c.id,
+               notifications_table.c.is_read.is_(False))
+        .scalar_subquery()
+    )
+    db.session.execute(users_table.update().values(unread_notifications=unread))
+    db.session.commit()
+
+
+def archive_read(older_than_days, batch_size=5000):
+    """Move read notifications older than the cutoff to notifications_archive.
+
+    Works in batches of batch_size, one transaction each, so the inbox table
+    is never locked for long. Returns the number of rows moved.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = 0
+
+    while True:
+        ids = db.session.execute(
+            select(notifications_table.c.id)
+            .where(notifications_table.c.is_read.is_(True),
+                   notifications_table.c.created_at < cutoff)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+
+        columns = [notifications_table.c[name] for name in ARCHIVED_COLUMNS]
+        db.session.execute(
+            insert(archive_table).from_select(
+                list(ARCHIVED_COLUMNS) + ['archived_at'],
+                select(*columns, literal(datetime.utcnow(), db.DateTime)).where(notifications_table.c.id.in_(ids))
+            )
+        )
+        db.session.execute(notifications_table.delete().where(notifications_table.c.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+
+    return moved
@@ -0,0 +1,133 @@
+import json
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from models import db, Area, Outage
+from cache import mark_written
+import rollups
+from clustering import incident_index
+
+PRIORITIES = {'LOW', 'MEDIUM', 'HIGH', 'CRITICAL'}
+REQUIRED_FIELDS = ('title', 'description', 'location', 'area_id')
+
+
+class IngestError(ValueError):
+    pass
+
+
+def parse_ndjson(body):
+    """Yield (item, error) per non-blank line of an NDJSON body."""
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError:
+            yield None, f'Line {number} is not valid JSON'
+
+
+def parse_body(request):
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+        return list(parse_ndjson(request.get_data(as_text=True)))
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('outages')
+    if not isinstance(data, list):
+        raise IngestError('Expected a JSON array of outages or an NDJSON body')
+    return [(item, None) for item in data]
+
+
+def validate(parsed, user_id, now):
+    """Check every item in one pass; returns (rows, results).
+
+    rows holds (index, column values) for valid items, results has an error
+    entry for every rejected item.
+    """
+    results = []
+    candidates = []
+    area_ids = set()
+
+    for index, (item, error) in enumerate(parsed):
+        if error is None and not isinstance(item, dict):
+            error = 'Each outage must be a JSON object'
+        if error is None:
+            missing = [field for field in REQUIRED_FIELDS if not item.get(field)]
+            if missing:
+                error = f'Missing required fields: {", ".join(missing)}'
+        if error is None:
+            priority = item.get('priority') or 'MEDIUM'
+            if priority not in PRIORITIES:
+                error = f'Invalid priority "{priority}"'
+        if error is None:
+            try:
+                area_id = int(item['area_id'])
+                affected_users = int(item.get('affected_users') or 0)
+                created_at = datetime.fromisoformat(item['created_at']) if item.get('created_at') else now
+            except (TypeError, ValueError):
+                error = 'area_id and affected_users must be integers and created_at ISO 8601'
+            else:
+                # Stored timestamps are naive UTC
+                if created_at.tzinfo:
+                    created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+        if error is not None:
+            results.append({'index': index, 'status': 'error', 'error': error})
+            continue
+
+        area_ids.add(area_id)
+        candidates.append((index, {
+            'title': str(item['title'])[:200],
+            'description': str(item['description']),
+            'location': str(item['location'])[:200],
+            'status': 'REPORTED',
+            'priority': priority,
+            'affected_users': affected_users,
+            'created_at': created_at,
+            'updated_at': now,
+            'user_id': user_id,
+            'area_id': area_id
+        }))
+
+    # One lookup for every referenced area
+    known_areas = set()
+    if area_ids:
+        known_areas = {row[0] for row in db.session.query(Area.id).filter(Area.id.in_(area_ids))}
+
+    rows = []
+    for index, values in candidates:
+        if values['area_id'] not in known_areas:
+            results.append({'index': index, 'status': 'error', 'error': f'Unknown area_id {values["area_id"]}'})
+        else:
+            rows.append((index, values))
+
+    return rows, results
+
+
+def insert_outages(rows, chunk_size):
+    """Insert validated rows, one transaction per chunk; returns created results."""
+    created = []
+    stmt = insert(Outage).returning(Outage.id, sort_by_parameter_order=True)
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        values = [row for _, row in chunk]
+
+        # Group the chunk into incidents before insert; sets row['incident_id']
+        incident_index.assign(values)
+
+        # ids come back in the order of values, even across insertmanyvalues batches
+        ids = db.session.execute(stmt, values).scalars().all()
+
+        # Bulk statements skip the mapper events that keep rollups current
+        rollups.apply_deltas(db.session.connection(), rollups.outage_deltas(
+            (row['created_at'], row['area_id'], row['priority'], row['status']) for row in values
+        ))
+        mark_written(db.session, Outage)
+        db.session.commit()
+
+        created.extend(
+            {'index': index, 'status': 'created', 'id': outage_id}
+            for (index, _), outage_id in zip(chunk, ids)
+        )
+
+    return created
@@ -1,6 +1,28 @@
+import argparse
+import random
 from app import create_app
-from models import db, User, Area, Outage, Notification, Maintenance
+from models import db, User, Area, AreaCity, Outage, Notification, Maintenance, MaintenanceArea
+from migrate import stamp
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
+import reliability
+import rollups
+import inbox
+import schedule
+import search
+from cache import mark_written
+
+STATUSES = ['REPORTED', 'IN_PROGRESS', 'RESOLVED']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+
+# Word pools for synthetic descriptions, so text search sees realistic selectivity
+CAUSES = ['storm', 'lightning', 'wind', 'ice', 'flooding', 'heatwave', 'vehicle collision',
+          'tree contact', 'animal contact', 'equipment failure', 'overload', 'vandalism']
+EQUIPMENT = ['transformer', 'substation', 'feeder', 'breaker', 'insulator', 'cable',
+             'pole', 'recloser', 'switchgear', 'meter', 'fuse', 'conductor']
+PLACES = ['street', 'avenue', 'park', 'school', 'hospital', 'bridge', 'market',
+          'station', 'harbour', 'industrial estate', 'river', 'highway']
 
 def init_database():
     app = create_app()
@@ -9,6 +31,10 @@ def init_database():
         # Drop all tables and recreate
         db.drop_all()
         db.create_all()
+        with db.engine.begin() as connection:
+            search.install(connection)
+            schedule.install(connection)
+        stamp()
         
         print("Creating default users...")
         
@@ -163,7 +189,7 @@ def init_database():
                 'start_time': datetime.utcnow() + timedelta(days=7),
                 'end_time': datetime.utcnow() + timedelta(days=7, hours=6),
                 'status': 'SCHEDULED',
-                'affected_areas': f'{areas[0].id},{areas[1].id}'
+                'areas': [areas[0], areas[1]]
             },
             {
                 'title': 'Cable Replacement',
@@ -172,7 +198,7 @@ def init_database():
                 'start_time': datetime.utcnow() + timedelta(days=14),
                 'end_time': datetime.utcnow() + timedelta(days=14, hours=8),
                 'status': 'SCHEDULED',
-                'affected_areas': f'{areas[4].id}'
+                'areas': [areas[4]]
             }
         ]
         
@@ -187,5 +213,154 @@ def init_database():
         print("Admin - Email: admin@power.com, Password: admin123")
         print("User - Email: user@power.com, Password: user123")
 
+def _insert_chunked(model, rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(model), chunk)
+            mark_written(db.session, model)
+            db.session.commit()
+            chunk = []
+    if chunk:
+        db.session.execute(insert(model), chunk)
+        mark_written(db.session, model)
+        db.session.commit()
+
+def seed_synthetic(outages=10000, areas=200, users=1000, notifications=20000,
+                   maintenance=500, days=365, seed=42, chunk_size=5000, app=None):
+    """Add synthetic load-test data on top of the default seed.
+    
+    Synthetic users are synth_<n>@power.com with password 'user123'.
+    """
+    app = app or create_app()
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    
+    with app.app_context():
+        print(f"Seeding {areas} areas, {users} users, {outages} outages...")
+        
+        _insert_chunked(Area, (
+            {
+                'name': f'Synthetic Area {n}',
+                'code': f'SYN-{n:05d}',
+                'description': f'Synthetic service area {n}',
+                'total_users': rng.randint(1000, 50000),
+                'created_at': now
+            }
+            for n in range(areas)
+        ), chunk_size)
+        
+        # Hashing is deliberately slow; every synthetic user shares one hash
+        password_hash = generate_password_hash('user123')
+        _insert_chunked(User, (
+            {
+                'username': f'synth_{n}',
+                'email': f'synth_{n}@power.com',
+                'password_hash': password_hash,
+                'role': 'user',
+                'created_at': now
+            }
+            for n in range(users)
+        ), chunk_size)
+        
+        area_ids = [row[0] for row in db.session.query(Area.id)]
+        user_ids = [row[0] for row in db.session.query(User.id)]
+        
+        synthetic_areas = db.session.query(Area.id, Area.code).filter(Area.code.like('SYN-%'))
+        _insert_chunked(AreaCity, (
+            {'area_id': area_id, 'position': c, 'name': name, 'name_key': AreaCity.key(name)}
+            for area_id, code in synthetic_areas.all()
+            for c, name in enumerate(f'City {int(code[4:])}-{c}' for c in range(3))
+        ), chunk_size)
+        
+        def outage_rows():
+            for n in range(outages):
+                created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+                status = rng.choice(STATUSES)
+                resolved_at = None
+                if status == 'RESOLVED':
+                    resolved_at = min(created_at + timedelta(minutes=rng.randint(10, 2880)), now)
+                yield {
+                    'title': f'Synthetic outage {n}',
+                    'description': (
+                        f'{rng.choice(CAUSES).capitalize()} damaged a {rng.choice(EQUIPMENT)} near the '
+                        f'{rng.choice(PLACES)}; crews report {rng.choice(EQUIPMENT)} and '
+                        f'{rng.choice(EQUIPMENT)} checks after {rng.choice(CAUSES)} (ticket {n}).'
+                    ),
+                    'location': f'Feeder {rng.randint(1, 500)}',
+                    'status': status,
+                    'priority': rng.choice(PRIORITIES),
+                    'affected_users': rng.randint(1, 5000),
+                    'resolved_at': resolved_at,
+                    'created_at': created_at,
+                    'updated_at': resolved_at or created_at,
+                    'user_id': rng.choice(user_ids),
+                    'area_id': rng.choice(area_ids)
+                }
+        
+        _insert_chunked(Outage, outage_rows(), chunk_size)
+        
+        print(f"Seeding {notifications} notifications and {maintenance} maintenance windows...")
+        
+        _insert_chunked(Notification, (
+            {
+                'title': 'Outage Updated',
+                'message': f'Synthetic notification {n}',
+                'type': 'INFO',
+                'is_read': rng.random() < 0.7,
+                'created_at': now - timedelta(seconds=rng.randint(0, days * 86400)),
+                'user_id': rng.choice(user_ids)
+            }
+            for n in range(notifications)
+        ), chunk_size)
+        
+        def maintenance_rows():
+            for n in range(maintenance):
+                start_time = now + timedelta(hours=rng.randint(-days * 24, 90 * 24))
+                yield {
+                    'title': f'Synthetic maintenance {n}',
+                    'description': 'Synthetic maintenance window',
+                    'location': f'Substation {rng.randint(1, 100)}',
+                    'start_time': start_time,
+                    'end_time': start_time + timedelta(hours=rng.randint(1, 12)),
+                    'status': 'SCHEDULED',
+                    'created_at': now
+                }
+        
+        _insert_chunked(Maintenance, maintenance_rows(), chunk_size)
+        
+        synthetic_maintenance = db.session.query(Maintenance.id).filter(Maintenance.title.like('Synthetic maintenance %'))
+        _insert_chunked(MaintenanceArea, (
+            {'maintenance_id': maintenance_id, 'area_id': area_id}
+            for (maintenance_id,) in synthetic_maintenance.all()
+            for area_id in rng.sample(area_ids, min(3, len(area_ids)))
+        ), chunk_size)
+        
+        # Bulk inserts bypass the ORM events that maintain the rollups and
+        # unread counters
+        rollups.backfill()
+        reliability.backfill()
+        db.session.commit()
+        inbox.recount_unread()
+        
+        print("\n✅ Synthetic data seeded")
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Initialize the outage database')
+    parser.add_argument('--synthetic', action='store_true', help='also seed synthetic load-test data')
+    parser.add_argument('--outages', type=int, default=10000)
+    parser.add_argument('--areas', type=int, default=200)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--notifications', type=int, default=20000)
+    parser.add_argument('--maintenance', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
     init_database()
+    if args.synthetic:
+        seed_synthetic(
+            outages=args.outages, areas=args.areas, users=args.users,
+            notifications=args.notifications, maintenance=args.maintenance,
+            seed=args.seed
+        )
@@ -0,0 +1,106 @@
+from time import perf_counter
+from flask import g, has_request_context, jsonify, request
+from sqlalchemy import event
+from models import db
+
+from request_metrics import CONTENT_TYPE, Metrics, RequestRecorder
+
+# Opt-in per-endpoint request metrics (INSTRUMENTATION=true). For every
+# request: wall time, SQL statements and their time, ORM rows loaded and the
+# time spent encoding the JSON body. Sampled requests run under cProfile and
+# the profile is kept when they turn out slow. GET /api/metrics serves the
+# totals in Prometheus text format, GET /api/metrics/slow the kept profiles;
+# both require METRICS_TOKEN as a bearer token. Metrics are per process.
+
+
+def _sample():
+    return getattr(g, '_instrumentation', None) if has_request_context() else None
+
+
+def _add(name, amount):
+    sample = _sample()
+    if sample is not None:
+        sample[name] += amount
+
+
+def _count_row(target, context):
+    _add('rows', 1)
+
+
+def init_instrumentation(app):
+    """Record per-endpoint request metrics when INSTRUMENTATION is enabled."""
+    if not app.config.get('INSTRUMENTATION'):
+        return app
+
+    metrics = Metrics(app.config.get('METRICS_NAMESPACE', 'outages_api'), app.config.get('SLOW_PROFILE_KEEP', 20),
+                      rows_help='ORM rows loaded from query results.')
+    recorder = RequestRecorder(metrics, app.logger, app.config.get('SLOW_REQUEST_MS', 500),
+                               app.config.get('PROFILE_SAMPLE_RATE', 0.05), app.config.get('METRICS_TOKEN'))
+    app.extensions['instrumentation'] = metrics
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('instrumentation_started', []).append(perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['instrumentation_started'].pop()
+        sample = _sample()
+        if sample is not None:
+            sample['statements'] += 1
+            sample['sql'] += perf_counter() - started
+
+    if not event.contains(db.Model, 'load', _count_row):
+        event.listen(db.Model, 'load', _count_row, propagate=True)
+
+    encode = app.json.response
+
+    def timed_response(*args, **kwargs):
+        started = perf_counter()
+        try:
+            return encode(*args, **kwargs)
+        finally:
+            _add('serialize', perf_counter() - started)
+
+    app.json.response = timed_response
+
+    def endpoint():
+        return request.url_rule.rule if request.url_rule else 'unmatched'
+
+    @app.before_request
+    def start_request():
+        g._instrumentation = recorder.start(endpoint())
+        g._instrumentation['status'] = 500
+
+    @app.after_request
+    def record_status(response):
+        sample = _sample()
+        if sample is not None:
+            sample['status'] = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request(error=None):
+        sample = g.pop('_instrumentation', None)
+        if sample is not None:
+            recorder.finish(sample, request.method, endpoint(), request.full_path.rstrip('?'), sample['status'])
+
+    def authorized():
+        return recorder.authorized(request.headers.get('Authorization'))
+
+    @app.route('/api/metrics')
+    def metrics_view():
+        if not authorized():
+            return jsonify({'error': 'Not found'}), 404
+        return app.response_class(metrics.render(), content_type=CONTENT_TYPE)
+
+    @app.route('/api/metrics/slow')
+    def slow_requests_view():
+        if not authorized():
+            return jsonify({'error': 'Not found'}), 404
+        return jsonify(list(metrics.profiles))
+
+    return app
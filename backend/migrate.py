@@ -0,0 +1,318 @@
+import sys
+from datetime import datetime
+from sqlalchemy import Column, ForeignKeyConstraint, Index, MetaData, Table, inspect, text
+from app import create_app
+from models import db, AreaCity, MaintenanceArea, split_list
+import reliability
+import schedule
+import search
+
+# Versioned schema changes for databases created before a model change.
+# New tables are picked up by db.create_all(); migrations cover indexes,
+# columns and data on existing tables.
+MIGRATIONS = []
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+def _create_indexes(connection, *indexes, unique=False):
+    # Each migration names the indexes it owns as (name, table, columns)
+    # rather than reading the models, which may describe later columns
+    for name, table, columns in indexes:
+        table = Table(table, MetaData(), *[Column(column) for column in columns])
+        Index(name, *table.c, unique=unique).create(bind=connection, checkfirst=True)
+
+@migration(1, 'Composite indexes for hot outage and notification queries')
+def add_hot_path_indexes(connection):
+    _create_indexes(
+        connection,
+        ('ix_outages_created_id', 'outages', ('created_at', 'id')),
+        ('ix_outages_status_created', 'outages', ('status', 'created_at')),
+        ('ix_outages_area_status', 'outages', ('area_id', 'status')),
+        ('ix_outages_user_created', 'outages', ('user_id', 'created_at')),
+        ('ix_notifications_user_read_created', 'notifications', ('user_id', 'is_read', 'created_at'))
+    )
+
+@migration(2, 'Link outages to clustered incidents')
+def add_outage_incident_id(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('outages')}
+    if 'incident_id' not in columns:
+        connection.execute(text('ALTER TABLE outages ADD COLUMN incident_id INTEGER REFERENCES incidents (id)'))
+    _create_indexes(
+        connection,
+        ('ix_outages_incident', 'outages', ('incident_id',)),
+        ('ix_incidents_area_key_status', 'incidents', ('area_id', 'location_key', 'status')),
+        ('ix_incidents_created_id', 'incidents', ('created_at', 'id'))
+    )
+
+@migration(3, 'Unread notification counters and inbox indexes')
+def add_unread_counters(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('users')}
+    if 'unread_notifications' not in columns:
+        connection.execute(text(
+            'ALTER TABLE users ADD COLUMN unread_notifications INTEGER NOT NULL DEFAULT 0'
+        ))
+    _create_indexes(
+        connection,
+        ('ix_notifications_user_created_id', 'notifications', ('user_id', 'created_at', 'id')),
+        ('ix_notifications_read_created', 'notifications', ('is_read', 'created_at')),
+        ('ix_notifications_archive_user_created_id', 'notifications_archive', ('user_id', 'created_at', 'id'))
+    )
+    connection.execute(text(
+        'UPDATE users SET unread_notifications = ('
+        'SELECT COUNT(*) FROM notifications '
+        'WHERE notifications.user_id = users.id AND notifications.is_read = :is_read)'
+    ), {'is_read': False})
+
+@migration(4, 'Full-text search indexes for outages and areas')
+def add_search_indexes(connection):
+    search.install(connection)
+
+@migration(5, 'Area cities and maintenance areas as indexed association tables')
+def normalize_area_lists(connection):
+    _create_indexes(
+        connection,
+        ('ix_area_cities_name_key', 'area_cities', ('name_key', 'area_id')),
+        ('ix_maintenance_areas_area', 'maintenance_areas', ('area_id', 'maintenance_id'))
+    )
+    
+    if 'cities' in {column['name'] for column in inspect(connection).get_columns('areas')}:
+        rows = connection.execute(text('SELECT id, cities FROM areas')).all()
+        values = [
+            {'area_id': area_id, 'position': position, 'name': name, 'name_key': AreaCity.key(name)}
+            for area_id, cities in rows
+            for position, name in enumerate(split_list(cities))
+        ]
+        if values:
+            connection.execute(AreaCity.__table__.insert(), values)
+        # The areas full-text index covered the column; rebuild it without
+        search.uninstall(connection, ['areas'])
+        connection.execute(text('ALTER TABLE areas DROP COLUMN cities'))
+        search.install(connection)
+    
+    if 'affected_areas' in {column['name'] for column in inspect(connection).get_columns('maintenance')}:
+        area_ids = {row[0] for row in connection.execute(text('SELECT id FROM areas'))}
+        values = []
+        for maintenance_id, affected in connection.execute(text('SELECT id, affected_areas FROM maintenance')):
+            linked = {int(item) for item in split_list(affected) if item.isdigit()} & area_ids
+            values.extend({'maintenance_id': maintenance_id, 'area_id': area_id} for area_id in sorted(linked))
+        if values:
+            connection.execute(MaintenanceArea.__table__.insert(), values)
+        connection.execute(text('ALTER TABLE maintenance DROP COLUMN affected_areas'))
+
+@migration(6, 'Interval index for maintenance windows; status follows the clock')
+def add_maintenance_intervals(connection):
+    _create_indexes(
+        connection,
+        ('ix_maintenance_start_end', 'maintenance', ('start_time', 'end_time')),
+        ('ix_maintenance_end', 'maintenance', ('end_time',))
+    )
+    schedule.install(connection)
+    # Only CANCELLED and COMPLETED are stored overrides now
+    connection.execute(text(
+        "UPDATE maintenance SET status = 'SCHEDULED' WHERE status = 'IN_PROGRESS'"
+    ))
+
+@migration(7, 'Reliability rollups for SAIDI/SAIFI/CAIDI')
+def add_reliability_rollups(connection):
+    reliability.backfill(connection)
+
+@migration(8, 'Unique open-incident key so workers cluster reports into one incident')
+def add_incident_open_key(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('incidents')}
+    if 'open_key' not in columns:
+        connection.execute(text('ALTER TABLE incidents ADD COLUMN open_key VARCHAR(255)'))
+    # Workers could each have opened an incident for the same key; the newest keeps it
+    rows = connection.execute(text(
+        "SELECT MAX(id), area_id, location_key FROM incidents WHERE status = 'OPEN' GROUP BY area_id, location_key"
+    )).all()
+    if rows:
+        connection.execute(
+            text('UPDATE incidents SET open_key = :open_key WHERE id = :id'),
+            [{'id': incident_id, 'open_key': f'{area_id}:{location_key}'} for incident_id, area_id, location_key in rows]
+        )
+    _create_indexes(connection, ('ux_incidents_open_key', 'incidents', ('open_key',)), unique=True)
+
+@migration(9, 'Never reuse notification ids on SQLite, archived rows keep them')
+def add_notifications_autoincrement(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    created = connection.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'notifications'"
+    )).scalar()
+    if 'AUTOINCREMENT' in created.upper():
+        return
+
+    # SQLite cannot change a primary key in place: rebuild the table
+    metadata = MetaData()
+    old = Table('notifications', metadata, autoload_with=connection)
+    indexes = [(index.name, [column.name for column in index.columns], index.unique) for index in old.indexes]
+    connection.execute(text('ALTER TABLE notifications RENAME TO notifications_rebuild'))
+
+    metadata = MetaData()
+    Table('users', metadata, autoload_with=connection)
+    new = Table(
+        'notifications', metadata,
+        *[Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable,
+                 server_default=column.server_default) for column in old.columns],
+        *[ForeignKeyConstraint([fk.parent.name], [fk.target_fullname]) for fk in old.foreign_keys],
+        sqlite_autoincrement=True
+    )
+    new.create(bind=connection)
+    names = ', '.join(column.name for column in old.columns)
+    connection.execute(text(f'INSERT INTO notifications ({names}) SELECT {names} FROM notifications_rebuild'))
+    connection.execute(text('DROP TABLE notifications_rebuild'))
+    for name, columns, unique in indexes:
+        Index(name, *[new.c[column] for column in columns], unique=unique).create(bind=connection)
+
+    # New ids start above every id handed out so far, archived ones included;
+    # notifications that already reused an archived id move above them too
+    top = connection.execute(text(
+        'SELECT MAX(COALESCE((SELECT MAX(id) FROM notifications), 0), '
+        'COALESCE((SELECT MAX(id) FROM notifications_archive), 0))'
+    )).scalar()
+    reused = connection.execute(text(
+        'SELECT id FROM notifications WHERE id IN (SELECT id FROM notifications_archive) ORDER BY id'
+    )).scalars().all()
+    for new_id, old_id in enumerate(reused, start=top + 1):
+        connection.execute(text('UPDATE notifications SET id = :new_id WHERE id = :old_id'),
+                           {'new_id': new_id, 'old_id': old_id})
+    connection.execute(text("DELETE FROM sqlite_sequence WHERE name = 'notifications'"))
+    connection.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('notifications', :seq)"),
+                       {'seq': top + len(reused)})
+
+def _ensure_version_table(connection):
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version INTEGER PRIMARY KEY, description VARCHAR(200), applied_at TIMESTAMP)'
+    ))
+
+def applied_versions(connection):
+    _ensure_version_table(connection)
+    return {row[0] for row in connection.execute(text('SELECT version FROM schema_migrations'))}
+
+def _record(connection, version, description):
+    connection.execute(
+        text('INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)'),
+        {'v': version, 'd': description, 't': datetime.utcnow()}
+    )
+
+def upgrade():
+    db.create_all()
+
+    applied = []
+    with db.engine.begin() as connection:
+        done = applied_versions(connection)
+        for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in done:
+                continue
+            fn(connection)
+            _record(connection, version, description)
+            applied.append((version, description))
+
+    return applied
+
+def stamp():
+    """Mark every migration as applied (for databases built by create_all)."""
+    with db.engine.begin() as connection:
+        done = applied_versions(connection)
+        for version, description, fn in MIGRATIONS:
+            if version not in done:
+                _record(connection, version, description)
+
+# Hot query shapes that must be answered from an index, never a table scan
+HOT_QUERIES = {
+    'outages_newest_first': (
+        'SELECT * FROM outages ORDER BY created_at DESC, id DESC LIMIT 100', {}
+    ),
+    'outages_by_status': (
+        'SELECT * FROM outages WHERE status = :status ORDER BY created_at DESC LIMIT 100',
+        {'status': 'REPORTED'}
+    ),
+    'outages_by_area_status': (
+        'SELECT * FROM outages WHERE area_id = :area_id AND status = :status',
+        {'area_id': 1, 'status': 'REPORTED'}
+    ),
+    'outages_by_reporter': (
+        'SELECT * FROM outages WHERE user_id = :user_id ORDER BY created_at DESC LIMIT 100',
+        {'user_id': 1}
+    ),
+    'notifications_inbox_page': (
+        'SELECT * FROM notifications WHERE user_id = :user_id '
+        'ORDER BY created_at DESC, id DESC LIMIT 50',
+        {'user_id': 1}
+    ),
+    'maintenance_by_area': (
+        'SELECT maintenance.* FROM maintenance JOIN maintenance_areas '
+        'ON maintenance_areas.maintenance_id = maintenance.id WHERE maintenance_areas.area_id = :area_id',
+        {'area_id': 1}
+    ),
+    'areas_by_city': (
+        'SELECT areas.* FROM areas JOIN area_cities ON area_cities.area_id = areas.id '
+        'WHERE area_cities.name_key = :name_key',
+        {'name_key': 'downtown'}
+    ),
+    'notifications_unread': (
+        'SELECT * FROM notifications WHERE user_id = :user_id AND is_read = :is_read '
+        'ORDER BY created_at DESC LIMIT 50',
+        {'user_id': 1, 'is_read': False}
+    ),
+}
+
+def _sqlite_full_scan(sql, plan):
+    # SEARCH is an index lookup. SCAN is only acceptable for an unfiltered
+    # query, as an index walk that already yields the requested order (no
+    # temp b-tree sort); with a WHERE clause it reads the whole table or index
+    scans = [line for line in plan if line.startswith('SCAN')]
+    if scans and ' WHERE ' in sql:
+        return True
+    if any('INDEX' not in line for line in scans):
+        return True
+    return bool(scans) and any('TEMP B-TREE' in line for line in plan)
+
+def explain_hot_queries():
+    """Return {name: (plan lines, full_scan)} for each hot query."""
+    dialect = db.engine.dialect.name
+    results = {}
+
+    with db.engine.begin() as connection:
+        if dialect == 'postgresql':
+            # Small tables make a seq scan cheapest; ask whether an index path exists
+            connection.execute(text('SET LOCAL enable_seqscan = off'))
+
+        for name, (sql, params) in HOT_QUERIES.items():
+            if dialect == 'sqlite':
+                plan = [row[-1] for row in connection.execute(text('EXPLAIN QUERY PLAN ' + sql), params)]
+                full_scan = _sqlite_full_scan(sql, plan)
+            elif dialect == 'postgresql':
+                plan = [row[0] for row in connection.execute(text('EXPLAIN ' + sql), params)]
+                full_scan = any('Seq Scan' in line for line in plan)
+            else:
+                raise RuntimeError(f'EXPLAIN check is not implemented for {dialect}')
+            results[name] = (plan, full_scan)
+
+    return results
+
+def check():
+    failures = 0
+    for name, (plan, full_scan) in explain_hot_queries().items():
+        print(f"{'FULL SCAN' if full_scan else 'ok':>9}  {name}")
+        for line in plan:
+            print(f'           {line}')
+        failures += full_scan
+    return failures
+
+if __name__ == '__main__':
+    app = create_app()
+
+    with app.app_context():
+        if '--check' in sys.argv:
+            sys.exit(1 if check() else 0)
+
+        applied = upgrade()
+        for version, description in applied:
+            print(f'Applied {version}: {description}')
+        print(f"\n✅ Database is up to date ({len(applied)} migration(s) applied)")
@@ -4,6 +4,13 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+def split_list(value):
+    """Accept a list or a comma-separated string; return stripped, non-empty items."""
+    if value is None:
+        return []
+    items = value if isinstance(value, (list, tuple)) else str(value).split(',')
+    return [str(item).strip() for item in items if str(item).strip()]
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -16,6 +23,9 @@ class User(db.Model):
     role = db.Column(db.String(20), default='user')  # 'user' or 'admin'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Counter cache kept in step with notification writes (see inbox.py)
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Relationships
     outages = db.relationship('Outage', backref='reporter', lazy=True, foreign_keys='Outage.user_id')
     notifications = db.relationship('Notification', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -44,12 +54,24 @@ class Area(db.Model):
     name = db.Column(db.String(100), nullable=False)
     code = db.Column(db.String(20), unique=True, nullable=False)
     description = db.Column(db.Text)
-    cities = db.Column(db.String(500))  # Comma-separated cities
     total_users = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     outages = db.relationship('Outage', backref='area', lazy=True)
+    city_rows = db.relationship('AreaCity', order_by='AreaCity.position', lazy='selectin',
+                                cascade='all, delete-orphan')
+    
+    @property
+    def cities(self):
+        return [city.name for city in self.city_rows]
+    
+    @cities.setter
+    def cities(self, value):
+        self.city_rows = [
+            AreaCity(position=position, name=name, name_key=AreaCity.key(name))
+            for position, name in enumerate(split_list(value))
+        ]
     
     def to_dict(self):
         return {
@@ -57,11 +79,27 @@ class Area(db.Model):
             'name': self.name,
             'code': self.code,
             'description': self.description,
-            'cities': self.cities.split(',') if self.cities else [],
+            'cities': self.cities,
             'total_users': self.total_users,
             'created_at': self.created_at.isoformat()
         }
 
+class AreaCity(db.Model):
+    __tablename__ = 'area_cities'
+    
+    area_id = db.Column(db.Integer, db.ForeignKey('areas.id'), primary_key=True)
+    position = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    name_key = db.Column(db.String(100), nullable=False)  # case-folded name for lookups
+    
+    __table_args__ = (
+        db.Index('ix_area_cities_name_key', 'name_key', 'area_id'),
+    )
+    
+    @staticmethod
+    def key(name):
+        return ' '.join(name.split()).casefold()
+
 class Outage(db.Model):
     __tablename__ = 'outages'
     
@@ -69,17 +107,29 @@ class Outage(db.Model):
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     location = db.Column(db.String(200), nullable=False)
-    status = db.Column(db.String(20), default='REPORTED')  # REPORTED, IN_PROGRESS, RESOLVED
-    priority = db.Column(db.String(20), default='MEDIUM')  # LOW, MEDIUM, HIGH, CRITICAL
-    affected_users = db.Column(db.Integer, default=0)
+    # Rollup listeners diff old and new values on update; active_history
+    # loads the committed value even when the attribute was expired
+    status = db.mapped_column(db.String(20), default='REPORTED', active_history=True)  # REPORTED, IN_PROGRESS, RESOLVED
+    priority = db.mapped_column(db.String(20), default='MEDIUM', active_history=True)  # LOW, MEDIUM, HIGH, CRITICAL
+    affected_users = db.mapped_column(db.Integer, default=0, active_history=True)
     estimated_resolution = db.Column(db.DateTime)
-    resolved_at = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    resolved_at = db.mapped_column(db.DateTime, active_history=True)
+    created_at = db.mapped_column(db.DateTime, default=datetime.utcnow, active_history=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign Keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    area_id = db.Column(db.Integer, db.ForeignKey('areas.id'), nullable=False)
+    area_id = db.mapped_column(db.Integer, db.ForeignKey('areas.id'), nullable=False, active_history=True)
+    incident_id = db.Column(db.Integer, db.ForeignKey('incidents.id'))
+    
+    # Hot query shapes: newest-first listing, status/area/reporter filters
+    __table_args__ = (
+        db.Index('ix_outages_created_id', 'created_at', 'id'),
+        db.Index('ix_outages_status_created', 'status', 'created_at'),
+        db.Index('ix_outages_area_status', 'area_id', 'status'),
+        db.Index('ix_outages_user_created', 'user_id', 'created_at'),
+        db.Index('ix_outages_incident', 'incident_id'),
+    )
     
     def to_dict(self):
         return {
@@ -96,10 +146,103 @@ class Outage(db.Model):
             'updated_at': self.updated_at.isoformat(),
             'user_id': self.user_id,
             'area_id': self.area_id,
+            'incident_id': self.incident_id,
             'reporter': self.reporter.to_dict() if self.reporter else None,
             'area': self.area.to_dict() if self.area else None
         }
 
+class Incident(db.Model):
+    __tablename__ = 'incidents'
+    
+    # Parent of near-identical outage reports (same area and location, close in time)
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    location = db.Column(db.String(200), nullable=False)
+    location_key = db.Column(db.String(200), nullable=False)
+    # 'area_id:location_key' while the incident takes new reports, else NULL;
+    # unique, so concurrent workers cluster into the same incident
+    open_key = db.Column(db.String(255))
+    status = db.Column(db.String(20), default='OPEN')  # OPEN, RESOLVED
+    priority = db.Column(db.String(20), default='MEDIUM')  # highest priority among its reports
+    report_count = db.Column(db.Integer, nullable=False, default=0)
+    affected_users = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_reported_at = db.Column(db.DateTime, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime)
+    
+    area_id = db.Column(db.Integer, db.ForeignKey('areas.id'), nullable=False)
+    
+    outages = db.relationship('Outage', backref='incident', lazy=True)
+    
+    __table_args__ = (
+        db.Index('ix_incidents_area_key_status', 'area_id', 'location_key', 'status'),
+        db.Index('ix_incidents_created_id', 'created_at', 'id'),
+        db.Index('ux_incidents_open_key', 'open_key', unique=True),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'location': self.location,
+            'status': self.status,
+            'priority': self.priority,
+            'report_count': self.report_count,
+            'affected_users': self.affected_users,
+            'created_at': self.created_at.isoformat(),
+            'last_reported_at': self.last_reported_at.isoformat(),
+            'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None,
+            'area_id': self.area_id
+        }
+
+class OutageDailyRollup(db.Model):
+    __tablename__ = 'outage_daily_rollups'
+    
+    # Outages reported per day/area/priority, and how many of them are resolved
+    day = db.Column(db.Date, primary_key=True)
+    area_id = db.Column(db.Integer, primary_key=True)
+    priority = db.Column(db.String(20), primary_key=True)
+    reported = db.Column(db.Integer, nullable=False, default=0)
+    resolved = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'area_id': self.area_id,
+            'priority': self.priority,
+            'reported': self.reported,
+            'resolved': self.resolved
+        }
+
+class ReliabilityRollup(db.Model):
+    __tablename__ = 'reliability_rollups'
+    
+    # Sustained interruptions restored, by month of interruption start and
+    # area: the numerators of SAIDI, SAIFI and CAIDI (see reliability.py)
+    month = db.Column(db.Date, primary_key=True)
+    area_id = db.Column(db.Integer, primary_key=True)
+    interruptions = db.Column(db.Integer, nullable=False, default=0)
+    customers_interrupted = db.Column(db.BigInteger, nullable=False, default=0)
+    customer_minutes = db.Column(db.Float, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'month': self.month.isoformat()[:7],
+            'area_id': self.area_id,
+            'interruptions': self.interruptions,
+            'customers_interrupted': self.customers_interrupted,
+            'customer_minutes': self.customer_minutes
+        }
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+    
+    # Bumped right after every commit that writes the table; read endpoints
+    # derive ETag/Last-Modified from it without touching the rows
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
 class Notification(db.Model):
     __tablename__ = 'notifications'
     
@@ -113,6 +256,16 @@ class Notification(db.Model):
     # Foreign Keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
+    # Inbox reads: a user's (unread) notifications, newest first, paged by
+    # (created_at, id); archiving walks read notifications oldest first.
+    # Archived rows keep their id, so SQLite must never hand out a deleted id again
+    __table_args__ = (
+        db.Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+        db.Index('ix_notifications_user_created_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_notifications_read_created', 'is_read', 'created_at'),
+        {'sqlite_autoincrement': True}
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -124,9 +277,41 @@ class Notification(db.Model):
             'user_id': self.user_id
         }
 
+class NotificationArchive(db.Model):
+    __tablename__ = 'notifications_archive'
+    
+    # Read notifications moved out of the inbox table after
+    # NOTIFICATION_ARCHIVE_DAYS; ids are kept from the original rows
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    type = db.Column(db.String(20), default='INFO')
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_notifications_archive_user_created_id', 'user_id', 'created_at', 'id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'message': self.message,
+            'type': self.type,
+            'is_read': True,
+            'created_at': self.created_at.isoformat(),
+            'archived_at': self.archived_at.isoformat(),
+            'user_id': self.user_id
+        }
+
 class Maintenance(db.Model):
     __tablename__ = 'maintenance'
     
+    # Stored statuses that override the clock; otherwise status follows start/end
+    TERMINAL_STATUSES = ('CANCELLED', 'COMPLETED')
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -134,9 +319,24 @@ class Maintenance(db.Model):
     start_time = db.Column(db.DateTime, nullable=False)
     end_time = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.String(20), default='SCHEDULED')  # SCHEDULED, IN_PROGRESS, COMPLETED, CANCELLED
-    affected_areas = db.Column(db.String(500))  # Comma-separated area IDs
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    areas = db.relationship('Area', secondary='maintenance_areas', order_by='Area.id', lazy='selectin',
+                            backref=db.backref('maintenance', lazy=True))
+    
+    __table_args__ = (
+        db.Index('ix_maintenance_start_end', 'start_time', 'end_time'),
+        db.Index('ix_maintenance_end', 'end_time'),
+    )
+    
+    def current_status(self, now=None):
+        if self.status in self.TERMINAL_STATUSES:
+            return self.status
+        now = now or datetime.utcnow()
+        if now < self.start_time:
+            return 'SCHEDULED'
+        return 'IN_PROGRESS' if now < self.end_time else 'COMPLETED'
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -145,7 +345,17 @@ class Maintenance(db.Model):
             'location': self.location,
             'start_time': self.start_time.isoformat(),
             'end_time': self.end_time.isoformat(),
-            'status': self.status,
-            'affected_areas': self.affected_areas.split(',') if self.affected_areas else [],
+            'status': self.current_status(),
+            'affected_areas': [str(area.id) for area in self.areas],
             'created_at': self.created_at.isoformat()
         }
+
+class MaintenanceArea(db.Model):
+    __tablename__ = 'maintenance_areas'
+    
+    maintenance_id = db.Column(db.Integer, db.ForeignKey('maintenance.id'), primary_key=True)
+    area_id = db.Column(db.Integer, db.ForeignKey('areas.id'), primary_key=True)
+    
+    __table_args__ = (
+        db.Index('ix_maintenance_areas_area', 'area_id', 'maintenance_id'),
+    )
@@ -0,0 +1,146 @@
+import atexit
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import insert
+from models import db, Notification
+import inbox
+from events import event_bus, user_channel
+
+
+class NotificationFanout:
+    """In-process queue that writes notifications off the request path.
+
+    A single worker thread drains the queue in batches, collapses repeated
+    notifications for the same (user, key) to the latest one and writes the
+    batch with one bulk INSERT and one commit.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=0.2):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.app = None
+        self.sync = False
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.archive_interval = 3600
+        self._last_archive = time.monotonic()
+        # Drain whatever is queued on exit; a no-op until a worker has started
+        atexit.register(self.flush)
+
+    def init_app(self, app):
+        self.app = app
+        self.sync = app.config.get('NOTIFICATION_FANOUT_SYNC', False)
+        self.batch_size = app.config.get('NOTIFICATION_BATCH_SIZE', self.batch_size)
+        self.archive_interval = app.config.get('NOTIFICATION_ARCHIVE_INTERVAL', self.archive_interval)
+        app.extensions['notification_fanout'] = self
+
+    def notify(self, user_ids, title, message, type='INFO', key=None):
+        if isinstance(user_ids, int):
+            user_ids = [user_ids]
+        created_at = datetime.utcnow()
+        items = [
+            {
+                'user_id': user_id,
+                'title': title,
+                'message': message,
+                'type': type,
+                'created_at': created_at,
+                'key': key
+            }
+            for user_id in user_ids
+        ]
+
+        if self.sync:
+            self._write(items)
+            return
+
+        self._ensure_worker()
+        for item in items:
+            self._queue.put(item)
+
+    def flush(self):
+        """Block until everything queued so far has been written."""
+        if self._worker:
+            self._queue.join()
+
+    def _ensure_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='notification-fanout', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            except Exception:
+                self.app.logger.exception('Failed to write %d notifications', len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, items):
+        # Later notifications for the same user and key replace earlier ones
+        coalesced = {}
+        for item in items:
+            dedupe = (item['user_id'], item['key']) if item['key'] is not None else id(item)
+            coalesced.pop(dedupe, None)
+            coalesced[dedupe] = item
+
+        rows = [
+            {field: value for field, value in item.items() if field != 'key'}
+            for item in coalesced.values()
+        ]
+        if not rows:
+            return
+
+        unread = Counter(row['user_id'] for row in rows)
+
+        with self.app.app_context():
+            stmt = insert(Notification).returning(Notification.id, sort_by_parameter_order=True)
+            ids = db.session.execute(stmt, rows).scalars().all()
+            inbox.apply_unread_deltas(db.session.connection(), unread)
+            db.session.commit()
+            self._maybe_archive()
+
+        for notification_id, row in zip(ids, rows):
+            event_bus.publish(user_channel(row['user_id']), 'notification.created', {
+                'id': notification_id,
+                'title': row['title'],
+                'message': row['message'],
+                'type': row['type'],
+                'is_read': False,
+                'created_at': row['created_at'].isoformat(),
+                'user_id': row['user_id']
+            })
+
+
+    def _maybe_archive(self):
+        # Piggybacks on notification writes so inboxes stay small without a scheduler
+        if not self.archive_interval or time.monotonic() - self._last_archive < self.archive_interval:
+            return
+        self._last_archive = time.monotonic()
+        moved = inbox.archive_read(self.app.config.get('NOTIFICATION_ARCHIVE_DAYS', 30))
+        if moved:
+            self.app.logger.info('Archived %d read notifications', moved)
+
+
+fanout = NotificationFanout()
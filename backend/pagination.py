@@ -0,0 +1,77 @@
+import base64
+from datetime import datetime
+from urllib.parse import urlencode
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id):
+    raw = f'{created_at.isoformat()}|{row_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, maximum)
+
+
+def keyset_filter(query, created_col, id_col, cursor):
+    """Restrict a (created_at DESC, id DESC) ordered query to rows after cursor."""
+    if not cursor:
+        return query
+    created_at, row_id = decode_cursor(cursor)
+    return query.filter(or_(
+        created_col < created_at,
+        and_(created_col == created_at, id_col < row_id)
+    ))
+
+
+def keyset_page(query, created_col, id_col, limit, cursor=None):
+    """Fetch one page ordered newest first.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    query = keyset_filter(query, created_col, id_col, cursor)
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
+
+
+def set_page_headers(response, next_cursor):
+    """Advertise the next page of the current request as X-Next-Cursor and a Link header."""
+    if not next_cursor:
+        return response
+    args = request.args.copy()
+    args['cursor'] = next_cursor
+    response.headers['X-Next-Cursor'] = next_cursor
+    response.headers['Link'] = f'<{request.base_url}?{urlencode(list(args.items(multi=True)))}>; rel="next"'
+    return response
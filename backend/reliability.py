@@ -0,0 +1,215 @@
+from collections import defaultdict
+from datetime import date
+from sqlalchemy import and_, event, func, inspect, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Area, Outage, ReliabilityRollup
+from aggregates import hours_between, month_of, seconds_between
+
+# IEEE 1366 reliability indices over restored, sustained interruptions:
+#   SAIFI = customers interrupted / customers served
+#   SAIDI = customer minutes of interruption / customers served
+#   CAIDI = SAIDI / SAIFI = customer minutes / customers interrupted
+# The numerators are kept per (month, area) in reliability_rollups, in step
+# with outage writes like the daily rollups, so an area/month is one row
+# and a year is twelve. Customers served is Area.total_users at query time.
+rollup_table = ReliabilityRollup.__table__
+
+# Shorter interruptions are momentary and do not count towards the indices
+SUSTAINED_MINUTES = 5
+
+TRACKED_FIELDS = ('created_at', 'resolved_at', 'status', 'area_id', 'affected_users')
+
+
+def _month(moment):
+    return date(moment.year, moment.month, 1)
+
+
+def _contribution(created_at, resolved_at, status, area_id, affected_users):
+    """((month, area_id), (interruptions, customers, customer minutes)), or None."""
+    if status != 'RESOLVED' or resolved_at is None or created_at is None:
+        return None
+    # Whole seconds, as backfill() compares them
+    seconds = (resolved_at - created_at).total_seconds()
+    if round(seconds) < SUSTAINED_MINUTES * 60:
+        return None
+    customers = affected_users or 0
+    return (_month(created_at), area_id), (1, customers, customers * seconds / 60)
+
+
+def outage_deltas(rows, sign=1):
+    """Sum contributions per (month, area_id) for rows of TRACKED_FIELDS values."""
+    deltas = defaultdict(lambda: [0, 0, 0.0])
+    for row in rows:
+        contribution = _contribution(*row)
+        if contribution is None:
+            continue
+        key, values = contribution
+        for i, value in enumerate(values):
+            deltas[key][i] += sign * value
+    return deltas
+
+
+def apply_deltas(connection, deltas):
+    dialect = connection.dialect.name
+    for (month, area_id), (interruptions, customers, minutes) in deltas.items():
+        if not interruptions and not customers and not minutes:
+            continue
+
+        values = {'month': month, 'area_id': area_id, 'interruptions': interruptions,
+                  'customers_interrupted': customers, 'customer_minutes': minutes}
+
+        if dialect in ('sqlite', 'postgresql'):
+            dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = dialect_insert(rollup_table).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['month', 'area_id'],
+                set_={
+                    'interruptions': rollup_table.c.interruptions + stmt.excluded.interruptions,
+                    'customers_interrupted': rollup_table.c.customers_interrupted + stmt.excluded.customers_interrupted,
+                    'customer_minutes': rollup_table.c.customer_minutes + stmt.excluded.customer_minutes
+                }
+            )
+            connection.execute(stmt)
+            continue
+
+        updated = connection.execute(
+            rollup_table.update()
+            .where(rollup_table.c.month == month, rollup_table.c.area_id == area_id)
+            .values(interruptions=rollup_table.c.interruptions + interruptions,
+                    customers_interrupted=rollup_table.c.customers_interrupted + customers,
+                    customer_minutes=rollup_table.c.customer_minutes + minutes)
+        )
+        if updated.rowcount == 0:
+            connection.execute(rollup_table.insert().values(**values))
+
+
+def _values(target):
+    return [getattr(target, field) for field in TRACKED_FIELDS]
+
+
+@event.listens_for(Outage, 'after_insert')
+def _reliability_insert(mapper, connection, target):
+    apply_deltas(connection, outage_deltas([_values(target)]))
+
+
+@event.listens_for(Outage, 'after_update')
+def _reliability_update(mapper, connection, target):
+    # Resolving an outage is the usual trigger: status and resolved_at change
+    state = inspect(target)
+    old = []
+    changed = False
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            changed = True
+            old.append(history.deleted[0])
+        else:
+            old.append(getattr(target, field))
+
+    if not changed:
+        return
+
+    deltas = outage_deltas([_values(target)])
+    for key, values in outage_deltas([old], sign=-1).items():
+        for i, value in enumerate(values):
+            deltas[key][i] += value
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(Outage, 'after_delete')
+def _reliability_delete(mapper, connection, target):
+    apply_deltas(connection, outage_deltas([_values(target)], sign=-1))
+
+
+def backfill(connection=None):
+    """Rebuild reliability_rollups from the outages table in one INSERT ... SELECT."""
+    connection = connection or db.session.connection()
+    minutes = hours_between(Outage.created_at, Outage.resolved_at) * 60
+    customers = func.coalesce(Outage.affected_users, 0)
+    source = select(
+        month_of(Outage.created_at),
+        Outage.area_id,
+        func.count(Outage.id),
+        func.sum(customers),
+        func.sum(customers * minutes)
+    ).where(
+        Outage.status == 'RESOLVED',
+        Outage.resolved_at.isnot(None),
+        seconds_between(Outage.created_at, Outage.resolved_at) >= SUSTAINED_MINUTES * 60
+    ).group_by(month_of(Outage.created_at), Outage.area_id)
+
+    connection.execute(rollup_table.delete())
+    connection.execute(
+        insert(rollup_table).from_select(
+            ['month', 'area_id', 'interruptions', 'customers_interrupted', 'customer_minutes'], source
+        )
+    )
+    return connection.execute(select(func.count()).select_from(rollup_table)).scalar()
+
+
+def _indices(interruptions, customers, minutes, served):
+    return {
+        'interruptions': interruptions,
+        'customers_interrupted': customers,
+        'customer_minutes': round(minutes, 1),
+        'customers_served': served,
+        'saifi': round(customers / served, 4) if served else None,
+        'saidi': round(minutes / served, 2) if served else None,
+        'caidi': round(minutes / customers, 2) if customers else None
+    }
+
+
+def indices(start=None, end=None, area_id=None, by='month'):
+    """SAIDI/SAIFI/CAIDI for months in [start, end] (first days of months).
+
+    by='month' gives one row per month across the selected areas,
+    by='area' one row per area over the whole period, by='area_month' one
+    row per area and month; None gives a single total. Areas with no
+    interruptions still count towards customers served.
+    """
+    areas = db.session.query(Area.id, func.coalesce(Area.total_users, 0))
+    if area_id is not None:
+        areas = areas.filter(Area.id == area_id)
+    served_by_area = dict(areas.all())
+    served = sum(served_by_area.values())
+
+    group = {
+        'month': [ReliabilityRollup.month],
+        'area': [ReliabilityRollup.area_id],
+        'area_month': [ReliabilityRollup.area_id, ReliabilityRollup.month],
+        None: []
+    }[by]
+    query = db.session.query(
+        *group,
+        func.sum(ReliabilityRollup.interruptions),
+        func.sum(ReliabilityRollup.customers_interrupted),
+        func.sum(ReliabilityRollup.customer_minutes)
+    )
+    filters = []
+    if start is not None:
+        filters.append(ReliabilityRollup.month >= start)
+    if end is not None:
+        filters.append(ReliabilityRollup.month <= end)
+    if area_id is not None:
+        filters.append(ReliabilityRollup.area_id == area_id)
+    if filters:
+        query = query.filter(and_(*filters))
+    rows = query.group_by(*group).order_by(*group).all()
+
+    if by is None:
+        interruptions, customers, minutes = rows[0] if rows and rows[0][0] is not None else (0, 0, 0.0)
+        return _indices(interruptions or 0, customers or 0, minutes or 0.0, served)
+
+    result = []
+    for row in rows:
+        keys, (interruptions, customers, minutes) = row[:len(group)], row[len(group):]
+        entry = {}
+        if by in ('area', 'area_month'):
+            entry['area_id'] = keys[0]
+        if by in ('month', 'area_month'):
+            entry['month'] = keys[-1].isoformat()[:7]
+        area_served = served_by_area.get(keys[0], 0) if by in ('area', 'area_month') else served
+        entry.update(_indices(interruptions, customers, minutes, area_served))
+        result.append(entry)
+    return result
+
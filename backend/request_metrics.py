@@ -0,0 +1,217 @@
+"""Framework-neutral request metrics shared by the Flask API and the Django site.
+
+backend/instrumentation.py and outages/instrumentation.py adapt this to
+their framework (the Django site imports it as backend.request_metrics): they time each request, count its SQL statements and
+rows, and hand the sample to RequestRecorder. The recorder keeps
+per-endpoint totals (rendered in Prometheus text format), samples requests
+under cProfile and keeps the profile of those that turn out slow.
+"""
+import cProfile
+import hmac
+import io
+import pstats
+import random
+import threading
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+PROFILE_LINES = 30
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{_labels(**labels, le=_number(bound))} {cumulative}'
+        yield f'{name}_bucket{_labels(**labels, le="+Inf")} {self.total}'
+        yield f'{name}_sum{_labels(**labels)} {_number(self.sum)}'
+        yield f'{name}_count{_labels(**labels)} {self.total}'
+
+
+class EndpointStats:
+    def __init__(self):
+        self.responses = {}
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.serialize_seconds = 0.0
+        self.slow = 0
+
+
+class Metrics:
+    """Per-endpoint request totals, rendered in Prometheus text format."""
+
+    def __init__(self, namespace, keep_profiles=20, rows_help='Rows loaded from query results.',
+                 serialize_help='Time spent encoding response bodies.'):
+        self.namespace = namespace
+        self.rows_help = rows_help
+        self.serialize_help = serialize_help
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.profiles = deque(maxlen=keep_profiles)
+
+    def observe(self, method, endpoint, status, sample, slow):
+        with self.lock:
+            stats = self.endpoints.get((method, endpoint))
+            if stats is None:
+                stats = self.endpoints[(method, endpoint)] = EndpointStats()
+            stats.responses[status] = stats.responses.get(status, 0) + 1
+            stats.duration.observe(sample['wall'])
+            stats.statements.observe(sample['statements'])
+            stats.sql_seconds += sample['sql']
+            stats.rows += sample['rows']
+            stats.serialize_seconds += sample['serialize']
+            stats.slow += slow
+
+    def keep_profile(self, entry):
+        with self.lock:
+            self.profiles.appendleft(entry)
+
+    def render(self):
+        ns = self.namespace
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+            out = [
+                f'# HELP {ns}_requests_total Requests by endpoint and response status.',
+                f'# TYPE {ns}_requests_total counter',
+            ]
+            for (method, endpoint), stats in endpoints:
+                for status, count in sorted(stats.responses.items()):
+                    out.append(f'{ns}_requests_total{_labels(method=method, endpoint=endpoint, status=status)} {count}')
+
+            for name, help_text, histogram in (
+                ('request_duration_seconds', 'Wall time per request.', 'duration'),
+                ('request_sql_statements', 'SQL statements executed per request.', 'statements'),
+            ):
+                out += [f'# HELP {ns}_{name} {help_text}', f'# TYPE {ns}_{name} histogram']
+                for (method, endpoint), stats in endpoints:
+                    out += getattr(stats, histogram).lines(f'{ns}_{name}', {'method': method, 'endpoint': endpoint})
+
+            for name, help_text, attribute in (
+                ('sql_seconds_total', 'Time spent executing SQL.', 'sql_seconds'),
+                ('rows_loaded_total', self.rows_help, 'rows'),
+                ('serialize_seconds_total', self.serialize_help, 'serialize_seconds'),
+                ('slow_requests_total', 'Requests slower than SLOW_REQUEST_MS.', 'slow'),
+            ):
+                out += [f'# HELP {ns}_{name} {help_text}', f'# TYPE {ns}_{name} counter']
+                for (method, endpoint), stats in endpoints:
+                    value = getattr(stats, attribute)
+                    out.append(f'{ns}_{name}{_labels(method=method, endpoint=endpoint)} {_number(value)}')
+        return '\n'.join(out) + '\n'
+
+
+def _format_profile(profile):
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(PROFILE_LINES)
+    return stream.getvalue()
+
+
+class RequestRecorder:
+    """Samples requests under cProfile and records them into Metrics.
+
+    A request's sample is a dict the adapter fills in between start() and
+    finish(): statements, sql (seconds), rows and serialize (seconds).
+    """
+
+    def __init__(self, metrics, logger, slow_ms=500, sample_rate=0.05, token=None):
+        self.metrics = metrics
+        self.logger = logger
+        self.slow_seconds = slow_ms / 1000
+        self.sample_rate = sample_rate
+        self.token = token
+        # cProfile is one profiler per interpreter on 3.12+, and greenlets
+        # share a thread; profile one request at a time and skip others meanwhile
+        self.profiler_lock = threading.Lock()
+        # Endpoints seen running slow are profiled on their next requests
+        # until a slow profile is caught
+        self.suspects = set()
+
+    def start(self, endpoint):
+        sample = {'statements': 0, 'sql': 0.0, 'rows': 0, 'serialize': 0.0,
+                  'started': perf_counter(), 'profile': None}
+        if (endpoint in self.suspects or random.random() < self.sample_rate) \
+                and self.profiler_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler (a debugger, py-spy in-process) is active
+                self.profiler_lock.release()
+            else:
+                sample['profile'] = profile
+        return sample
+
+    def stop(self, sample):
+        """Stop the clock and the profiler; call once, as soon as the response exists."""
+        sample['wall'] = perf_counter() - sample['started']
+        if sample['profile'] is not None:
+            sample['profile'].disable()
+            self.profiler_lock.release()
+
+    def finish(self, sample, method, endpoint, path, status):
+        if 'wall' not in sample:
+            self.stop(sample)
+        slow = sample['wall'] >= self.slow_seconds
+        self.metrics.observe(method, endpoint, status, sample, slow)
+
+        if not slow:
+            return
+        profile = sample['profile']
+        if profile is None:
+            self.suspects.add(endpoint)
+            return
+        self.suspects.discard(endpoint)
+        self.metrics.keep_profile({
+            'method': method,
+            'endpoint': endpoint,
+            'path': path,
+            'at': datetime.utcnow().isoformat(),
+            'wall_ms': round(sample['wall'] * 1000, 1),
+            'sql_statements': sample['statements'],
+            'sql_ms': round(sample['sql'] * 1000, 1),
+            'rows_loaded': sample['rows'],
+            'profile': _format_profile(profile),
+        })
+        self.logger.warning('Slow request %s %s: %.0f ms, %d SQL statements', method,
+                            endpoint, sample['wall'] * 1000, sample['statements'])
+
+    def authorized(self, authorization):
+        """Whether an Authorization header carries the metrics token.
+
+        Not the client address: behind a local reverse proxy every request is local.
+        """
+        return bool(self.token) and hmac.compare_digest(authorization or '', f'Bearer {self.token}')
@@ -0,0 +1,122 @@
+from collections import defaultdict
+from sqlalchemy import case, event, func, inspect, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Outage, OutageDailyRollup
+from aggregates import day_of
+
+rollup_table = OutageDailyRollup.__table__
+
+TRACKED_FIELDS = ('created_at', 'area_id', 'priority', 'status')
+
+
+def _key(created_at, area_id, priority):
+    return (created_at.date(), area_id, priority or 'MEDIUM')
+
+
+def _contribution(created_at, area_id, priority, status):
+    return _key(created_at, area_id, priority), (1, 1 if status == 'RESOLVED' else 0)
+
+
+def outage_deltas(rows):
+    """Sum (reported, resolved) per rollup bucket for (created_at, area_id, priority, status) rows."""
+    deltas = defaultdict(lambda: [0, 0])
+    for row in rows:
+        key, (reported, resolved) = _contribution(*row)
+        deltas[key][0] += reported
+        deltas[key][1] += resolved
+    return deltas
+
+
+def apply_deltas(connection, deltas):
+    dialect = connection.dialect.name
+    for (day, area_id, priority), (reported, resolved) in deltas.items():
+        if not reported and not resolved:
+            continue
+
+        values = {'day': day, 'area_id': area_id, 'priority': priority,
+                  'reported': reported, 'resolved': resolved}
+
+        if dialect in ('sqlite', 'postgresql'):
+            dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = dialect_insert(rollup_table).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['day', 'area_id', 'priority'],
+                set_={
+                    'reported': rollup_table.c.reported + stmt.excluded.reported,
+                    'resolved': rollup_table.c.resolved + stmt.excluded.resolved
+                }
+            )
+            connection.execute(stmt)
+            continue
+
+        updated = connection.execute(
+            rollup_table.update()
+            .where(rollup_table.c.day == day,
+                   rollup_table.c.area_id == area_id,
+                   rollup_table.c.priority == priority)
+            .values(reported=rollup_table.c.reported + reported,
+                    resolved=rollup_table.c.resolved + resolved)
+        )
+        if updated.rowcount == 0:
+            connection.execute(rollup_table.insert().values(**values))
+
+
+@event.listens_for(Outage, 'after_insert')
+def _rollup_insert(mapper, connection, target):
+    apply_deltas(connection, outage_deltas([
+        (target.created_at, target.area_id, target.priority, target.status)
+    ]))
+
+
+@event.listens_for(Outage, 'after_update')
+def _rollup_update(mapper, connection, target):
+    state = inspect(target)
+    old = []
+    changed = False
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            changed = True
+            old.append(history.deleted[0])
+        else:
+            old.append(getattr(target, field))
+
+    if not changed:
+        return
+
+    deltas = outage_deltas([[getattr(target, field) for field in TRACKED_FIELDS]])
+    for key, (reported, resolved) in outage_deltas([old]).items():
+        deltas[key][0] -= reported
+        deltas[key][1] -= resolved
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(Outage, 'after_delete')
+def _rollup_delete(mapper, connection, target):
+    deltas = outage_deltas([
+        (target.created_at, target.area_id, target.priority, target.status)
+    ])
+    apply_deltas(connection, {key: (-reported, -resolved) for key, (reported, resolved) in deltas.items()})
+
+
+def backfill():
+    """Rebuild the rollup table from the outages table in one INSERT ... SELECT."""
+    source = select(
+        day_of(Outage.created_at),
+        Outage.area_id,
+        func.coalesce(Outage.priority, 'MEDIUM'),
+        func.count(Outage.id),
+        func.sum(case((Outage.status == 'RESOLVED', 1), else_=0))
+    ).group_by(
+        day_of(Outage.created_at), Outage.area_id, func.coalesce(Outage.priority, 'MEDIUM')
+    )
+
+    db.session.execute(rollup_table.delete())
+    db.session.execute(
+        insert(rollup_table).from_select(
+            ['day', 'area_id', 'priority', 'reported', 'resolved'], source
+        )
+    )
+    db.session.commit()
+
+    return db.session.query(func.count()).select_from(rollup_table).scalar()
@@ -1,126 +1,94 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Outage, Area, User
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from models import db, Outage, Area, User, OutageDailyRollup
+from conditional import conditional
 from sqlalchemy import func
-from datetime import datetime, timedelta
+from aggregates import RECENT_DAYS, outage_stats, with_outage_counts
+import reliability
+from cache import TTLCache, invalidate_on_write
+from datetime import date, datetime, timedelta
 
 analytics_bp = Blueprint('analytics', __name__)
 
+MAX_TREND_DAYS = 3660
+
+# Dashboards poll /stats; serve them from memory until an outage write commits
+stats_cache = TTLCache()
+invalidate_on_write(stats_cache, Outage, Area, User)
+
+def _recent_window():
+    # recent_outages changes without a write whenever an outage ages out of
+    # its window: track the newest outage that already has
+    since = datetime.utcnow() - timedelta(days=RECENT_DAYS)
+    aged_out = db.session.query(func.max(Outage.created_at)).filter(Outage.created_at < since).scalar()
+    if aged_out is None:
+        return '', None
+    return aged_out.isoformat(), aged_out + timedelta(days=RECENT_DAYS)
+
 @analytics_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@conditional(Outage, Area, User, clock=_recent_window)
 def get_stats():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    # Total outages
-    total_outages = Outage.query.count()
-    
-    # Active outages
-    active_outages = Outage.query.filter(
-        Outage.status.in_(['REPORTED', 'IN_PROGRESS'])
-    ).count()
-    
-    # Resolved outages
-    resolved_outages = Outage.query.filter_by(status='RESOLVED').count()
-    
-    # Total areas
-    total_areas = Area.query.count()
-    
-    # Total users
-    total_users = User.query.count()
-    
-    # Average resolution time (in hours)
-    resolved = Outage.query.filter(
-        Outage.status == 'RESOLVED',
-        Outage.resolved_at.isnot(None)
-    ).all()
-    
-    avg_resolution_time = 0
-    if resolved:
-        total_time = sum([
-            (outage.resolved_at - outage.created_at).total_seconds() / 3600
-            for outage in resolved
-        ])
-        avg_resolution_time = round(total_time / len(resolved), 2)
-    
-    # Outages by status
-    outages_by_status = db.session.query(
-        Outage.status, func.count(Outage.id)
-    ).group_by(Outage.status).all()
+    window, _ = _recent_window()
+    stats = stats_cache.get_or_set(
+        f'stats:{window}', outage_stats, ttl=current_app.config['STATS_CACHE_TTL']
+    )
     
-    status_counts = {status: count for status, count in outages_by_status}
-    
-    # Outages by priority
-    outages_by_priority = db.session.query(
-        Outage.priority, func.count(Outage.id)
-    ).group_by(Outage.priority).all()
-    
-    priority_counts = {priority: count for priority, count in outages_by_priority}
-    
-    # Recent outages (last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_outages = Outage.query.filter(
-        Outage.created_at >= seven_days_ago
-    ).count()
-    
-    return jsonify({
-        'total_outages': total_outages,
-        'active_outages': active_outages,
-        'resolved_outages': resolved_outages,
-        'total_areas': total_areas,
-        'total_users': total_users,
-        'avg_resolution_time': avg_resolution_time,
-        'outages_by_status': status_counts,
-        'outages_by_priority': priority_counts,
-        'recent_outages': recent_outages
-    }), 200
+    return jsonify(stats), 200
+
+def _utc_day():
+    # The trends window moves at midnight UTC, with or without outage writes
+    today = datetime.utcnow().date()
+    return today.isoformat(), datetime(today.year, today.month, today.day)
 
 @analytics_bp.route('/trends', methods=['GET'])
 @jwt_required()
+@conditional(Outage, clock=_utc_day)
 def get_trends():
-    # Get outages for the last 30 days grouped by day
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    # Daily reported/resolved counts, read from the rollup table
+    try:
+        days = min(int(request.args.get('days', 30)), MAX_TREND_DAYS)
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    if days < 1:
+        return jsonify({'error': 'days must be at least 1'}), 400
+    
+    since = (datetime.utcnow() - timedelta(days=days)).date()
+    
+    query = db.session.query(
+        OutageDailyRollup.day,
+        func.sum(OutageDailyRollup.reported),
+        func.sum(OutageDailyRollup.resolved)
+    ).filter(OutageDailyRollup.day >= since)
+    
+    if request.args.get('area_id'):
+        query = query.filter(OutageDailyRollup.area_id == request.args.get('area_id'))
+    if request.args.get('priority'):
+        query = query.filter(OutageDailyRollup.priority == request.args.get('priority'))
+    
+    rows = query.group_by(OutageDailyRollup.day).having(
+        func.sum(OutageDailyRollup.reported) > 0
+    ).order_by(OutageDailyRollup.day).all()
     
-    outages = Outage.query.filter(
-        Outage.created_at >= thirty_days_ago
-    ).all()
-    
-    # Group by date
-    trends = {}
-    for outage in outages:
-        date_key = outage.created_at.strftime('%Y-%m-%d')
-        if date_key not in trends:
-            trends[date_key] = {'reported': 0, 'resolved': 0}
-        
-        trends[date_key]['reported'] += 1
-        if outage.status == 'RESOLVED':
-            trends[date_key]['resolved'] += 1
-    
-    # Convert to list format
     trend_list = [
         {
-            'date': date,
-            'reported': data['reported'],
-            'resolved': data['resolved']
+            'date': day.isoformat(),
+            'reported': reported,
+            'resolved': resolved
         }
-        for date, data in sorted(trends.items())
+        for day, reported, resolved in rows
     ]
     
     return jsonify(trend_list), 200
 
 @analytics_bp.route('/areas-stats', methods=['GET'])
 @jwt_required()
+@conditional(Outage, Area)
 def get_areas_stats():
-    areas = Area.query.all()
+    rows = with_outage_counts(Area.query).all()
     
     stats = []
-    for area in areas:
-        total_outages = Outage.query.filter_by(area_id=area.id).count()
-        active_outages = Outage.query.filter_by(
-            area_id=area.id,
-            status='REPORTED'
-        ).count()
-        
+    for area, total_outages, active_outages in rows:
         stats.append({
             'area': area.to_dict(),
             'total_outages': total_outages,
@@ -128,3 +96,32 @@ def get_areas_stats():
         })
     
     return jsonify(stats), 200
+
+def _month(value, field):
+    """YYYY-MM to the first day of that month; None when absent."""
+    if not value:
+        return None
+    try:
+        year, month = value.split('-')[:2]
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise ValueError(f'{field} must be a month, YYYY-MM')
+
+@analytics_bp.route('/reliability', methods=['GET'])
+@jwt_required()
+@conditional(Outage, Area)
+def get_reliability():
+    # SAIDI/SAIFI/CAIDI from the per-month, per-area reliability rollups
+    by = request.args.get('by', 'month')
+    if by not in ('month', 'area', 'area_month', 'total'):
+        return jsonify({'error': 'by must be month, area, area_month or total'}), 400
+    try:
+        start = _month(request.args.get('from'), 'from')
+        end = _month(request.args.get('to'), 'to')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    result = reliability.indices(start, end, request.args.get('area_id', type=int),
+                                 None if by == 'total' else by)
+    
+    return jsonify(result), 200
@@ -1,61 +1,94 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Area, User, Outage
+from flask_jwt_extended import jwt_required
+from models import db, Area, AreaCity, Maintenance, MaintenanceArea, Outage
+from conditional import conditional
+from identity import admin_required
+from aggregates import with_outage_counts
+import schedule
+import search
 
 areas_bp = Blueprint('areas', __name__)
 
 @areas_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional(Area, Outage)
 def get_areas():
-    search = request.args.get('search', '')
+    search_text = request.args.get('search', '')
     
     query = Area.query
     
-    if search:
-        query = query.filter(
-            (Area.name.ilike(f'%{search}%')) | 
-            (Area.code.ilike(f'%{search}%'))
+    if search_text:
+        # Name, code and description from the full-text index, or a served city
+        clause = search.matching('areas', search_text)
+        by_city = Area.id.in_(
+            db.session.query(AreaCity.area_id).filter(AreaCity.name_key == AreaCity.key(search_text))
         )
+        query = query.filter(by_city if clause is None else clause | by_city)
     
-    areas = query.order_by(Area.name).all()
+    rows = with_outage_counts(query).order_by(Area.name).all()
     
     # Add active outages count for each area
     result = []
-    for area in areas:
+    for area, total_outages, active_outages in rows:
         area_dict = area.to_dict()
-        area_dict['active_outages'] = Outage.query.filter_by(
-            area_id=area.id, 
-            status='REPORTED'
-        ).count()
+        area_dict['active_outages'] = active_outages
         result.append(area_dict)
     
     return jsonify(result), 200
 
+@areas_bp.route('/by-city', methods=['GET'])
+@jwt_required()
+@conditional(Area, Outage)
+def get_areas_by_city():
+    city = request.args.get('city', '').strip()
+    if not city:
+        return jsonify({'error': 'city is required'}), 400
+    
+    query = Area.query.join(AreaCity).filter(AreaCity.name_key == AreaCity.key(city))
+    rows = with_outage_counts(query).order_by(Area.name).all()
+    
+    result = []
+    for area, total_outages, active_outages in rows:
+        area_dict = area.to_dict()
+        area_dict['active_outages'] = active_outages
+        result.append(area_dict)
+    
+    return jsonify(result), 200
+
+@areas_bp.route('/<int:area_id>/maintenance', methods=['GET'])
+@jwt_required()
+@conditional(Area, Maintenance, clock=schedule.clock)
+def get_area_maintenance(area_id):
+    if not db.session.get(Area, area_id):
+        return jsonify({'error': 'Area not found'}), 404
+    
+    query = Maintenance.query.join(MaintenanceArea).filter(MaintenanceArea.area_id == area_id)
+    if request.args.get('status'):
+        query = query.filter(schedule.status_clause(request.args.get('status')))
+    
+    maintenance = query.order_by(Maintenance.start_time.desc()).all()
+    
+    return jsonify([m.to_dict() for m in maintenance]), 200
+
 @areas_bp.route('/<int:area_id>', methods=['GET'])
 @jwt_required()
+@conditional(Area, Outage)
 def get_area(area_id):
-    area = Area.query.get(area_id)
+    row = with_outage_counts(Area.query.filter(Area.id == area_id)).first()
     
-    if not area:
+    if not row:
         return jsonify({'error': 'Area not found'}), 404
     
+    area, total_outages, active_outages = row
     area_dict = area.to_dict()
-    area_dict['active_outages'] = Outage.query.filter_by(
-        area_id=area.id, 
-        status='REPORTED'
-    ).count()
+    area_dict['active_outages'] = active_outages
     
     return jsonify(area_dict), 200
 
 @areas_bp.route('', methods=['POST'])
 @jwt_required()
+@admin_required
 def create_area():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if user.role != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     data = request.get_json()
     
     if not data.get('name') or not data.get('code'):
@@ -69,7 +102,7 @@ def create_area():
         name=data['name'],
         code=data['code'],
         description=data.get('description', ''),
-        cities=','.join(data.get('cities', [])) if isinstance(data.get('cities'), list) else data.get('cities', ''),
+        cities=data.get('cities', []),
         total_users=data.get('total_users', 0)
     )
     
@@ -83,13 +116,8 @@ def create_area():
 
 @areas_bp.route('/<int:area_id>', methods=['PUT'])
 @jwt_required()
+@admin_required
 def update_area(area_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if user.role != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     area = Area.query.get(area_id)
     
     if not area:
@@ -102,7 +130,7 @@ def update_area(area_id):
     if data.get('description'):
         area.description = data['description']
     if data.get('cities'):
-        area.cities = ','.join(data['cities']) if isinstance(data['cities'], list) else data['cities']
+        area.cities = data['cities']
     if data.get('total_users') is not None:
         area.total_users = data['total_users']
     
@@ -115,13 +143,8 @@ def update_area(area_id):
 
 @areas_bp.route('/<int:area_id>', methods=['DELETE'])
 @jwt_required()
+@admin_required
 def delete_area(area_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if user.role != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     area = Area.query.get(area_id)
     
     if not area:
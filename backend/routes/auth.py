@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models import db, User
+from identity import token_claims
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -33,7 +34,7 @@ def register():
     db.session.commit()
     
     # Create access token
-    access_token = create_access_token(identity=user.id)
+    access_token = create_access_token(identity=user.id, additional_claims=token_claims(user))
     
     return jsonify({
         'message': 'User registered successfully',
@@ -53,7 +54,7 @@ def login():
     if not user or not user.check_password(data['password']):
         return jsonify({'error': 'Invalid email or password'}), 401
     
-    access_token = create_access_token(identity=user.id)
+    access_token = create_access_token(identity=user.id, additional_claims=token_claims(user))
     
     return jsonify({
         'message': 'Login successful',
@@ -0,0 +1,61 @@
+from flask import Blueprint, Response, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from events import event_bus, user_channel
+from identity import cached_user
+
+events_bp = Blueprint('events', __name__)
+
+CHANNELS = ('outages', 'notifications')
+
+
+def _stream_tokens():
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt='event-stream')
+
+
+def _stream_user(token):
+    """User id a stream token was issued to, or None if it is invalid or expired."""
+    try:
+        user_id = _stream_tokens().loads(token, max_age=current_app.config['EVENT_TOKEN_SECONDS'])
+    except BadSignature:
+        return None
+    return user_id if cached_user(user_id) else None
+
+
+# EventSource cannot set headers, and access tokens in URLs end up in access
+# and proxy logs. Browsers exchange their JWT here for a short-lived token
+# that only opens the stream, and pass that as ?token=
+@events_bp.route('/token', methods=['POST'])
+@jwt_required()
+def issue_stream_token():
+    return jsonify({
+        'token': _stream_tokens().dumps(get_jwt_identity()),
+        'expires_in': current_app.config['EVENT_TOKEN_SECONDS']
+    })
+
+
+# The stream token is checked on connect only, so an open stream outlives it;
+# a client reconnecting after it expired fetches a new one
+@events_bp.route('', methods=['GET'])
+def stream_events():
+    token = request.args.get('token')
+    if token:
+        user_id = _stream_user(token)
+        if user_id is None:
+            return jsonify({'error': 'Invalid or expired stream token'}), 401
+    else:
+        verify_jwt_in_request(locations=['headers'])
+        user_id = get_jwt_identity()
+    requested = request.args.get('channels', ','.join(CHANNELS)).split(',')
+    
+    unknown = [name for name in requested if name not in CHANNELS]
+    if unknown:
+        return jsonify({'error': f'Unknown channels: {", ".join(unknown)}'}), 400
+    
+    channels = [user_channel(user_id) if name == 'notifications' else name for name in requested]
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    response = Response(event_bus.stream(channels, last_event_id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
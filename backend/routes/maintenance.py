@@ -1,26 +1,100 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Maintenance, User
-from datetime import datetime
+from flask_jwt_extended import jwt_required
+from models import db, Area, Maintenance, MaintenanceArea, split_list
+from conditional import conditional
+from identity import admin_required
+from datetime import datetime, timezone
+import schedule
 
 maintenance_bp = Blueprint('maintenance', __name__)
 
+def _affected_areas(value):
+    """Resolve a list (or comma-separated string) of area ids to Area rows."""
+    try:
+        area_ids = {int(area_id) for area_id in split_list(value)}
+    except ValueError:
+        raise ValueError('affected_areas must be area ids')
+    areas = Area.query.filter(Area.id.in_(area_ids)).all() if area_ids else []
+    missing = area_ids - {area.id for area in areas}
+    if missing:
+        raise ValueError(f'Unknown area id(s): {", ".join(map(str, sorted(missing)))}')
+    return areas
+
+def _parse_time(value, field):
+    """ISO 8601 to naive UTC, the form maintenance times are stored in."""
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be an ISO 8601 datetime')
+    if moment.tzinfo:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def _conflict_response(windows):
+    return jsonify({
+        'error': 'Maintenance window overlaps scheduled maintenance in the same area',
+        'conflicts': [m.to_dict() for m in windows]
+    }), 409
+
 @maintenance_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional(Maintenance, clock=schedule.clock)
 def get_maintenance():
     status = request.args.get('status')
+    area_id = request.args.get('area_id')
     
     query = Maintenance.query
     
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(schedule.status_clause(status))
+    if area_id:
+        query = query.join(MaintenanceArea).filter(MaintenanceArea.area_id == area_id)
     
     maintenance = query.order_by(Maintenance.start_time.desc()).all()
     
     return jsonify([m.to_dict() for m in maintenance]), 200
 
+@maintenance_bp.route('/active', methods=['GET'])
+@jwt_required()
+@conditional(Maintenance, clock=schedule.clock)
+def get_active_maintenance():
+    try:
+        at = _parse_time(request.args['at'], 'at') if request.args.get('at') else datetime.utcnow()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = Maintenance.query.filter(
+        schedule.active_at(at),
+        Maintenance.status.notin_(Maintenance.TERMINAL_STATUSES)
+    )
+    if request.args.get('area_id'):
+        query = query.filter(Maintenance.areas.any(Area.id == request.args.get('area_id', type=int)))
+    
+    maintenance = query.order_by(Maintenance.start_time).all()
+    
+    return jsonify([m.to_dict() for m in maintenance]), 200
+
+@maintenance_bp.route('/conflicts', methods=['GET'])
+@jwt_required()
+@conditional(Maintenance)
+def get_maintenance_conflicts():
+    try:
+        start_time = _parse_time(request.args.get('start'), 'start')
+        end_time = _parse_time(request.args.get('end'), 'end')
+        area_ids = [int(area_id) for area_id in split_list(request.args.get('area_ids'))]
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if end_time <= start_time:
+        return jsonify({'error': 'end must be after start'}), 400
+    
+    windows = schedule.conflicts(start_time, end_time, area_ids, request.args.get('exclude_id', type=int))
+    
+    return jsonify([m.to_dict() for m in windows]), 200
+
 @maintenance_bp.route('/<int:maintenance_id>', methods=['GET'])
 @jwt_required()
+@conditional(Maintenance, clock=schedule.clock)
 def get_maintenance_by_id(maintenance_id):
     maintenance = Maintenance.query.get(maintenance_id)
     
@@ -31,26 +105,37 @@ def get_maintenance_by_id(maintenance_id):
 
 @maintenance_bp.route('', methods=['POST'])
 @jwt_required()
+@admin_required
 def create_maintenance():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if user.role != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     data = request.get_json()
     
     if not all(k in data for k in ['title', 'description', 'location', 'start_time', 'end_time']):
         return jsonify({'error': 'Missing required fields'}), 400
     
+    try:
+        areas = _affected_areas(data.get('affected_areas'))
+        start_time = _parse_time(data['start_time'], 'start_time')
+        end_time = _parse_time(data['end_time'], 'end_time')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if end_time <= start_time:
+        return jsonify({'error': 'end_time must be after start_time'}), 400
+    
+    # Two crews in one area at once is almost always a scheduling mistake
+    if not data.get('allow_conflicts'):
+        overlaps = schedule.conflicts(start_time, end_time, [area.id for area in areas])
+        if overlaps:
+            return _conflict_response(overlaps)
+    
     maintenance = Maintenance(
         title=data['title'],
         description=data['description'],
         location=data['location'],
-        start_time=datetime.fromisoformat(data['start_time']),
-        end_time=datetime.fromisoformat(data['end_time']),
+        start_time=start_time,
+        end_time=end_time,
         status='SCHEDULED',
-        affected_areas=','.join(map(str, data.get('affected_areas', []))) if isinstance(data.get('affected_areas'), list) else data.get('affected_areas', '')
+        areas=areas
     )
     
     db.session.add(maintenance)
@@ -63,13 +148,8 @@ def create_maintenance():
 
 @maintenance_bp.route('/<int:maintenance_id>', methods=['PUT'])
 @jwt_required()
+@admin_required
 def update_maintenance(maintenance_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if user.role != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     maintenance = Maintenance.query.get(maintenance_id)
     
     if not maintenance:
@@ -83,14 +163,34 @@ def update_maintenance(maintenance_id):
         maintenance.description = data['description']
     if data.get('location'):
         maintenance.location = data['location']
-    if data.get('start_time'):
-        maintenance.start_time = datetime.fromisoformat(data['start_time'])
-    if data.get('end_time'):
-        maintenance.end_time = datetime.fromisoformat(data['end_time'])
+    try:
+        if data.get('start_time'):
+            maintenance.start_time = _parse_time(data['start_time'], 'start_time')
+        if data.get('end_time'):
+            maintenance.end_time = _parse_time(data['end_time'], 'end_time')
+        if data.get('affected_areas'):
+            maintenance.areas = _affected_areas(data['affected_areas'])
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    
+    # SCHEDULED and IN_PROGRESS follow start/end; only the overrides are stored
     if data.get('status'):
+        if data['status'] == 'IN_PROGRESS':
+            db.session.rollback()
+            return jsonify({'error': 'IN_PROGRESS follows start_time; move start_time instead'}), 400
         maintenance.status = data['status']
-    if data.get('affected_areas'):
-        maintenance.affected_areas = ','.join(map(str, data['affected_areas'])) if isinstance(data['affected_areas'], list) else data['affected_areas']
+    
+    if maintenance.end_time <= maintenance.start_time:
+        db.session.rollback()
+        return jsonify({'error': 'end_time must be after start_time'}), 400
+    
+    if maintenance.status not in Maintenance.TERMINAL_STATUSES and not data.get('allow_conflicts'):
+        overlaps = schedule.conflicts(maintenance.start_time, maintenance.end_time,
+                                      [area.id for area in maintenance.areas], exclude_id=maintenance.id)
+        if overlaps:
+            db.session.rollback()
+            return _conflict_response(overlaps)
     
     db.session.commit()
     
@@ -101,13 +201,8 @@ def update_maintenance(maintenance_id):
 
 @maintenance_bp.route('/<int:maintenance_id>', methods=['DELETE'])
 @jwt_required()
+@admin_required
 def delete_maintenance(maintenance_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if user.role != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
     maintenance = Maintenance.query.get(maintenance_id)
     
     if not maintenance:
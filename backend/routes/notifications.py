@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Notification, User
+from models import db, Notification, NotificationArchive, User
+from inbox import mark_read
+from pagination import InvalidCursor, keyset_page, parse_limit, set_page_headers
+from events import event_bus, user_channel
 
 notifications_bp = Blueprint('notifications', __name__)
 
@@ -9,11 +12,33 @@ notifications_bp = Blueprint('notifications', __name__)
 def get_notifications():
     user_id = get_jwt_identity()
     
-    notifications = Notification.query.filter_by(user_id=user_id).order_by(
-        Notification.created_at.desc()
-    ).all()
+    # Read notifications older than NOTIFICATION_ARCHIVE_DAYS live in the archive
+    model = NotificationArchive if request.args.get('archived') == 'true' else Notification
+    query = model.query.filter_by(user_id=user_id)
+    if model is Notification and request.args.get('unread') == 'true':
+        query = query.filter_by(is_read=False)
     
-    return jsonify([notif.to_dict() for notif in notifications]), 200
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        notifications, next_cursor = keyset_page(
+            query, model.created_at, model.id, limit, request.args.get('cursor')
+        )
+    except (InvalidCursor, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = jsonify([notif.to_dict() for notif in notifications])
+    set_page_headers(response, next_cursor)
+    response.headers['X-Unread-Count'] = str(_unread_count(user_id))
+    
+    return response, 200
+
+@notifications_bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    return jsonify({'unread': _unread_count(get_jwt_identity())}), 200
+
+def _unread_count(user_id):
+    return db.session.query(User.unread_notifications).filter_by(id=user_id).scalar() or 0
 
 @notifications_bp.route('/<int:notification_id>', methods=['PUT'])
 @jwt_required()
@@ -27,8 +52,11 @@ def mark_as_read(notification_id):
     if notification.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    notification.is_read = True
+    mark_read(user_id, [notification_id])
     db.session.commit()
+    db.session.refresh(notification)
+    
+    event_bus.publish(user_channel(user_id), 'notification.read', {'id': notification_id})
     
     return jsonify({
         'message': 'Notification marked as read',
@@ -50,6 +78,8 @@ def delete_notification(notification_id):
     db.session.delete(notification)
     db.session.commit()
     
+    event_bus.publish(user_channel(user_id), 'notification.deleted', {'id': notification_id})
+    
     return jsonify({'message': 'Notification deleted successfully'}), 200
 
 @notifications_bp.route('/mark-all-read', methods=['PUT'])
@@ -57,7 +87,9 @@ def delete_notification(notification_id):
 def mark_all_read():
     user_id = get_jwt_identity()
     
-    Notification.query.filter_by(user_id=user_id, is_read=False).update({'is_read': True})
+    mark_read(user_id)
     db.session.commit()
     
+    event_bus.publish(user_channel(user_id), 'notification.all_read', {})
+    
     return jsonify({'message': 'All notifications marked as read'}), 200
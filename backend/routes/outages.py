@@ -1,22 +1,44 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Outage, User, Area, Notification
-from datetime import datetime
+from models import db, Outage, User, Area, Incident, split_list
+from conditional import conditional
+from identity import admin_required, is_admin
+from notifier import fanout
+from ingest import IngestError, insert_outages, parse_body, validate
+from clustering import incident_index
+from events import event_bus
+from pagination import InvalidCursor, keyset_filter, keyset_page, parse_limit, set_page_headers
+from serializers import outage_profile
+from json_provider import dumps
+import export
+import search
+from datetime import datetime, timezone
 
 outages_bp = Blueprint('outages', __name__)
 
 @outages_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional(Outage, Area, User, Incident)
 def get_outages():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     
     # Get query parameters
     status = request.args.get('status')
     area_id = request.args.get('area_id')
     user_filter = request.args.get('user_id')
+    incident_id = request.args.get('incident_id')
+    search_text = request.args.get('search')
     
-    query = Outage.query
+    # Storm view: one row per incident instead of every raw report
+    if request.args.get('group') == 'incidents':
+        return get_incidents()
+    
+    try:
+        profile = outage_profile(request.args.get('profile'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = profile.apply(Outage.query)
     
     # Apply filters
     if status:
@@ -25,24 +47,134 @@ def get_outages():
         query = query.filter_by(area_id=area_id)
     if user_filter:
         query = query.filter_by(user_id=user_filter)
+    if incident_id:
+        query = query.filter_by(incident_id=incident_id)
+    if search_text:
+        clause = search.matching('outages', search_text)
+        if clause is not None:
+            query = query.filter(clause)
     
     # Non-admin users can only see their own outages or all outages
-    if user.role != 'admin' and user_filter and int(user_filter) != user_id:
+    if not is_admin() and user_filter and int(user_filter) != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    outages = query.order_by(Outage.created_at.desc()).all()
+    cursor = request.args.get('cursor')
+    
+    # Streamed NDJSON: one outage per line, fetched in batches
+    if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+        try:
+            query = keyset_filter(query, Outage.created_at, Outage.id, cursor)
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+        query = query.order_by(Outage.created_at.desc(), Outage.id.desc())
+        if request.args.get('limit'):
+            try:
+                query = query.limit(parse_limit(request.args.get('limit')))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        def generate():
+            for outage in query.yield_per(500):
+                yield dumps(profile.serialize(outage)) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        outages, next_cursor = keyset_page(query, Outage.created_at, Outage.id, limit, cursor)
+    except (InvalidCursor, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = jsonify([profile.serialize(outage) for outage in outages])
+    set_page_headers(response, next_cursor)
+    
+    return response, 200
+
+@outages_bp.route('/incidents', methods=['GET'])
+@jwt_required()
+@conditional(Incident)
+def get_incidents():
+    query = Incident.query
+    
+    if request.args.get('status'):
+        query = query.filter_by(status=request.args.get('status'))
+    if request.args.get('area_id'):
+        query = query.filter_by(area_id=request.args.get('area_id'))
+    
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        incidents, next_cursor = keyset_page(
+            query, Incident.created_at, Incident.id, limit, request.args.get('cursor')
+        )
+    except (InvalidCursor, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = jsonify([incident.to_dict() for incident in incidents])
+    set_page_headers(response, next_cursor)
+    
+    return response, 200
+
+@outages_bp.route('/search', methods=['GET'])
+@jwt_required()
+@conditional(Outage, Area, User)
+def search_outages():
+    search_text = request.args.get('q', '').strip()
+    if not search_text:
+        return jsonify({'error': 'q is required'}), 400
+    
+    try:
+        profile = outage_profile(request.args.get('profile'))
+        limit = parse_limit(request.args.get('limit'), default=20, maximum=100)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Best matches first: title hits outrank location, location outranks description
+    outages = search.ranked(profile.apply(Outage.query), 'outages', search_text, limit)
+    
+    return jsonify([profile.serialize(outage) for outage in outages]), 200
+
+def _export_bound(value, field):
+    """ISO 8601 date or datetime to naive UTC; None when absent."""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{field} must be an ISO 8601 date or datetime')
+    if moment.tzinfo:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+@outages_bp.route('/export', methods=['GET'])
+@jwt_required()
+@admin_required
+def export_outages():
+    """Outage history as CSV, Arrow IPC or Parquet, streamed in chunks."""
+    export_format = request.args.get('format', 'csv')
+    try:
+        start = _export_bound(request.args.get('start'), 'start')
+        end = _export_bound(request.args.get('end'), 'end')
+        area_ids = [int(area_id) for area_id in split_list(request.args.get('area_id'))]
+        chunks = export.export_chunks(export_format, export.outage_rows(start, end, area_ids, request.args.get('status')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify([outage.to_dict() for outage in outages]), 200
+    mimetype, extension = export.FORMATS[export_format]
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="outages.{extension}"'
+    return response
 
 @outages_bp.route('/<int:outage_id>', methods=['GET'])
 @jwt_required()
+@conditional(Outage, Area, User)
 def get_outage(outage_id):
-    outage = Outage.query.get(outage_id)
+    profile = outage_profile()
+    outage = profile.apply(Outage.query).filter_by(id=outage_id).first()
     
     if not outage:
         return jsonify({'error': 'Outage not found'}), 404
     
-    return jsonify(outage.to_dict()), 200
+    return jsonify(profile.serialize(outage)), 200
 
 @outages_bp.route('', methods=['POST'])
 @jwt_required()
@@ -63,39 +195,88 @@ def create_outage():
         priority=data.get('priority', 'MEDIUM'),
         affected_users=data.get('affected_users', 0),
         user_id=user_id,
-        area_id=data['area_id']
+        area_id=data['area_id'],
+        created_at=datetime.utcnow()
     )
     
+    # Attach to the open incident for this area/location, or open one
+    incident_index.assign_outage(outage)
+    
     db.session.add(outage)
     db.session.commit()
     
-    # Create notification for user
-    notification = Notification(
+    event_bus.publish('outages', 'outage.created', outage_profile('summary').serialize(outage))
+    
+    # Notify the reporter; written in the background by the fan-out worker
+    fanout.notify(
+        user_id,
         title='Outage Reported',
         message=f'Your outage report "{outage.title}" has been submitted successfully.',
         type='SUCCESS',
-        user_id=user_id
+        key=('outage-reported', outage.id)
     )
-    db.session.add(notification)
-    db.session.commit()
     
     return jsonify({
         'message': 'Outage reported successfully',
         'outage': outage.to_dict()
     }), 201
 
+@outages_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@admin_required
+def bulk_create_outages():
+    user_id = get_jwt_identity()
+    
+    try:
+        parsed = parse_body(request)
+    except IngestError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    max_items = current_app.config['BULK_INGEST_MAX_ITEMS']
+    if len(parsed) > max_items:
+        return jsonify({'error': f'At most {max_items} outages per request'}), 413
+    
+    rows, results = validate(parsed, user_id, datetime.utcnow())
+    results.extend(insert_outages(rows, current_app.config['BULK_INGEST_CHUNK_SIZE']))
+    results.sort(key=lambda result: result['index'])
+    
+    created = len(rows)
+    failed = len(results) - created
+    
+    # One notification for the whole batch
+    if created:
+        fanout.notify(
+            user_id,
+            title='Outages Ingested',
+            message=f'{created} outage reports were ingested ({failed} rejected).',
+            type='SUCCESS' if not failed else 'WARNING'
+        )
+    
+    # Subscribers refetch the new range instead of receiving every row
+    if created:
+        ids = [result['id'] for result in results if result['status'] == 'created']
+        event_bus.publish('outages', 'outage.bulk_created', {
+            'count': created, 'min_id': min(ids), 'max_id': max(ids)
+        })
+    
+    status_code = 201 if not failed else (207 if created else 400)
+    return jsonify({
+        'created': created,
+        'failed': failed,
+        'results': results
+    }), status_code
+
 @outages_bp.route('/<int:outage_id>', methods=['PUT'])
 @jwt_required()
 def update_outage(outage_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     outage = Outage.query.get(outage_id)
     
     if not outage:
         return jsonify({'error': 'Outage not found'}), 404
     
     # Check permissions
-    if user.role != 'admin' and outage.user_id != user_id:
+    if not is_admin() and outage.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
     data = request.get_json()
@@ -111,6 +292,7 @@ def update_outage(outage_id):
         outage.status = data['status']
         if data['status'] == 'RESOLVED':
             outage.resolved_at = datetime.utcnow()
+            incident_index.outage_resolved(outage)
     if data.get('priority'):
         outage.priority = data['priority']
     if data.get('affected_users') is not None:
@@ -120,15 +302,20 @@ def update_outage(outage_id):
     
     db.session.commit()
     
-    # Create notification
-    notification = Notification(
+    event_bus.publish(
+        'outages',
+        'outage.resolved' if outage.status == 'RESOLVED' else 'outage.updated',
+        outage_profile('summary').serialize(outage)
+    )
+    
+    # Create notification; rapid successive updates collapse into the latest
+    fanout.notify(
+        outage.user_id,
         title='Outage Updated',
         message=f'Outage "{outage.title}" has been updated. Status: {outage.status}',
         type='INFO',
-        user_id=outage.user_id
+        key=('outage-updated', outage.id)
     )
-    db.session.add(notification)
-    db.session.commit()
     
     return jsonify({
         'message': 'Outage updated successfully',
@@ -139,17 +326,19 @@ def update_outage(outage_id):
 @jwt_required()
 def delete_outage(outage_id):
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
     outage = Outage.query.get(outage_id)
     
     if not outage:
         return jsonify({'error': 'Outage not found'}), 404
     
     # Check permissions
-    if user.role != 'admin' and outage.user_id != user_id:
+    if not is_admin() and outage.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
+    incident_index.outage_removed(outage)
     db.session.delete(outage)
     db.session.commit()
     
+    event_bus.publish('outages', 'outage.deleted', {'id': outage_id})
+    
     return jsonify({'message': 'Outage deleted successfully'}), 200
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, column, func, or_, select, table, text
+from models import db, Area, Maintenance
+
+# Interval index over maintenance windows, so "what overlaps [start, end)"
+# and "what is active at T" cost O(log n + k) instead of a scan over every
+# window that started earlier. SQLite keeps an R*Tree of whole minutes
+# (rounded outwards) in step with triggers; Postgres a GiST index over
+# tsrange(start_time, end_time). Candidates are re-checked against the
+# exact columns, so rounding never changes a result.
+SQLITE_SPANS = 'maintenance_spans'
+
+_START_MINUTE = "CAST(strftime('%s', {}.start_time) AS INTEGER) / 60"
+_END_MINUTE = "(CAST(strftime('%s', {}.end_time) AS INTEGER) + 60) / 60"
+
+
+def _sqlite_statements():
+    start, end = _START_MINUTE.format('new'), _END_MINUTE.format('new')
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SPANS} USING rtree_i32(id, start_minute, end_minute)',
+        f'CREATE TRIGGER IF NOT EXISTS {SQLITE_SPANS}_ai AFTER INSERT ON maintenance BEGIN '
+        f'INSERT OR REPLACE INTO {SQLITE_SPANS} VALUES (new.id, {start}, max({start}, {end})); END',
+        f'CREATE TRIGGER IF NOT EXISTS {SQLITE_SPANS}_au AFTER UPDATE OF start_time, end_time ON maintenance BEGIN '
+        f'INSERT OR REPLACE INTO {SQLITE_SPANS} VALUES (new.id, {start}, max({start}, {end})); END',
+        f'CREATE TRIGGER IF NOT EXISTS {SQLITE_SPANS}_ad AFTER DELETE ON maintenance BEGIN '
+        f'DELETE FROM {SQLITE_SPANS} WHERE id = old.id; END',
+        f'DELETE FROM {SQLITE_SPANS}',
+        f'INSERT INTO {SQLITE_SPANS} SELECT id, {_START_MINUTE.format("maintenance")}, '
+        f'max({_START_MINUTE.format("maintenance")}, {_END_MINUTE.format("maintenance")}) FROM maintenance',
+    ]
+
+
+def install(connection):
+    """Create (or rebuild) the interval index; safe to run repeatedly."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        statements = _sqlite_statements()
+    elif dialect == 'postgresql':
+        statements = [
+            'CREATE INDEX IF NOT EXISTS ix_maintenance_span ON maintenance '
+            'USING gist (tsrange(start_time, end_time))'
+        ]
+    else:
+        statements = []
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def _minute(moment):
+    return int((moment - datetime(1970, 1, 1)).total_seconds() // 60)
+
+
+def overlapping(start, end):
+    """Filter clause for windows overlapping the half-open range [start, end)."""
+    exact = and_(Maintenance.start_time < end, Maintenance.end_time > start)
+
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        spans = table(SQLITE_SPANS, column('id'), column('start_minute'), column('end_minute'))
+        candidates = select(spans.c.id).where(
+            spans.c.start_minute <= _minute(end), spans.c.end_minute >= _minute(start)
+        )
+        return and_(Maintenance.id.in_(candidates), exact)
+    if dialect == 'postgresql':
+        span = func.tsrange(Maintenance.start_time, Maintenance.end_time)
+        return and_(span.op('&&')(func.tsrange(start, end)), exact)
+    return exact
+
+
+def active_at(moment):
+    """Filter clause for windows running at moment (start <= moment < end)."""
+    return overlapping(moment, moment + timedelta(microseconds=1))
+
+
+def status_clause(status, now=None):
+    """Filter clause for windows whose current status is status."""
+    now = now or datetime.utcnow()
+    automatic = Maintenance.status.notin_(Maintenance.TERMINAL_STATUSES)
+    if status == 'SCHEDULED':
+        return and_(automatic, Maintenance.start_time > now)
+    if status == 'IN_PROGRESS':
+        return and_(automatic, active_at(now))
+    if status == 'COMPLETED':
+        return or_(Maintenance.status == 'COMPLETED', and_(automatic, Maintenance.end_time <= now))
+    return Maintenance.status == status
+
+
+def conflicts(start, end, area_ids, exclude_id=None):
+    """Live windows overlapping [start, end) that share one of area_ids."""
+    if not area_ids:
+        return []
+    query = Maintenance.query.filter(
+        overlapping(start, end),
+        Maintenance.status.notin_(Maintenance.TERMINAL_STATUSES),
+        Maintenance.areas.any(Area.id.in_(area_ids))
+    )
+    if exclude_id is not None:
+        query = query.filter(Maintenance.id != exclude_id)
+    return query.order_by(Maintenance.start_time).all()
+
+
+def clock(now=None):
+    """(token, moment) that changes whenever some window starts or ends.
+
+    Derived statuses move with the clock, not with writes; conditional()
+    folds this into the ETag and Last-Modified of maintenance responses.
+    """
+    now = now or datetime.utcnow()
+    last_start, last_end = db.session.execute(select(
+        select(func.max(Maintenance.start_time)).where(Maintenance.start_time <= now).scalar_subquery(),
+        select(func.max(Maintenance.end_time)).where(Maintenance.end_time <= now).scalar_subquery()
+    )).one()
+    moments = [moment for moment in (last_start, last_end) if moment]
+    token = '/'.join(moment.isoformat() if moment else '-' for moment in (last_start, last_end))
+    return token, max(moments) if moments else None
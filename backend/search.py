@@ -0,0 +1,232 @@
+import re
+import unicodedata
+from flask import current_app
+from sqlalchemy import and_, column, func, literal_column, or_, select, table, text
+from models import db, Area, Outage
+
+# Full-text indexes over the searchable columns of each model. SQLite uses
+# external-content FTS5 tables kept in step by triggers; Postgres a stored
+# generated tsvector column with a GIN index. Both are updated by the
+# database itself, so ORM, bulk and raw writes all stay searchable.
+# Each column carries a ranking weight, highest first.
+INDEXES = {
+    'outages': ('id', (('title', 10.0), ('location', 5.0), ('description', 1.0))),
+    'areas': ('id', (('name', 10.0), ('code', 10.0), ('description', 1.0))),
+}
+
+MODELS = {'outages': Outage, 'areas': Area}
+
+# Prefix queries of these lengths are answered from dedicated FTS5 indexes
+PREFIX_LENGTHS = (2, 3, 4, 6)
+
+WORD = re.compile(r'[^\W_]+')
+
+
+def _sqlite_statements(name, key, weighted):
+    fts = f'{name}_fts'
+    columns = [c for c, _ in weighted]
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{name}', "
+        f"content_rowid='{key}', tokenize='unicode61 remove_diacritics 2', "
+        f"prefix='{' '.join(str(n) for n in PREFIX_LENGTHS)}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{key}, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{key}, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _postgres_statements(name, key, weighted):
+    vector = ' || '.join(f"to_tsvector('simple', coalesce({c}, ''))" for c, _ in weighted)
+    return [
+        f'ALTER TABLE {name} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f'GENERATED ALWAYS AS ({vector}) STORED',
+        f'CREATE INDEX IF NOT EXISTS ix_{name}_search_vector ON {name} USING gin (search_vector)',
+    ]
+
+
+def install(connection):
+    """Create (or rebuild) the full-text indexes; safe to run repeatedly."""
+    dialect = connection.dialect.name
+    for name, (key, columns) in INDEXES.items():
+        if dialect == 'sqlite':
+            statements = _sqlite_statements(name, key, columns)
+        elif dialect == 'postgresql':
+            statements = _postgres_statements(name, key, columns)
+        else:
+            continue
+        for statement in statements:
+            connection.execute(text(statement))
+
+
+def uninstall(connection, names=None):
+    """Drop the full-text indexes (all, or those for the given tables)."""
+    dialect = connection.dialect.name
+    for name in names or INDEXES:
+        if dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                connection.execute(text(f'DROP TRIGGER IF EXISTS {name}_fts_{suffix}'))
+            connection.execute(text(f'DROP TABLE IF EXISTS {name}_fts'))
+        elif dialect == 'postgresql':
+            connection.execute(text(f'ALTER TABLE {name} DROP COLUMN IF EXISTS search_vector'))
+
+
+def _terms(value):
+    # Lowercased words with accents stripped, split as the FTS tokenizers split them
+    value = value.lower()
+    if not value.isascii():
+        folded = unicodedata.normalize('NFKD', value)
+        value = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return WORD.findall(value)
+
+
+def _is_prefix(terms, i):
+    # Earlier words must match exactly; the last one is a prefix (from two
+    # characters) so results appear while it is still being typed
+    return i == len(terms) - 1 and len(terms[i]) >= PREFIX_LENGTHS[0]
+
+
+def _sqlite_match(terms, indexed_prefix=False):
+    words = [f'"{term}"' for term in terms]
+    if _is_prefix(terms, len(terms) - 1):
+        last = terms[-1]
+        if indexed_prefix:
+            # Prefix lengths with their own index stream; others are merged in full
+            last = last[:max(n for n in PREFIX_LENGTHS if n <= len(last))]
+        words[-1] = f'"{last}"*'
+    return ' AND '.join(words)
+
+
+def _postgres_tsquery(terms):
+    return ' & '.join(f'{term}:*' if _is_prefix(terms, i) else term for i, term in enumerate(terms))
+
+
+def _fallback(model, columns, terms):
+    return and_(*[
+        or_(*[getattr(model, c).ilike(f'%{term}%') for c, _ in columns]) for term in terms
+    ])
+
+
+def matching(name, text_query):
+    """Filter clause selecting rows of the indexed table that match text_query.
+
+    Returns None when the query has no searchable terms. Backends without a
+    full-text index fall back to substring matching.
+    """
+    model = MODELS[name]
+    key, columns = INDEXES[name]
+    terms = _terms(text_query)
+    if not terms:
+        return None
+
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        fts = table(f'{name}_fts', column('rowid'))
+        matches = select(fts.c.rowid).where(
+            literal_column(f'{name}_fts').op('MATCH')(_sqlite_match(terms))
+        )
+        return getattr(model, key).in_(matches)
+    if dialect == 'postgresql':
+        tsquery = func.to_tsquery('simple', _postgres_tsquery(terms))
+        return literal_column(f'{name}.search_vector').op('@@')(tsquery)
+    return _fallback(model, columns, terms)
+
+
+def _candidates(name, terms, window, indexed_prefix=False):
+    """(key, *columns) of the newest window rows matching terms."""
+    model = MODELS[name]
+    key, columns = INDEXES[name]
+    key_column = getattr(model, key)
+    query = select(key_column, *[getattr(model, c) for c, _ in columns])
+
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        # Newest matches come straight off the FTS doclists, already limited
+        fts = table(f'{name}_fts', column('rowid'))
+        newest = (
+            select(fts.c.rowid)
+            .where(literal_column(f'{name}_fts').op('MATCH')(_sqlite_match(terms, indexed_prefix)))
+            .order_by(fts.c.rowid.desc())
+            .limit(window)
+        )
+        query = query.where(key_column.in_(newest))
+    else:
+        query = query.where(matching(name, ' '.join(terms)))
+
+    return db.session.execute(query.order_by(key_column.desc()).limit(window)).all()
+
+
+def _score(values, weights, terms):
+    """Sum over columns of weight times the share of the column's words that
+    match, so a hit in a short title beats one in a long description. None
+    when some term appears in no column."""
+    score = 0.0
+    found = set()
+    for value, weight in zip(values, weights):
+        words = _terms(value or '')
+        if not words:
+            continue
+        hits = 0
+        for word in words:
+            for i, term in enumerate(terms):
+                if word == term or (_is_prefix(terms, i) and word.startswith(term)):
+                    hits += 1
+                    found.add(i)
+        score += weight * hits / len(words)
+    return score if len(found) == len(terms) else None
+
+
+def _ranked(rows, weights, terms):
+    scored = []
+    for row in rows:
+        score = _score(row[1:], weights, terms)
+        if score is not None:
+            scored.append((-score, -row[0]))
+    scored.sort()
+    return [-row_id for _, row_id in scored]
+
+
+def ranked_ids(name, text_query, limit, window=None):
+    """Ids of the best limit matches for text_query, best first.
+
+    Only the newest window matches (SEARCH_RANK_WINDOW) are scored, so the
+    cost stays flat however many rows a broad term hits. Ties go to the
+    newer row.
+    """
+    key, columns = INDEXES[name]
+    terms = _terms(text_query)
+    if not terms:
+        return []
+    window = max(window or current_app.config['SEARCH_RANK_WINDOW'], limit)
+    weights = [weight for _, weight in columns]
+
+    if db.engine.dialect.name != 'sqlite':
+        return _ranked(_candidates(name, terms, window), weights, terms)[:limit]
+
+    # A shortened, indexed prefix finds candidates fast and scoring drops the
+    # false hits. If that leaves too few, the full prefix is rare enough that
+    # matching it exactly is cheap too.
+    rows = _candidates(name, terms, window, indexed_prefix=True)
+    ids = _ranked(rows, weights, terms)
+    if len(ids) < limit and len(rows) == window:
+        ids = _ranked(_candidates(name, terms, window), weights, terms)
+    return ids[:limit]
+
+
+def ranked(query, name, text_query, limit):
+    """The best limit rows of query's model for text_query, best first."""
+    model = MODELS[name]
+    key, _ = INDEXES[name]
+    ids = ranked_ids(name, text_query, limit)
+    if not ids:
+        return []
+    position = {row_id: i for i, row_id in enumerate(ids)}
+    rows = query.filter(getattr(model, key).in_(ids)).all()
+    return sorted(rows, key=lambda row: position[getattr(row, key)])
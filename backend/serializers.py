@@ -0,0 +1,64 @@
+from operator import attrgetter
+from sqlalchemy.orm import joinedload, load_only
+from models import Outage
+
+
+class Profile:
+    """A named serialization shape and the loader options it needs.
+
+    Declaring relationships up front lets list queries eager load them, so
+    serializing N rows costs a constant number of queries.
+    """
+
+    def __init__(self, model, fields, relations=(), restrict_columns=False):
+        self.model = model
+        self.fields = fields
+        self.relations = relations
+        self.restrict_columns = restrict_columns
+        self._getter = attrgetter(*fields) if len(fields) > 1 else lambda obj: (getattr(obj, fields[0]),)
+
+    def options(self):
+        opts = []
+        if self.restrict_columns:
+            opts.append(load_only(*[getattr(self.model, field) for field in self.fields]))
+        for relation in self.relations:
+            opts.append(joinedload(getattr(self.model, relation)))
+        return opts
+
+    def apply(self, query):
+        return query.options(*self.options())
+
+    def serialize(self, obj):
+        # Datetimes are left for the JSON provider to encode (in C with orjson)
+        data = dict(zip(self.fields, self._getter(obj)))
+        for relation in self.relations:
+            related = getattr(obj, relation)
+            data[relation] = related.to_dict() if related else None
+        return data
+
+
+OUTAGE_SUMMARY_FIELDS = (
+    'id', 'title', 'location', 'status', 'priority', 'affected_users',
+    'created_at', 'user_id', 'area_id', 'incident_id'
+)
+
+OUTAGE_DETAIL_FIELDS = (
+    'id', 'title', 'description', 'location', 'status', 'priority',
+    'affected_users', 'estimated_resolution', 'resolved_at', 'created_at',
+    'updated_at', 'user_id', 'area_id', 'incident_id'
+)
+
+OUTAGE_PROFILES = {
+    'summary': Profile(Outage, OUTAGE_SUMMARY_FIELDS, restrict_columns=True),
+    'detail': Profile(Outage, OUTAGE_DETAIL_FIELDS),
+    'with_relations': Profile(Outage, OUTAGE_DETAIL_FIELDS, relations=('reporter', 'area')),
+}
+
+DEFAULT_OUTAGE_PROFILE = 'with_relations'
+
+
+def outage_profile(name=None):
+    name = name or DEFAULT_OUTAGE_PROFILE
+    if name not in OUTAGE_PROFILES:
+        raise ValueError(f'Unknown profile "{name}". Expected one of: {", ".join(OUTAGE_PROFILES)}')
+    return OUTAGE_PROFILES[name]
@@ -0,0 +1,20 @@
+"""Serve the API with gevent so /api/events streams stay cheap.
+
+    python serve.py
+
+Each open event stream holds a greenlet instead of an OS thread, so thousands
+of idle subscribers cost little. Run a single process: the event bus that
+feeds /api/events lives in memory.
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import os
+from gevent.pywsgi import WSGIServer
+from app import create_app
+
+if __name__ == '__main__':
+    app = create_app()
+    port = int(os.environ.get('PORT', 5000))
+    print(f'Serving on http://0.0.0.0:{port}')
+    WSGIServer(('0.0.0.0', port), app).serve_forever()
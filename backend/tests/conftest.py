@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config reads the environment at import time
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ['NOTIFICATION_FANOUT_SYNC'] = 'true'
+
+from app import create_app
+from models import db, User, Area
+import schedule
+import search
+
+@pytest.fixture(scope='session')
+def app():
+    return create_app()
+
+@pytest.fixture
+def session(app):
+    """A fresh schema with one user and one area, inside an app context."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        with db.engine.begin() as connection:
+            search.install(connection)
+            schedule.install(connection)
+
+        user = User(username='tester', email='tester@power.com', role='admin')
+        user.set_password('tester123')
+        db.session.add(user)
+        db.session.add_all([
+            Area(name='North', code='N', total_users=1000),
+            Area(name='South', code='S', total_users=2000)
+        ])
+        db.session.commit()
+
+        yield db.session
+        db.session.remove()
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from clustering import IncidentIndex
+from models import Incident, Outage
+
+STORM = datetime(2024, 5, 1, 10)
+
+def _report(minutes, location='Main St.', priority='MEDIUM', affected_users=10):
+    return {'area_id': 1, 'location': location, 'title': 'Lines down', 'priority': priority,
+            'affected_users': affected_users, 'created_at': STORM + timedelta(minutes=minutes)}
+
+def test_reports_within_window_share_an_incident(session):
+    reports = [_report(0), _report(20, 'main street', priority='HIGH'), _report(45), _report(120)]
+    IncidentIndex(window_minutes=30).assign(reports)
+    session.commit()
+
+    assert len({report['incident_id'] for report in reports[:3]}) == 1
+    assert reports[3]['incident_id'] != reports[0]['incident_id']
+
+    first = session.get(Incident, reports[0]['incident_id'])
+    assert (first.report_count, first.affected_users, first.priority) == (3, 30, 'HIGH')
+    assert first.last_reported_at == STORM + timedelta(minutes=45)
+    # Only the newest incident for a key takes new reports
+    assert first.open_key is None
+    assert session.get(Incident, reports[3]['incident_id']).open_key == '1:main street'
+
+def test_workers_agree_through_the_database(session):
+    # Separate instances stand in for separate worker processes
+    first, second = _report(0), _report(5, priority='CRITICAL')
+    IncidentIndex().assign([first])
+    session.commit()
+    IncidentIndex().assign([second])
+    session.commit()
+
+    assert first['incident_id'] == second['incident_id']
+    incident = session.get(Incident, first['incident_id'])
+    assert (incident.report_count, incident.priority) == (2, 'CRITICAL')
+
+def test_resolved_incident_takes_no_new_reports(session):
+    clusterer = IncidentIndex()
+    outage = Outage(title='Lines down', description='Down', location='Main St', user_id=1, area_id=1,
+                    created_at=STORM)
+    clusterer.assign_outage(outage)
+    session.add(outage)
+    session.commit()
+
+    outage.status = 'RESOLVED'
+    clusterer.outage_resolved(outage)
+    session.commit()
+
+    later = _report(10)
+    clusterer.assign([later])
+    session.commit()
+    assert later['incident_id'] != outage.incident_id
+    assert session.get(Incident, outage.incident_id).status == 'RESOLVED'
@@ -0,0 +1,68 @@
+from models import Outage, TableVersion
+
+def _headers(client):
+    token = client.post('/api/auth/login', json={'email': 'tester@power.com', 'password': 'tester123'})
+    return {'Authorization': 'Bearer ' + token.get_json()['access_token']}
+
+def test_outage_write_changes_etag(app, session):
+    client = app.test_client()
+    headers = _headers(client)
+
+    first = client.get('/api/outages', headers=headers)
+    assert client.get('/api/outages', headers={**headers, 'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    session.add(Outage(title='Feeder trip', description='Lines down', location='Main St', user_id=1, area_id=1))
+    session.commit()
+    assert session.get(TableVersion, 'outages').version >= 1
+
+    second = client.get('/api/outages', headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+
+def test_trends_etag_changes_at_midnight(app, session, monkeypatch):
+    from datetime import datetime
+    import routes.analytics
+
+    class Clock(datetime):
+        now = datetime(2024, 5, 1, 23, 59)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now
+
+    monkeypatch.setattr(routes.analytics, 'datetime', Clock)
+    client = app.test_client()
+    headers = _headers(client)
+
+    before = client.get('/api/analytics/trends', headers=headers).headers['ETag']
+    Clock.now = datetime(2024, 5, 2, 0, 1)
+    after = client.get('/api/analytics/trends', headers={**headers, 'If-None-Match': before})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before
+
+def test_stats_etag_changes_when_outage_ages_out(app, session, monkeypatch):
+    from datetime import datetime, timedelta
+    import aggregates
+    import routes.analytics
+
+    class Clock(datetime):
+        now = datetime.utcnow()
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now
+
+    monkeypatch.setattr(routes.analytics, 'datetime', Clock)
+    monkeypatch.setattr(aggregates, 'datetime', Clock)
+    session.add(Outage(title='Feeder trip', description='Lines down', location='Main St', user_id=1, area_id=1,
+                       created_at=Clock.now - timedelta(days=7) + timedelta(minutes=1)))
+    session.commit()
+    client = app.test_client()
+    headers = _headers(client)
+
+    before = client.get('/api/analytics/stats', headers=headers)
+    assert before.get_json()['recent_outages'] == 1
+    Clock.now += timedelta(minutes=2)
+    after = client.get('/api/analytics/stats', headers={**headers, 'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.get_json()['recent_outages'] == 0
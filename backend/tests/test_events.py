@@ -0,0 +1,32 @@
+def _access_token(client):
+    response = client.post('/api/auth/login', json={'email': 'tester@power.com', 'password': 'tester123'})
+    return response.get_json()['access_token']
+
+def _open(client, url, **kwargs):
+    response = client.get(url, **kwargs)
+    status = response.status_code
+    response.close()
+    return status
+
+def test_stream_takes_scoped_token_not_jwt_in_query(app, session):
+    client = app.test_client()
+    access_token = _access_token(client)
+    headers = {'Authorization': 'Bearer ' + access_token}
+
+    assert _open(client, f'/api/events?jwt={access_token}') == 401
+    assert _open(client, '/api/events', headers=headers) == 200
+
+    stream_token = client.post('/api/events/token', headers=headers).get_json()['token']
+    assert _open(client, f'/api/events?token={stream_token}') == 200
+    assert _open(client, f'/api/events?token={stream_token}x') == 401
+
+    # The stream token opens nothing else
+    assert client.get('/api/outages', headers={'Authorization': 'Bearer ' + stream_token}).status_code in (401, 422)
+
+def test_stream_token_expires(app, session, monkeypatch):
+    client = app.test_client()
+    headers = {'Authorization': 'Bearer ' + _access_token(client)}
+    stream_token = client.post('/api/events/token', headers=headers).get_json()['token']
+
+    monkeypatch.setitem(app.config, 'EVENT_TOKEN_SECONDS', -1)
+    assert _open(client, f'/api/events?token={stream_token}') == 401
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from sqlalchemy import inspect, text
+from models import db, Notification, NotificationArchive
+from inbox import archive_read
+from migrate import add_notifications_autoincrement
+
+def _add_read(session, count):
+    created_at = datetime.utcnow() - timedelta(days=100)
+    session.add_all([
+        Notification(title=f'n{i}', message='m', user_id=1, is_read=True, created_at=created_at)
+        for i in range(count)
+    ])
+    session.commit()
+
+def test_archive_twice_after_new_notifications(app, session):
+    _add_read(session, 3)
+    assert archive_read(older_than_days=30) == 3
+
+    # The archived ids were the highest: they must not be handed out again
+    _add_read(session, 3)
+    assert archive_read(older_than_days=30) == 3
+    assert session.query(NotificationArchive).count() == 6
+
+def test_migration_moves_notifications_off_archived_ids(app, session, monkeypatch):
+    # notifications as create_all built it before the table used AUTOINCREMENT
+    Notification.__table__.drop(db.engine)
+    monkeypatch.setitem(Notification.__table__.dialect_options['sqlite'], 'autoincrement', False)
+    Notification.__table__.create(db.engine)
+    monkeypatch.undo()
+
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO notifications_archive (id, title, message, type, created_at, archived_at, user_id) "
+            "VALUES (5, 'a', 'm', 'INFO', '2024-01-01', '2024-02-01', 1)"
+        ))
+        connection.execute(text(
+            "INSERT INTO notifications (id, title, message, is_read, user_id) VALUES (5, 'n', 'm', 0, 1)"
+        ))
+        add_notifications_autoincrement(connection)
+
+        assert connection.execute(text('SELECT id FROM notifications')).scalars().all() == [6]
+        connection.execute(text("INSERT INTO notifications (title, message, is_read, user_id) VALUES ('n', 'm', 0, 1)"))
+        assert connection.execute(text('SELECT MAX(id) FROM notifications')).scalar() == 7
+        indexes = {index['name'] for index in inspect(connection).get_indexes('notifications')}
+        assert 'ix_notifications_user_created_id' in indexes
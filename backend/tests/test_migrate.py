@@ -0,0 +1,10 @@
+import init_db
+from migrate import HOT_QUERIES, explain_hot_queries
+
+def test_hot_queries_use_indexes(app, session):
+    init_db.seed_synthetic(outages=2000, areas=20, users=50, notifications=2000, maintenance=100, app=app)
+
+    plans = explain_hot_queries()
+    assert set(plans) == set(HOT_QUERIES)
+    full_scans = {name: plan for name, (plan, full_scan) in plans.items() if full_scan}
+    assert not full_scans
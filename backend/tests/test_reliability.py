@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from models import Outage, ReliabilityRollup
+import reliability
+
+def _reliability_rows(session):
+    return sorted(
+        (row.month, row.area_id, row.interruptions, row.customers_interrupted, round(row.customer_minutes, 3))
+        for row in session.query(ReliabilityRollup)
+        if row.interruptions
+    )
+
+def test_incremental_reliability_matches_backfill(session):
+    started = datetime(2024, 5, 31, 22)
+    outages = [
+        Outage(title=f'Outage {n}', description='Lines down', location='Main St', user_id=1,
+               area_id=1 + n % 2, affected_users=100 * (n + 1), created_at=started + timedelta(hours=n))
+        for n in range(4)
+    ]
+    session.add_all(outages)
+    session.commit()
+
+    # Every change below is made to attributes expired by the previous commit
+    first, second, third, fourth = outages
+    first.resolved_at = datetime(2024, 5, 31, 23, 30)
+    first.status = 'RESOLVED'
+    second.resolved_at = datetime(2024, 5, 31, 23, 2)  # momentary
+    second.status = 'RESOLVED'
+    third.resolved_at = datetime(2024, 6, 1, 0, 45)
+    third.status = 'RESOLVED'
+    fourth.resolved_at = datetime(2024, 6, 1, 1, 30)
+    fourth.status = 'RESOLVED'
+    session.commit()
+    first.resolved_at = datetime(2024, 6, 1, 0, 0)
+    first.affected_users = 250
+    session.commit()
+    second.resolved_at = datetime(2024, 5, 31, 23, 30)
+    session.commit()
+    third.status = 'IN_PROGRESS'
+    session.commit()
+    session.delete(fourth)
+    session.commit()
+
+    incremental = _reliability_rows(session)
+    reliability.backfill()
+    session.commit()
+    assert incremental == _reliability_rows(session)
+    assert sum(row[2] for row in incremental) == 2
+
+def test_backfill_counts_exactly_sustained_outages(session):
+    # julianday differences land a hair below 5 minutes for most of these
+    session.add_all([
+        Outage(title='Feeder trip', description='Lines down', location='Main St', user_id=1, area_id=1,
+               affected_users=10, status='RESOLVED', created_at=datetime(2024, 5, 1, hour, 7),
+               resolved_at=datetime(2024, 5, 1, hour, 7) + timedelta(minutes=reliability.SUSTAINED_MINUTES))
+        for hour in range(24)
+    ])
+    session.commit()
+
+    incremental = _reliability_rows(session)
+    reliability.backfill()
+    session.commit()
+    assert incremental == _reliability_rows(session)
+    assert incremental[0][2] == 24
+
+def test_indices(session):
+    session.add(Outage(title='Feeder trip', description='Lines down', location='Main St', user_id=1, area_id=1,
+                       affected_users=100, status='RESOLVED', created_at=datetime(2024, 5, 1, 10),
+                       resolved_at=datetime(2024, 5, 1, 11)))
+    session.commit()
+
+    total = reliability.indices(by=None)
+    assert total['customers_served'] == 3000
+    assert total['saifi'] == round(100 / 3000, 4)
+    assert total['saidi'] == 2.0
+    assert total['caidi'] == 60.0
+    assert reliability.indices(by='area') == [dict(area_id=1, **reliability._indices(1, 100, 6000.0, 1000))]
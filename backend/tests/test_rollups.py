@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from models import Outage, OutageDailyRollup
+import rollups
+
+def _rollup_rows(session):
+    return sorted(
+        (row.day, row.area_id, row.priority, row.reported, row.resolved)
+        for row in session.query(OutageDailyRollup)
+        if row.reported or row.resolved
+    )
+
+def _outage(**values):
+    values.setdefault('created_at', datetime(2024, 5, 1, 10))
+    values.setdefault('area_id', 1)
+    return Outage(title='Feeder trip', description='Lines down', location='Main St', user_id=1, **values)
+
+def test_incremental_rollups_match_backfill(session):
+    outages = [
+        _outage(),
+        _outage(priority='HIGH', created_at=datetime(2024, 5, 2, 23, 30)),
+        _outage(area_id=2, status='RESOLVED', resolved_at=datetime(2024, 5, 1, 12))
+    ]
+    session.add_all(outages)
+    session.commit()
+
+    # Every change below is made to attributes expired by the previous commit
+    first, second, third = outages
+    first.status = 'RESOLVED'
+    first.resolved_at = datetime(2024, 5, 1, 11)
+    session.commit()
+    first.status = 'IN_PROGRESS'
+    session.commit()
+    second.priority = 'CRITICAL'
+    second.area_id = 2
+    second.created_at += timedelta(hours=1)
+    session.commit()
+    session.delete(third)
+    session.commit()
+
+    incremental = _rollup_rows(session)
+    rollups.backfill()
+    assert incremental == _rollup_rows(session)
+    assert incremental
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import event
+from models import db, Outage
+from serializers import OUTAGE_PROFILES
+
+def _seed(session, count):
+    session.add_all([
+        Outage(title=f'Outage {n}', description='Lines down', location='Main St', user_id=1, area_id=1 + n % 2)
+        for n in range(count)
+    ])
+    session.commit()
+
+def _count_queries(fn):
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return len(statements)
+
+@pytest.mark.parametrize('profile', sorted(OUTAGE_PROFILES))
+def test_outage_list_query_count_is_constant(app, session, profile):
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'tester@power.com', 'password': 'tester123'})
+    headers = {'Authorization': 'Bearer ' + token.get_json()['access_token']}
+
+    def fetch(count):
+        response = client.get(f'/api/outages?profile={profile}&limit=100', headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()) == count
+
+    _seed(session, 5)
+    fetch(5)  # warm caches (identity lookup) outside the measurement
+    few = _count_queries(lambda: fetch(5))
+    _seed(session, 45)
+    many = _count_queries(lambda: fetch(50))
+    assert few == many
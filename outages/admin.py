@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     UserProfile, ServiceArea, PowerOutage, 
-    Notification, MaintenanceSchedule, EmergencyContact
+    Notification, MaintenanceSchedule, EmergencyContact, OutageIncident
 )
 
 
@@ -26,6 +26,14 @@ class PowerOutageAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
 
 
+@admin.register(OutageIncident)
+class OutageIncidentAdmin(admin.ModelAdmin):
+    list_display = ['title', 'location', 'area', 'status', 'severity', 'report_count', 'created_at']
+    list_filter = ['status', 'severity', 'area', 'created_at']
+    search_fields = ['title', 'location']
+    date_hierarchy = 'created_at'
+
+
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ['title', 'user', 'notification_type', 'is_read', 'created_at']
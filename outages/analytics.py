@@ -0,0 +1,97 @@
+"""Resolution-time statistics for resolved outages"""
+from django.db.models import F, FloatField, Func
+
+from .models import PowerOutage
+
+# NumPy computes the percentiles when installed; the fallback interpolates
+# the same way (NumPy's default 'linear' method)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PERCENTILES = (50, 90, 99)
+
+SEVERITY_ORDER = [value for value, _ in PowerOutage.SEVERITY_CHOICES]
+
+
+class HoursBetween(Func):
+    """Hours from start to end as a float, computed by the database"""
+    output_field = FloatField()
+
+    def __init__(self, start, end):
+        super().__init__(start, end)
+
+    def _render(self, compiler, connection, template):
+        (start, start_params), (end, end_params) = [compiler.compile(e) for e in self.get_source_expressions()]
+        return template.format(start=start, end=end), (*start_params, *end_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return self._render(compiler, connection, 'EXTRACT(EPOCH FROM ({end} - {start})) / 3600.0')
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self._render(compiler, connection, '(julianday({end}) - julianday({start})) * 24.0')
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self._render(compiler, connection, 'TIMESTAMPDIFF(MICROSECOND, {start}, {end}) / 3600000000.0')
+
+
+def _percentiles(hours):
+    if np is not None:
+        return [float(value) for value in np.percentile(np.asarray(hours), PERCENTILES)]
+    hours = sorted(hours)
+    last = len(hours) - 1
+    values = []
+    for q in PERCENTILES:
+        position = last * q / 100
+        lower = int(position)
+        upper = min(lower + 1, last)
+        values.append(hours[lower] + (hours[upper] - hours[lower]) * (position - lower))
+    return values
+
+
+def _summary(hours):
+    median, p90, p99 = _percentiles(hours)
+    return {
+        'count': len(hours),
+        'mean': round(sum(hours) / len(hours), 1),
+        'median': round(median, 1),
+        'p90': round(p90, 1),
+        'p99': round(p99, 1),
+    }
+
+
+def resolution_stats(queryset=None):
+    """Resolution hours (count, mean, median, p90, p99) overall, per severity and per area
+
+    One streamed pass over (severity, area, duration) tuples; the duration is
+    computed by the database and no model instances are built. Areas come
+    worst p90 first, since the slow tail is what operators act on.
+    """
+    queryset = PowerOutage.objects.all() if queryset is None else queryset
+    rows = queryset.filter(status='RESOLVED', resolved_at__isnull=False).values_list(
+        'severity', 'area_id', 'area__name',
+        HoursBetween(F('created_at'), F('resolved_at')),
+    )
+
+    overall = []
+    by_severity = {}
+    by_area = {}
+    area_names = {}
+    for severity, area_id, area_name, hours in rows.iterator(chunk_size=2000):
+        overall.append(hours)
+        by_severity.setdefault(severity, []).append(hours)
+        by_area.setdefault(area_id, []).append(hours)
+        area_names[area_id] = area_name
+
+    if not overall:
+        return {'overall': None, 'by_severity': [], 'by_area': []}
+
+    severities = [s for s in SEVERITY_ORDER if s in by_severity] + sorted(set(by_severity) - set(SEVERITY_ORDER))
+    areas = [{'area': area_names[area_id], **_summary(hours)} for area_id, hours in by_area.items()]
+    areas.sort(key=lambda row: (-row['p90'], row['area']))
+    return {
+        'overall': _summary(overall),
+        'by_severity': [{'severity': severity, **_summary(by_severity[severity])} for severity in severities],
+        'by_area': areas,
+    }
@@ -0,0 +1,24 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Tune each new SQLite connection (WAL, relaxed sync, bigger cache)"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name}={value}')
+
+
+class OutagesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'outages'
+
+    def ready(self):
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='outages.sqlite_pragmas')
+
+        from . import counters, inbox
+        inbox.connect_signals()
+        counters.connect_signals()
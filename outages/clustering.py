@@ -0,0 +1,111 @@
+"""Incremental clustering of outage reports into incidents"""
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import OutageIncident, PowerOutage
+
+SEVERITY_RANK = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2, 'CRITICAL': 3}
+
+ABBREVIATIONS = {
+    'st': 'street', 'rd': 'road', 'ave': 'avenue', 'av': 'avenue',
+    'blvd': 'boulevard', 'dr': 'drive', 'ln': 'lane', 'hwy': 'highway',
+    'nr': 'near', 'opp': 'opposite', 'sq': 'square', 'apt': 'apartment'
+}
+
+
+def normalize_location(location):
+    """Canonical form of a free-text location"""
+    tokens = re.findall(r'[a-z0-9]+', (location or '').lower().replace('&', ' and '))
+    return ' '.join(ABBREVIATIONS.get(token, token) for token in tokens)[:200]
+
+
+class IncidentIndex:
+    """Clusters outage reports into incidents, with the database as arbiter.
+
+    The open incident for an (area, location key) holds that key in the
+    unique open_key column. A report joins it when its last report is within
+    the clustering window, otherwise the key is released and a new incident
+    takes it, so reports racing in from several workers share one incident.
+    """
+
+    @property
+    def window(self):
+        return timedelta(minutes=getattr(settings, 'INCIDENT_WINDOW_MINUTES', 30))
+
+    def assign(self, outage):
+        """Attach an unsaved outage to its incident, opening one if needed"""
+        location_key = normalize_location(outage.location)
+        open_key = f'{outage.area_id}:{location_key}'
+        reported_at = outage.created_at or timezone.now()
+        affected_users = outage.affected_users or 0
+        window = (reported_at - self.window, reported_at + self.window)
+        # Raise the incident severity to the worst report
+        lower = [s for s, rank in SEVERITY_RANK.items() if rank < SEVERITY_RANK.get(outage.severity, 1)]
+
+        with transaction.atomic():
+            for _ in range(3):
+                joined = OutageIncident.objects.filter(open_key=open_key, last_reported_at__range=window).update(
+                    report_count=F('report_count') + 1,
+                    affected_users=F('affected_users') + affected_users,
+                    last_reported_at=Greatest('last_reported_at', Value(reported_at)),
+                    severity=Case(When(severity__in=lower, then=Value(outage.severity)), default=F('severity'))
+                )
+                if joined:
+                    outage.incident_id = OutageIncident.objects.values_list('pk', flat=True).get(open_key=open_key)
+                    return
+
+                try:
+                    with transaction.atomic():
+                        incident = OutageIncident.objects.create(
+                            title=outage.title,
+                            location=outage.location,
+                            location_key=location_key,
+                            open_key=open_key,
+                            area_id=outage.area_id,
+                            severity=outage.severity,
+                            report_count=1,
+                            affected_users=affected_users,
+                            created_at=reported_at,
+                            last_reported_at=reported_at
+                        )
+                except IntegrityError:
+                    # The key is held by an incident outside the window, or one
+                    # another worker just opened: release the former and retry
+                    OutageIncident.objects.filter(open_key=open_key).exclude(
+                        last_reported_at__range=window
+                    ).update(open_key=None)
+                else:
+                    outage.incident_id = incident.pk
+                    return
+
+        raise RuntimeError(f'Could not assign an incident for {open_key}')
+
+    def removed(self, outage):
+        """Take a deleted report out of its incident's counters"""
+        if outage.incident_id:
+            OutageIncident.objects.filter(pk=outage.incident_id).update(
+                report_count=F('report_count') - 1,
+                affected_users=F('affected_users') - (outage.affected_users or 0)
+            )
+
+    def resolved(self, outage):
+        """Resolve the parent incident once its last open report is resolved"""
+        if not outage.incident_id:
+            return
+        if PowerOutage.objects.filter(incident_id=outage.incident_id).exclude(status='RESOLVED').exists():
+            return
+
+        incident = OutageIncident.objects.get(pk=outage.incident_id)
+        incident.status = 'RESOLVED'
+        incident.resolved_at = timezone.now()
+        incident.open_key = None
+        incident.save(update_fields=['status', 'resolved_at', 'open_key'])
+
+
+incident_index = IncidentIndex()
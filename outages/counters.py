@@ -0,0 +1,64 @@
+"""Global outage counters, aggregated in one query and cached between outage writes"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+
+from .models import PowerOutage
+
+ACTIVE_STATUSES = ('REPORTED', 'INVESTIGATING', 'IN_PROGRESS')
+
+CACHE_KEY = 'outages:counters'
+
+
+def outage_counters():
+    """{'total', 'active', 'resolved'} for all outages, from the cache when warm"""
+    counters = cache.get(CACHE_KEY)
+    if counters is None:
+        counters = PowerOutage.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status__in=ACTIVE_STATUSES)),
+            resolved=Count('id', filter=Q(status='RESOLVED')),
+        )
+        # The timeout bounds staleness from writes that skip signals
+        # (queryset.update, other processes with a local-memory cache)
+        cache.set(CACHE_KEY, counters, getattr(settings, 'OUTAGE_COUNTERS_CACHE_TTL', 60))
+    return counters
+
+
+def _planner_estimate():
+    # Postgres keeps a row estimate per table; reading it costs nothing
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                       [PowerOutage._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] > 0 else None
+
+
+def outage_total(filter_type, user):
+    """(count, estimated) for the outage list under filter_type
+
+    Past OUTAGE_COUNT_ESTIMATE_ROWS the unfiltered total is the planner's
+    estimate, so a cold cache never scans a huge table for a page header.
+    """
+    if filter_type == 'my':
+        return PowerOutage.objects.filter(reported_by=user).count(), False
+    if filter_type == 'all':
+        estimate = _planner_estimate()
+        if estimate and estimate >= getattr(settings, 'OUTAGE_COUNT_ESTIMATE_ROWS', 1000000):
+            return estimate, True
+    counters = outage_counters()
+    return counters.get(filter_type, counters['total']), False
+
+
+def invalidate_counters(**kwargs):
+    # After commit, so a reader cannot cache counts from before the write
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def connect_signals():
+    post_save.connect(invalidate_counters, sender=PowerOutage, dispatch_uid='outages.counters.save')
+    post_delete.connect(invalidate_counters, sender=PowerOutage, dispatch_uid='outages.counters.delete')
@@ -0,0 +1,152 @@
+"""Streaming outage exports: CSV always, Arrow IPC and Parquet with pyarrow"""
+import csv
+from itertools import islice
+
+# Arrow IPC and Parquet need pyarrow; CSV is always available
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# (header, values_list lookup, arrow type), in export column order
+COLUMNS = (
+    ('id', 'id', 'int64'),
+    ('area_id', 'area_id', 'int64'),
+    ('area', 'area__name', 'string'),
+    ('area_total_users', 'area__total_users', 'int64'),
+    ('title', 'title', 'string'),
+    ('location', 'location', 'string'),
+    ('status', 'status', 'string'),
+    ('severity', 'severity', 'string'),
+    ('affected_users', 'affected_users', 'int64'),
+    ('reported_by', 'reported_by__username', 'string'),
+    ('created_at', 'created_at', 'timestamp'),
+    ('estimated_resolution', 'estimated_resolution', 'timestamp'),
+    ('resolved_at', 'resolved_at', 'timestamp'),
+)
+
+# format: (content type, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Rows per database fetch, and per Arrow record batch / Parquet row group
+CHUNK_SIZE = 2000
+BATCH_ROWS = 50000
+
+
+def available_formats():
+    return [name for name in FORMATS if name == 'csv' or pa is not None]
+
+
+def filter_outages(queryset, start=None, end=None, area_ids=None):
+    """Restrict to outages created in [start, end) in any of area_ids"""
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start)
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=end)
+    if area_ids:
+        queryset = queryset.filter(area_id__in=area_ids)
+    return queryset
+
+
+def _rows(queryset):
+    rows = queryset.order_by('created_at', 'id').values_list(*[lookup for _, lookup, _ in COLUMNS])
+    return rows.iterator(chunk_size=CHUNK_SIZE)
+
+
+def _batches(queryset):
+    rows = _rows(queryset)
+    while True:
+        batch = list(islice(rows, BATCH_ROWS))
+        if not batch:
+            return
+        yield batch
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def csv_rows(queryset):
+    """Yield the CSV header and one encoded line per outage, reading CHUNK_SIZE rows at a time"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _, _ in COLUMNS])
+    for row in _rows(queryset):
+        yield writer.writerow([_cell(value) for value in row])
+
+
+class _Sink:
+    """Write-only file collecting what pyarrow writes until it is drained"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _schema():
+    types = {'int64': pa.int64(), 'string': pa.string(), 'timestamp': pa.timestamp('us', tz='UTC')}
+    return pa.schema([(header, types[kind]) for header, _, kind in COLUMNS])
+
+
+def _arrow_chunks(queryset, open_writer):
+    schema = _schema()
+    sink = _Sink()
+    writer = open_writer(pa.PythonFile(sink, mode='w'), schema)
+    for batch in _batches(queryset):
+        columns = list(zip(*batch))
+        writer.write_batch(pa.record_batch(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+        ))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def arrow_chunks(queryset):
+    """Arrow IPC stream, one record batch per BATCH_ROWS outages"""
+    return _arrow_chunks(queryset, pa.ipc.new_stream)
+
+
+def parquet_chunks(queryset):
+    """Parquet file, one row group per BATCH_ROWS outages"""
+    return _arrow_chunks(queryset, lambda sink, schema: pq.ParquetWriter(sink, schema, compression='zstd'))
+
+
+def export_chunks(export_format, queryset):
+    """Encoded chunks of queryset in export_format; ValueError if it is unavailable"""
+    if export_format not in available_formats():
+        raise ValueError(f'format must be one of: {", ".join(available_formats())}')
+    writers = {'csv': csv_rows, 'arrow': arrow_chunks, 'parquet': parquet_chunks}
+    return writers[export_format](queryset)
@@ -0,0 +1,127 @@
+"""Background notification fan-out for outage events"""
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .inbox import apply_unread_deltas, archive_read
+from .models import Notification, UserProfile
+
+logger = logging.getLogger(__name__)
+
+ADMINS = 'admins'
+
+
+class NotificationFanout:
+    """Drain queued notifications on a worker thread and bulk insert them.
+
+    Recipients are resolved on the worker, so the request that queues a
+    notification does not pay for looking up or writing one row per admin.
+    Repeated notifications for the same (user, outage, type) within a batch
+    collapse into the latest one.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=0.2):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._last_archive = time.monotonic()
+
+    def notify(self, users, title, message, notification_type='SYSTEM', outage=None):
+        """Queue a notification for a user, a list of user ids, or ADMINS"""
+        if hasattr(users, 'pk'):
+            users = [users.pk]
+        item = (users, {
+            'title': title,
+            'message': message,
+            'notification_type': notification_type,
+            'outage_id': outage.pk if outage is not None else None,
+        })
+
+        if getattr(settings, 'NOTIFICATION_FANOUT_SYNC', False):
+            self._write([item])
+            return
+
+        self._ensure_worker()
+        self._queue.put(item)
+
+    def notify_admins(self, title, message, notification_type='SYSTEM', outage=None):
+        self.notify(ADMINS, title, message, notification_type, outage)
+
+    def flush(self):
+        """Block until everything queued so far has been written"""
+        if self._worker:
+            self._queue.join()
+
+    def _ensure_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='notification-fanout', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            close_old_connections()
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception('Failed to write %d queued notifications', len(batch))
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        admin_ids = None
+        coalesced = {}
+        for users, fields in batch:
+            if users == ADMINS:
+                if admin_ids is None:
+                    admin_ids = list(UserProfile.objects.filter(is_admin=True).values_list('user_id', flat=True))
+                users = admin_ids
+            for user_id in users:
+                if fields['outage_id'] is None:
+                    key = object()
+                else:
+                    key = (user_id, fields['outage_id'], fields['notification_type'])
+                coalesced.pop(key, None)
+                coalesced[key] = Notification(user_id=user_id, **fields)
+
+        with transaction.atomic():
+            Notification.objects.bulk_create(coalesced.values(), batch_size=self.batch_size)
+            apply_unread_deltas(Counter(notification.user_id for notification in coalesced.values()))
+
+        self._maybe_archive()
+
+    def _maybe_archive(self):
+        # Piggybacks on notification writes so inboxes stay small without a scheduler
+        interval = getattr(settings, 'NOTIFICATION_ARCHIVE_INTERVAL', 3600)
+        if not interval or time.monotonic() - self._last_archive < interval:
+            return
+        self._last_archive = time.monotonic()
+        moved = archive_read(getattr(settings, 'NOTIFICATION_ARCHIVE_DAYS', 30))
+        if moved:
+            logger.info('Archived %d read notifications', moved)
+
+
+fanout = NotificationFanout()
@@ -41,6 +41,23 @@ class MaintenanceForm(forms.ModelForm):
             'scheduled_start': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
             'scheduled_end': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
         }
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        area = cleaned_data.get('area')
+        start = cleaned_data.get('scheduled_start')
+        end = cleaned_data.get('scheduled_end')
+        if start and end and end <= start:
+            self.add_error('scheduled_end', 'End must be after start.')
+        elif area and start and end:
+            conflicts = MaintenanceSchedule.objects.conflicts(area, start, end, exclude_pk=self.instance.pk)
+            if self.instance.status not in MaintenanceSchedule.TERMINAL_STATUSES and conflicts.exists():
+                first = conflicts.order_by('scheduled_start').first()
+                raise forms.ValidationError(
+                    f'Overlaps scheduled maintenance "{first.title}" in {area.name} '
+                    f'({first.scheduled_start:%Y-%m-%d %H:%M} - {first.scheduled_end:%Y-%m-%d %H:%M}).'
+                )
+        return cleaned_data
 
 
 class UserProfileForm(forms.ModelForm):
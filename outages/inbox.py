@@ -0,0 +1,94 @@
+"""Unread notification counters and inbox archiving"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive, UserProfile
+
+ARCHIVED_FIELDS = ('id', 'user_id', 'title', 'message', 'notification_type', 'outage_id', 'created_at')
+
+
+def apply_unread_deltas(deltas):
+    """Add {user_id: delta} to the profiles' counters, one UPDATE per distinct delta"""
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+
+    for delta, user_ids in by_delta.items():
+        UserProfile.objects.filter(user_id__in=user_ids).update(
+            unread_notifications=F('unread_notifications') + delta
+        )
+
+
+# Single-row saves and deletes keep the counter current on their own;
+# bulk_create and read-state changes call apply_unread_deltas explicitly
+def _count_save(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        apply_unread_deltas({instance.user_id: 1})
+
+
+def _count_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        apply_unread_deltas({instance.user_id: -1})
+
+
+def connect_signals():
+    post_save.connect(_count_save, sender=Notification, dispatch_uid='outages.inbox.save')
+    post_delete.connect(_count_delete, sender=Notification, dispatch_uid='outages.inbox.delete')
+
+
+def unread_count(user):
+    """Read the counter cache, counting only for users without a profile"""
+    count = UserProfile.objects.filter(user=user).values_list('unread_notifications', flat=True).first()
+    if count is None:
+        count = Notification.objects.filter(user=user, is_read=False).count()
+    return count
+
+
+def mark_read(user, pks=None):
+    """Mark a user's notifications read (all when pks is None); returns how many changed"""
+    notifications = Notification.objects.filter(user=user, is_read=False)
+    if pks is not None:
+        notifications = notifications.filter(pk__in=pks)
+
+    with transaction.atomic():
+        # Only rows that were unread count, so repeated clicks cannot double-decrement
+        changed = notifications.update(is_read=True)
+        apply_unread_deltas({user.pk: -changed})
+    return changed
+
+
+def recount_unread():
+    """Rebuild every profile's counter from the notifications table"""
+    unread = Notification.objects.filter(user_id=OuterRef('user_id'), is_read=False).values('user_id').annotate(
+        count=Count('id')
+    ).values('count')
+    UserProfile.objects.update(unread_notifications=Coalesce(Subquery(unread), Value(0)))
+
+
+def archive_read(older_than_days, batch_size=5000):
+    """Move read notifications older than the cutoff into NotificationArchive, batch by batch"""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    moved = 0
+
+    while True:
+        rows = list(
+            Notification.objects.filter(is_read=True, created_at__lt=cutoff).values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+
+        with transaction.atomic():
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**row) for row in rows], ignore_conflicts=True
+            )
+            Notification.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+
+    return moved
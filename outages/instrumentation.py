@@ -0,0 +1,104 @@
+"""Opt-in per-endpoint request metrics served at /api/metrics in Prometheus text format"""
+import contextvars
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.db.models.signals import post_init
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.backends import django as django_backend
+from django.urls import Resolver404, resolve
+
+# Shared with the Flask API, which owns the module
+from backend.request_metrics import CONTENT_TYPE, Metrics, RequestRecorder
+
+logger = logging.getLogger(__name__)
+
+_sample = contextvars.ContextVar('instrumentation_sample', default=None)
+
+metrics = Metrics(getattr(settings, 'METRICS_NAMESPACE', 'outages_web'), getattr(settings, 'SLOW_PROFILE_KEEP', 20),
+                  rows_help='Model instances built from query results.',
+                  serialize_help='Time spent rendering templates.')
+
+
+def _add(name, amount):
+    sample = _sample.get()
+    if sample is not None:
+        sample[name] += amount
+
+
+def _count_row(sender, instance, **kwargs):
+    _add('rows', 1)
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            _add('serialize', perf_counter() - started)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """DjangoTemplates that adds rendering time to the request's metrics"""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except django_backend.TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+class InstrumentationMiddleware:
+    """Record wall time, SQL, rows and rendering time per endpoint; sample slow requests with cProfile"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.recorder = RequestRecorder(metrics, logger, getattr(settings, 'SLOW_REQUEST_MS', 500),
+                                        getattr(settings, 'PROFILE_SAMPLE_RATE', 0.05),
+                                        getattr(settings, 'METRICS_TOKEN', None))
+        post_init.connect(_count_row, weak=False, dispatch_uid='instrumentation_rows')
+
+    def __call__(self, request):
+        if request.path in ('/api/metrics', '/api/metrics/slow'):
+            return self.metrics_view(request)
+
+        try:
+            endpoint = '/' + resolve(request.path_info).route
+        except Resolver404:
+            endpoint = 'unmatched'
+
+        sample = self.recorder.start(endpoint)
+        token = _sample.set(sample)
+        try:
+            with connection.execute_wrapper(self._time_statement):
+                response = self.get_response(request)
+        finally:
+            self.recorder.stop(sample)
+            _sample.reset(token)
+
+        self.recorder.finish(sample, request.method, endpoint, request.get_full_path(), response.status_code)
+        return response
+
+    def _time_statement(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            _add('statements', 1)
+            _add('sql', perf_counter() - started)
+
+    def metrics_view(self, request):
+        if not self.recorder.authorized(request.headers.get('Authorization')):
+            raise Http404
+        if request.path.endswith('/slow'):
+            return JsonResponse(list(metrics.profiles), safe=False)
+        return HttpResponse(metrics.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from outages.inbox import archive_read, recount_unread
+
+
+class Command(BaseCommand):
+    help = 'Move old read notifications to the archive and optionally rebuild unread counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'NOTIFICATION_ARCHIVE_DAYS', 30))
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--recount', action='store_true', help='rebuild every unread counter')
+
+    def handle(self, *args, **options):
+        moved = archive_read(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} read notifications'))
+
+        if options['recount']:
+            recount_unread()
+            self.stdout.write(self.style.SUCCESS('Rebuilt unread notification counters'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 15:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outages', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poweroutage',
+            index=models.Index(fields=['status', '-created_at'], name='outage_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poweroutage',
+            index=models.Index(fields=['area', 'status'], name='outage_area_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poweroutage',
+            index=models.Index(fields=['reported_by', '-created_at'], name='outage_reporter_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poweroutage',
+            index=models.Index(fields=['-created_at', '-id'], name='outage_created_id_idx'),
+        ),
+    ]
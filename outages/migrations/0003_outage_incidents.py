@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-18 15:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outages', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutageIncident',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('location', models.CharField(max_length=200)),
+                ('location_key', models.CharField(max_length=200)),
+                ('status', models.CharField(choices=[('OPEN', 'Open'), ('RESOLVED', 'Resolved')], default='OPEN', max_length=20)),
+                ('severity', models.CharField(default='MEDIUM', max_length=20)),
+                ('report_count', models.IntegerField(default=0)),
+                ('affected_users', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_reported_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incidents', to='outages.servicearea')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='poweroutage',
+            name='incident',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='outages.outageincident'),
+        ),
+        migrations.AddIndex(
+            model_name='outageincident',
+            index=models.Index(fields=['area', 'location_key', 'status'], name='incident_area_key_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outageincident',
+            index=models.Index(fields=['-created_at', '-id'], name='incident_created_id_idx'),
+        ),
+    ]
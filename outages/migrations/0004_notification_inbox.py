@@ -0,0 +1,69 @@
+# Generated by Django 5.0.1 on 2026-10-18 15:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_unread(apps, schema_editor):
+    Notification = apps.get_model('outages', 'Notification')
+    UserProfile = apps.get_model('outages', 'UserProfile')
+    unread = Notification.objects.filter(user_id=OuterRef('user_id'), is_read=False).values('user_id').annotate(
+        count=Count('id')
+    ).values('count')
+    UserProfile.objects.update(unread_notifications=Coalesce(Subquery(unread), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outages', '0003_outage_incidents'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('notification_type', models.CharField(choices=[('OUTAGE_REPORTED', 'Outage Reported'), ('OUTAGE_UPDATED', 'Outage Updated'), ('OUTAGE_RESOLVED', 'Outage Resolved'), ('SYSTEM', 'System')], default='SYSTEM', max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='unread_notifications',
+            field=models.IntegerField(default=0, help_text='Counter cache maintained by outages.inbox'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_read', 'created_at'], name='notif_read_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='outage',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='outages.poweroutage'),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notificationarchive',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notif_archive_user_created_idx'),
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-18 15:50
+
+from django.db import migrations
+
+from outages import search
+
+
+def install_search(apps, schema_editor):
+    search.install(schema_editor)
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outages', '0004_notification_inbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 16:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outages', '0005_full_text_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenanceschedule',
+            index=models.Index(fields=['area', 'scheduled_start', 'scheduled_end'], name='maint_area_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenanceschedule',
+            index=models.Index(fields=['scheduled_end'], name='maint_end_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+def assign_open_keys(apps, schema_editor):
+    """Give each (area, location key) to its newest open incident; older duplicates stay keyless"""
+    OutageIncident = apps.get_model('outages', 'OutageIncident')
+    seen = set()
+    incidents = OutageIncident.objects.filter(status='OPEN').order_by('-last_reported_at', '-id')
+    for pk, area_id, location_key in incidents.values_list('pk', 'area_id', 'location_key').iterator():
+        open_key = f'{area_id}:{location_key}'
+        if open_key not in seen:
+            seen.add(open_key)
+            OutageIncident.objects.filter(pk=pk).update(open_key=open_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outages', '0006_maintenance_span_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outageincident',
+            name='open_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.RunPython(assign_open_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='outageincident',
+            name='open_key',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
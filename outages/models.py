@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 from django.utils import timezone
 
@@ -9,6 +10,7 @@ class UserProfile(models.Model):
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
     is_admin = models.BooleanField(default=False)
+    unread_notifications = models.IntegerField(default=0, help_text="Counter cache maintained by outages.inbox")
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -31,6 +33,38 @@ class ServiceArea(models.Model):
         ordering = ['name']
 
 
+class OutageIncident(models.Model):
+    """Parent incident grouping near-identical outage reports"""
+    STATUS_CHOICES = [
+        ('OPEN', 'Open'),
+        ('RESOLVED', 'Resolved'),
+    ]
+    
+    title = models.CharField(max_length=200)
+    location = models.CharField(max_length=200)
+    location_key = models.CharField(max_length=200)
+    # '<area id>:<location key>' while the incident is the one reports join; cleared once it closes
+    open_key = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    area = models.ForeignKey(ServiceArea, on_delete=models.CASCADE, related_name='incidents')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='OPEN')
+    severity = models.CharField(max_length=20, default='MEDIUM')
+    report_count = models.IntegerField(default=0)
+    affected_users = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_reported_at = models.DateTimeField(default=timezone.now)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.title} - {self.location} ({self.report_count} reports)"
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['area', 'location_key', 'status'], name='incident_area_key_status_idx'),
+            models.Index(fields=['-created_at', '-id'], name='incident_created_id_idx'),
+        ]
+
+
 class PowerOutage(models.Model):
     """Power outage reports"""
     STATUS_CHOICES = [
@@ -52,6 +86,9 @@ class PowerOutage(models.Model):
     location = models.CharField(max_length=200)
     area = models.ForeignKey(ServiceArea, on_delete=models.CASCADE, related_name='outages')
     reported_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reported_outages')
+    incident = models.ForeignKey(
+        OutageIncident, on_delete=models.SET_NULL, null=True, blank=True, related_name='reports'
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='REPORTED')
     severity = models.CharField(max_length=20, choices=SEVERITY_CHOICES, default='MEDIUM')
     affected_users = models.IntegerField(default=0)
@@ -65,6 +102,12 @@ class PowerOutage(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='outage_status_created_idx'),
+            models.Index(fields=['area', 'status'], name='outage_area_status_idx'),
+            models.Index(fields=['reported_by', '-created_at'], name='outage_reporter_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='outage_created_id_idx'),
+        ]
 
 
 class Notification(models.Model):
@@ -89,6 +132,65 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notif_user_read_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_id_idx'),
+            models.Index(fields=['is_read', 'created_at'], name='notif_read_created_idx'),
+        ]
+
+
+class NotificationArchive(models.Model):
+    """Read notifications moved out of the inbox after NOTIFICATION_ARCHIVE_DAYS"""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=20, choices=Notification.TYPE_CHOICES, default='SYSTEM')
+    outage = models.ForeignKey(PowerOutage, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.title} - {self.user.username}"
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_archive_user_created_idx'),
+        ]
+
+
+class MaintenanceQuerySet(models.QuerySet):
+    """Time-range queries over maintenance windows"""
+    TERMINAL_STATUSES = ('CANCELLED', 'COMPLETED')
+
+    def overlapping(self, start, end):
+        """Windows overlapping the half-open range [start, end)"""
+        return self.filter(scheduled_start__lt=end, scheduled_end__gt=start)
+
+    def active_at(self, moment):
+        """Live windows running at moment (start <= moment < end)"""
+        return self.live().filter(scheduled_start__lte=moment, scheduled_end__gt=moment)
+
+    def live(self):
+        return self.exclude(status__in=self.TERMINAL_STATUSES)
+
+    def with_status(self, status, now=None):
+        """Windows whose status, derived from the clock, is status"""
+        now = now or timezone.now()
+        if status == 'SCHEDULED':
+            return self.live().filter(scheduled_start__gt=now)
+        if status == 'IN_PROGRESS':
+            return self.active_at(now)
+        if status == 'COMPLETED':
+            return self.filter(
+                Q(status='COMPLETED') | (~Q(status__in=self.TERMINAL_STATUSES) & Q(scheduled_end__lte=now))
+            )
+        return self.filter(status=status)
+
+    def conflicts(self, area, start, end, exclude_pk=None):
+        """Live windows in area overlapping [start, end)"""
+        return self.live().filter(area=area).overlapping(start, end).exclude(pk=exclude_pk)
 
 
 class MaintenanceSchedule(models.Model):
@@ -99,6 +201,7 @@ class MaintenanceSchedule(models.Model):
         ('COMPLETED', 'Completed'),
         ('CANCELLED', 'Cancelled'),
     ]
+    TERMINAL_STATUSES = MaintenanceQuerySet.TERMINAL_STATUSES
     
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -111,11 +214,28 @@ class MaintenanceSchedule(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = MaintenanceQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.title} - {self.scheduled_start.date()}"
     
+    def current_status(self, now=None):
+        """SCHEDULED / IN_PROGRESS / COMPLETED follow the clock; CANCELLED and COMPLETED stick"""
+        if self.status in self.TERMINAL_STATUSES:
+            return self.status
+        now = now or timezone.now()
+        if now < self.scheduled_start:
+            return 'SCHEDULED'
+        if now < self.scheduled_end:
+            return 'IN_PROGRESS'
+        return 'COMPLETED'
+    
     class Meta:
         ordering = ['-scheduled_start']
+        indexes = [
+            models.Index(fields=['area', 'scheduled_start', 'scheduled_end'], name='maint_area_span_idx'),
+            models.Index(fields=['scheduled_end'], name='maint_end_idx'),
+        ]
 
 
 class EmergencyContact(models.Model):
@@ -0,0 +1,37 @@
+"""Keyset (cursor) pagination for newest-first querysets"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    raw = f'{created_at.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def keyset_page(queryset, limit, cursor=None):
+    """Return (rows, next_cursor) for a queryset ordered by (-created_at, -id)"""
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    rows = list(queryset.order_by('-created_at', '-id')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].pk)
+    return rows, next_cursor
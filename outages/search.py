@@ -0,0 +1,214 @@
+"""Full-text search over outages and service areas (SQLite FTS5 / Postgres tsvector)"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+from django.db.models.expressions import RawSQL
+
+# table: (key column, ((column, ranking weight), ...)), highest weight first
+INDEXES = {
+    'outages_poweroutage': ('id', (('title', 10.0), ('location', 5.0), ('description', 1.0))),
+    'outages_servicearea': ('id', (('name', 10.0), ('coverage_cities', 5.0), ('description', 1.0))),
+}
+
+# Prefix queries of these lengths are answered from dedicated FTS5 indexes
+PREFIX_LENGTHS = (2, 3, 4, 6)
+
+WORD = re.compile(r'[^\W_]+')
+
+
+def _sqlite_statements(table, key, weighted):
+    fts = f'{table}_fts'
+    columns = [c for c, _ in weighted]
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+        f"content_rowid='{key}', tokenize='unicode61 remove_diacritics 2', "
+        f"prefix='{' '.join(str(n) for n in PREFIX_LENGTHS)}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{key}, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{key}, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _postgres_statements(table, key, weighted):
+    vector = ' || '.join(f"to_tsvector('simple', coalesce({c}, ''))" for c, _ in weighted)
+    return [
+        f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f'GENERATED ALWAYS AS ({vector}) STORED',
+        f'CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING gin (search_vector)',
+    ]
+
+
+def install(schema_editor):
+    """Create (or rebuild) the full-text indexes; safe to run repeatedly"""
+    vendor = schema_editor.connection.vendor
+    for table, (key, weighted) in INDEXES.items():
+        if vendor == 'sqlite':
+            statements = _sqlite_statements(table, key, weighted)
+        elif vendor == 'postgresql':
+            statements = _postgres_statements(table, key, weighted)
+        else:
+            continue
+        for statement in statements:
+            schema_editor.execute(statement)
+
+
+def uninstall(schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in INDEXES:
+        if vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+        elif vendor == 'postgresql':
+            schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+
+
+def _terms(value):
+    # Lowercased words with accents stripped, split as the FTS tokenizers split them
+    value = value.lower()
+    if not value.isascii():
+        folded = unicodedata.normalize('NFKD', value)
+        value = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return WORD.findall(value)
+
+
+def _is_prefix(terms, i):
+    # Earlier words must match exactly; the last one is a prefix (from two
+    # characters) so results appear while it is still being typed
+    return i == len(terms) - 1 and len(terms[i]) >= PREFIX_LENGTHS[0]
+
+
+def _sqlite_match(terms, indexed_prefix=False):
+    words = [f'"{term}"' for term in terms]
+    if _is_prefix(terms, len(terms) - 1):
+        last = terms[-1]
+        if indexed_prefix:
+            # Prefix lengths with their own index stream; others are merged in full
+            last = last[:max(n for n in PREFIX_LENGTHS if n <= len(last))]
+        words[-1] = f'"{last}"*'
+    return ' AND '.join(words)
+
+
+def _postgres_tsquery(terms):
+    return ' & '.join(f'{term}:*' if _is_prefix(terms, i) else term for i, term in enumerate(terms))
+
+
+def _fallback(weighted, terms):
+    condition = Q()
+    for term in terms:
+        any_column = Q()
+        for c, _ in weighted:
+            any_column |= Q(**{f'{c}__icontains': term})
+        condition &= any_column
+    return condition
+
+
+def _matching(queryset, terms, indexed_prefix=False):
+    table = queryset.model._meta.db_table
+    key, weighted = INDEXES[table]
+    if connection.vendor == 'sqlite':
+        matches = RawSQL(
+            f'SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s',
+            (_sqlite_match(terms, indexed_prefix),)
+        )
+        return queryset.filter(pk__in=matches)
+    if connection.vendor == 'postgresql':
+        matches = RawSQL(
+            f"SELECT {key} FROM {table} WHERE search_vector @@ to_tsquery('simple', %s)",
+            (_postgres_tsquery(terms),)
+        )
+        return queryset.filter(pk__in=matches)
+    return queryset.filter(_fallback(weighted, terms))
+
+
+def matching(queryset, query):
+    """Restrict queryset to rows matching query; falls back to icontains off SQLite/Postgres"""
+    terms = _terms(query)
+    return _matching(queryset, terms) if terms else queryset
+
+
+def _candidates(model, terms, window, indexed_prefix=False):
+    """(pk, *columns) of the newest window rows matching terms"""
+    table = model._meta.db_table
+    key, weighted = INDEXES[table]
+    fields = ['pk'] + [c for c, _ in weighted]
+    if connection.vendor == 'sqlite':
+        # Newest matches come straight off the FTS doclists, already limited
+        newest = RawSQL(
+            f'SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s ORDER BY rowid DESC LIMIT %s',
+            (_sqlite_match(terms, indexed_prefix), window)
+        )
+        rows = model.objects.filter(pk__in=newest)
+    else:
+        rows = _matching(model.objects.all(), terms)
+    return list(rows.order_by('-pk').values_list(*fields)[:window])
+
+
+def _score(values, weights, terms):
+    """Sum over columns of weight times the share of the column's words that match;
+    None when some term appears in no column"""
+    score = 0.0
+    found = set()
+    for value, weight in zip(values, weights):
+        words = _terms(value or '')
+        if not words:
+            continue
+        hits = 0
+        for word in words:
+            for i, term in enumerate(terms):
+                if word == term or (_is_prefix(terms, i) and word.startswith(term)):
+                    hits += 1
+                    found.add(i)
+        score += weight * hits / len(words)
+    return score if len(found) == len(terms) else None
+
+
+def _ranked(rows, weights, terms):
+    scored = []
+    for row in rows:
+        score = _score(row[1:], weights, terms)
+        if score is not None:
+            scored.append((-score, -row[0]))
+    scored.sort()
+    return [-pk for _, pk in scored]
+
+
+def ranked_ids(model, query, limit):
+    """Primary keys of the best limit matches for query, best first
+
+    Only the newest SEARCH_RANK_WINDOW matches are scored, so broad terms stay fast.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    window = max(getattr(settings, 'SEARCH_RANK_WINDOW', 200), limit)
+    weights = [weight for _, weight in INDEXES[model._meta.db_table][1]]
+
+    if connection.vendor != 'sqlite':
+        return _ranked(_candidates(model, terms, window), weights, terms)[:limit]
+
+    # A shortened, indexed prefix finds candidates fast and scoring drops the
+    # false hits; if too few remain, the full prefix is rare and cheap to match
+    rows = _candidates(model, terms, window, indexed_prefix=True)
+    pks = _ranked(rows, weights, terms)
+    if len(pks) < limit and len(rows) == window:
+        pks = _ranked(_candidates(model, terms, window), weights, terms)
+    return pks[:limit]
+
+
+def ranked(queryset, query, limit):
+    """Restrict queryset to the best limit matches for query, ordered best first"""
+    pks = ranked_ids(queryset.model, query, limit)
+    relevance = Case(*[When(pk=pk, then=i) for i, pk in enumerate(pks)], output_field=IntegerField())
+    return queryset.filter(pk__in=pks).order_by(relevance) if pks else queryset.none()
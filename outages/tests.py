@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .clustering import IncidentIndex
+from .models import OutageIncident, PowerOutage, ServiceArea, UserProfile
+
+
+class IncidentIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reporter', password='pw')
+        self.area = ServiceArea.objects.create(name='North', coverage_cities='Springfield')
+
+    def report(self, index, location='Main St & 5th Ave', created_at=None, severity='MEDIUM'):
+        outage = PowerOutage(title='Lines down', description='d', location=location, area=self.area,
+                             reported_by=self.user, severity=severity, affected_users=10, created_at=created_at)
+        index.assign(outage)
+        outage.save()
+        return outage
+
+    def test_workers_share_one_incident_per_key(self):
+        # Two indexes stand in for two worker processes
+        first, second = IncidentIndex(), IncidentIndex()
+        self.report(first, location='Elm Rd')
+        self.report(second, location='Elm Rd')
+
+        a = self.report(first)
+        b = self.report(second, location='main street and 5th avenue', severity='CRITICAL')
+        self.assertEqual(a.incident_id, b.incident_id)
+
+        incident = OutageIncident.objects.get(pk=a.incident_id)
+        self.assertEqual((incident.report_count, incident.affected_users, incident.severity), (2, 20, 'CRITICAL'))
+        self.assertEqual(OutageIncident.objects.count(), 2)
+
+    def test_report_outside_window_opens_new_incident(self):
+        index = IncidentIndex()
+        earlier = self.report(index, created_at=timezone.now() - timedelta(hours=2))
+        later = self.report(index)
+        self.assertNotEqual(earlier.incident_id, later.incident_id)
+        self.assertIsNone(OutageIncident.objects.get(pk=earlier.incident_id).open_key)
+
+        later.status = 'RESOLVED'
+        later.save()
+        index.resolved(later)
+        self.assertNotEqual(self.report(index).incident_id, later.incident_id)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reporter', password='pw')
+        UserProfile.objects.create(user=self.user)
+        self.client.login(username='reporter', password='pw')
+
+    def test_export_requires_admin(self):
+        self.assertEqual(self.client.get(reverse('export_outages')).status_code, 403)
+
+        UserProfile.objects.filter(user=self.user).update(is_admin=True)
+        response = self.client.get(reverse('export_outages'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(reverse('export_outages') + '?area=x').status_code, 400)
@@ -14,6 +14,7 @@ urlpatterns = [
     path('outages/', views.outages_list_view, name='outages_list'),
     path('outages/<int:pk>/', views.outage_detail_view, name='outage_detail'),
     path('outages/report/', views.report_outage_view, name='report_outage'),
+    path('outages/export/', views.export_outages_view, name='export_outages'),
     path('outages/<int:pk>/update/', views.update_outage_view, name='update_outage'),
     path('outages/<int:pk>/delete/', views.delete_outage_view, name='delete_outage'),
     
@@ -23,6 +24,7 @@ urlpatterns = [
     # Notifications
     path('notifications/', views.notifications_view, name='notifications'),
     path('notifications/<int:pk>/read/', views.mark_notification_read, name='mark_notification_read'),
+    path('notifications/read-all/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
     path('notifications/<int:pk>/delete/', views.delete_notification, name='delete_notification'),
     
     # Analytics
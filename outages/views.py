@@ -1,18 +1,38 @@
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Q, Avg
+from django.db import transaction
+from django.db.models import Count, Q
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 from .models import (
     PowerOutage, ServiceArea, Notification, 
-    MaintenanceSchedule, EmergencyContact, UserProfile
+    MaintenanceSchedule, EmergencyContact, UserProfile, OutageIncident,
+    NotificationArchive
 )
 from .forms import (
     UserRegisterForm, OutageReportForm, OutageUpdateForm,
     MaintenanceForm, UserProfileForm
 )
+from .fanout import fanout
+from .clustering import incident_index
+from .inbox import mark_read, unread_count
+from .counters import outage_counters, outage_total
+from .analytics import resolution_stats
+from .pagination import InvalidCursor, keyset_page
+from . import export, search
+
+NOTIFICATIONS_PAGE_SIZE = 50
+OUTAGES_PAGE_SIZE = 50
+# Columns the outage list shows; description and the reporter's other fields stay in the database
+OUTAGE_LIST_FIELDS = (
+    'title', 'location', 'status', 'severity', 'affected_users', 'estimated_resolution',
+    'resolved_at', 'created_at', 'area__name', 'reported_by__username',
+)
+SEARCH_RESULT_LIMIT = 200
 
 
 def login_view(request):
@@ -71,23 +91,21 @@ def dashboard_view(request):
     user = request.user
     is_admin = hasattr(user, 'profile') and user.profile.is_admin
     
-    # Get statistics
-    total_outages = PowerOutage.objects.count()
-    active_outages = PowerOutage.objects.filter(status__in=['REPORTED', 'INVESTIGATING', 'IN_PROGRESS']).count()
-    resolved_outages = PowerOutage.objects.filter(status='RESOLVED').count()
+    # Global counts are shared by every user and cached between outage writes
+    counters = outage_counters()
     my_reports = PowerOutage.objects.filter(reported_by=user).count()
     
     # Recent outages
     recent_outages = PowerOutage.objects.select_related('area', 'reported_by').order_by('-created_at')[:5]
     
-    # Unread notifications
-    unread_notifications = Notification.objects.filter(user=user, is_read=False).count()
+    # Unread notifications, from the counter cache
+    unread_notifications = unread_count(user)
     
     context = {
         'is_admin': is_admin,
-        'total_outages': total_outages,
-        'active_outages': active_outages,
-        'resolved_outages': resolved_outages,
+        'total_outages': counters['total'],
+        'active_outages': counters['active'],
+        'resolved_outages': counters['resolved'],
         'my_reports': my_reports,
         'recent_outages': recent_outages,
         'unread_notifications': unread_notifications,
@@ -102,7 +120,33 @@ def outages_list_view(request):
     filter_type = request.GET.get('filter', 'all')
     search_query = request.GET.get('search', '')
     
-    outages = PowerOutage.objects.select_related('area', 'reported_by')
+    # Storm view: one row per incident instead of every raw report
+    if request.GET.get('group') == 'incidents':
+        incidents = OutageIncident.objects.select_related('area')
+        if filter_type == 'active':
+            incidents = incidents.filter(status='OPEN')
+        elif filter_type == 'resolved':
+            incidents = incidents.filter(status='RESOLVED')
+        if search_query:
+            incidents = incidents.filter(
+                Q(title__icontains=search_query) | Q(location__icontains=search_query)
+            )
+        
+        try:
+            incidents, next_cursor = keyset_page(incidents, OUTAGES_PAGE_SIZE, request.GET.get('cursor'))
+        except InvalidCursor:
+            return redirect('outages_list')
+        
+        context = {
+            'incidents': incidents,
+            'next_cursor': next_cursor,
+            'group': 'incidents',
+            'filter_type': filter_type,
+            'search_query': search_query,
+        }
+        return render(request, 'outages/outages_list.html', context)
+    
+    outages = PowerOutage.objects.select_related('area', 'reported_by').only(*OUTAGE_LIST_FIELDS)
     
     # Apply filters
     if filter_type == 'my':
@@ -112,18 +156,24 @@ def outages_list_view(request):
     elif filter_type == 'resolved':
         outages = outages.filter(status='RESOLVED')
     
-    # Apply search
+    # Apply search: best matches first from the full-text index, one page
+    # of newest-first rows otherwise
+    next_cursor = None
     if search_query:
-        outages = outages.filter(
-            Q(title__icontains=search_query) |
-            Q(location__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-    
-    outages = outages.order_by('-created_at')
+        outages = list(search.ranked(outages, search_query, SEARCH_RESULT_LIMIT))
+        total_count, total_estimated = len(outages), False
+    else:
+        try:
+            outages, next_cursor = keyset_page(outages, OUTAGES_PAGE_SIZE, request.GET.get('cursor'))
+        except InvalidCursor:
+            return redirect('outages_list')
+        total_count, total_estimated = outage_total(filter_type, request.user)
     
     context = {
         'outages': outages,
+        'next_cursor': next_cursor,
+        'total_count': total_count,
+        'total_estimated': total_estimated,
         'filter_type': filter_type,
         'search_query': search_query,
     }
@@ -131,6 +181,63 @@ def outages_list_view(request):
     return render(request, 'outages/outages_list.html', context)
 
 
+def _export_bound(value, field):
+    """ISO 8601 date or datetime as an aware datetime; None when absent"""
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value) or datetime.combine(parse_date(value), time.min)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be an ISO 8601 date or datetime')
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment, dt_timezone.utc)
+
+
+def _export_area_ids(values):
+    """Area ids from repeated ?area= parameters; blank values are ignored"""
+    area_ids = []
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        if not value.isdecimal():
+            raise ValueError(f'area must be an integer area id, got {value!r}')
+        area_ids.append(int(value))
+    return area_ids
+
+
+@login_required
+def export_outages_view(request):
+    """Stream the filtered outage history as CSV, Arrow IPC or Parquet (admin only)"""
+    if not (hasattr(request.user, 'profile') and request.user.profile.is_admin):
+        return HttpResponseForbidden('Admin access required')
+    
+    filter_type = request.GET.get('filter', 'all')
+    export_format = request.GET.get('format', 'csv')
+    outages = PowerOutage.objects.all()
+    if filter_type == 'my':
+        outages = outages.filter(reported_by=request.user)
+    elif filter_type == 'active':
+        outages = outages.filter(status__in=['REPORTED', 'INVESTIGATING', 'IN_PROGRESS'])
+    elif filter_type == 'resolved':
+        outages = outages.filter(status='RESOLVED')
+    
+    try:
+        outages = export.filter_outages(
+            outages,
+            start=_export_bound(request.GET.get('start'), 'start'),
+            end=_export_bound(request.GET.get('end'), 'end'),
+            area_ids=_export_area_ids(request.GET.getlist('area')),
+        )
+        chunks = export.export_chunks(export_format, outages)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    
+    content_type, extension = export.FORMATS[export_format]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="outages.{extension}"'
+    return response
+
+
 @login_required
 def outage_detail_view(request, pk):
     """View outage details"""
@@ -152,18 +259,19 @@ def report_outage_view(request):
         if form.is_valid():
             outage = form.save(commit=False)
             outage.reported_by = request.user
-            outage.save()
             
-            # Create notification for admins
-            admin_users = UserProfile.objects.filter(is_admin=True).values_list('user', flat=True)
-            for admin_id in admin_users:
-                Notification.objects.create(
-                    user_id=admin_id,
-                    title='New Outage Reported',
-                    message=f'{request.user.username} reported: {outage.title}',
-                    notification_type='OUTAGE_REPORTED',
-                    outage=outage
-                )
+            # Group into the open incident for this area and location
+            with transaction.atomic():
+                incident_index.assign(outage)
+                outage.save()
+            
+            # Notify admins; recipients are resolved and written by the fan-out worker
+            fanout.notify_admins(
+                title='New Outage Reported',
+                message=f'{request.user.username} reported: {outage.title}',
+                notification_type='OUTAGE_REPORTED',
+                outage=outage
+            )
             
             messages.success(request, 'Outage reported successfully!')
             return redirect('outages_list')
@@ -185,11 +293,14 @@ def update_outage_view(request, pk):
     if request.method == 'POST':
         form = OutageUpdateForm(request.POST, instance=outage)
         if form.is_valid():
-            updated_outage = form.save()
+            with transaction.atomic():
+                updated_outage = form.save()
+                if updated_outage.status == 'RESOLVED':
+                    incident_index.resolved(updated_outage)
             
-            # Create notification for reporter
-            Notification.objects.create(
-                user=outage.reported_by,
+            # Notify the reporter
+            fanout.notify(
+                outage.reported_by,
                 title='Outage Updated',
                 message=f'Your reported outage "{outage.title}" has been updated to {updated_outage.status}',
                 notification_type='OUTAGE_UPDATED',
@@ -216,7 +327,9 @@ def delete_outage_view(request, pk):
         return redirect('outages_list')
     
     if request.method == 'POST':
-        outage.delete()
+        with transaction.atomic():
+            incident_index.removed(outage)
+            outage.delete()
         messages.success(request, 'Outage deleted successfully!')
         return redirect('outages_list')
     
@@ -233,10 +346,7 @@ def areas_view(request):
     )
     
     if search_query:
-        areas = areas.filter(
-            Q(name__icontains=search_query) |
-            Q(coverage_cities__icontains=search_query)
-        )
+        areas = search.matching(areas, search_query)
     
     context = {
         'areas': areas,
@@ -248,11 +358,21 @@ def areas_view(request):
 
 @login_required
 def notifications_view(request):
-    """View user notifications"""
-    notifications = Notification.objects.filter(user=request.user).select_related('outage')
+    """View user notifications, one cursor page at a time"""
+    archived = request.GET.get('archived') == 'true'
+    model = NotificationArchive if archived else Notification
+    notifications = model.objects.filter(user=request.user).select_related('outage')
+    
+    try:
+        notifications, next_cursor = keyset_page(notifications, NOTIFICATIONS_PAGE_SIZE, request.GET.get('cursor'))
+    except InvalidCursor:
+        return redirect('notifications')
     
     context = {
         'notifications': notifications,
+        'next_cursor': next_cursor,
+        'archived': archived,
+        'unread_notifications': unread_count(request.user),
     }
     
     return render(request, 'outages/notifications.html', context)
@@ -261,9 +381,15 @@ def notifications_view(request):
 @login_required
 def mark_notification_read(request, pk):
     """Mark notification as read"""
-    notification = get_object_or_404(Notification, pk=pk, user=request.user)
-    notification.is_read = True
-    notification.save()
+    get_object_or_404(Notification, pk=pk, user=request.user)
+    mark_read(request.user, [pk])
+    return redirect('notifications')
+
+
+@login_required
+def mark_all_notifications_read(request):
+    """Mark every notification read"""
+    mark_read(request.user)
     return redirect('notifications')
 
 
@@ -280,9 +406,7 @@ def delete_notification(request, pk):
 def analytics_view(request):
     """View analytics and statistics"""
     # Overall statistics
-    total_outages = PowerOutage.objects.count()
-    active_outages = PowerOutage.objects.filter(status__in=['REPORTED', 'INVESTIGATING', 'IN_PROGRESS']).count()
-    resolved_outages = PowerOutage.objects.filter(status='RESOLVED').count()
+    counters = outage_counters()
     
     # Outages by status
     status_stats = PowerOutage.objects.values('status').annotate(count=Count('id'))
@@ -297,22 +421,19 @@ def analytics_view(request):
     seven_days_ago = timezone.now() - timedelta(days=7)
     recent_outages = PowerOutage.objects.filter(created_at__gte=seven_days_ago).count()
     
-    # Average resolution time
-    resolved = PowerOutage.objects.filter(status='RESOLVED', resolved_at__isnull=False)
-    avg_resolution_hours = 0
-    if resolved.exists():
-        total_hours = sum([(o.resolved_at - o.created_at).total_seconds() / 3600 for o in resolved])
-        avg_resolution_hours = round(total_hours / resolved.count(), 1)
+    # Resolution time: mean and percentiles overall, per severity and per area
+    resolution = resolution_stats()
     
     context = {
-        'total_outages': total_outages,
-        'active_outages': active_outages,
-        'resolved_outages': resolved_outages,
+        'total_outages': counters['total'],
+        'active_outages': counters['active'],
+        'resolved_outages': counters['resolved'],
         'status_stats': status_stats,
         'severity_stats': severity_stats,
         'area_stats': area_stats,
         'recent_outages': recent_outages,
-        'avg_resolution_hours': avg_resolution_hours,
+        'avg_resolution_hours': resolution['overall']['mean'] if resolution['overall'] else 0,
+        'resolution_stats': resolution,
     }
     
     return render(request, 'outages/analytics.html', context)
@@ -325,12 +446,10 @@ def maintenance_view(request):
     
     schedules = MaintenanceSchedule.objects.select_related('area', 'created_by')
     
-    if filter_type == 'upcoming':
-        schedules = schedules.filter(scheduled_start__gte=timezone.now(), status='SCHEDULED')
-    elif filter_type == 'ongoing':
-        schedules = schedules.filter(status='IN_PROGRESS')
-    elif filter_type == 'completed':
-        schedules = schedules.filter(status='COMPLETED')
+    # Status follows the clock; only cancellations and early completions are stored
+    statuses = {'upcoming': 'SCHEDULED', 'ongoing': 'IN_PROGRESS', 'completed': 'COMPLETED'}
+    if filter_type in statuses:
+        schedules = schedules.with_status(statuses[filter_type])
     
     schedules = schedules.order_by('scheduled_start')
     